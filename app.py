@@ -1,23 +1,36 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory,session, redirect, url_for
+from flask import Flask, render_template, request, jsonify, send_from_directory,session, redirect, url_for, g, Response, stream_with_context
 import backend.oauth as oauth
 import os
+import secrets
 import subprocess
 import tempfile
 import shutil
 import webbrowser
-from threading import Timer
+from threading import Lock, Timer
 from functools import wraps
 import backend.snowflake_client as sfc
 from dotenv import load_dotenv
 from backend import security as sec
+from backend.warmup import WARMUP_ON_LOGIN, default_steps, warmup
+from backend.cache_store import CACHE_PERSIST_PATH, CACHE_SHARED, SQLiteCacheStore
+from backend.broker import BROKER_SOCKET, BrokerClient
+from backend.session_store import ServerSideSessionInterface, make_session_backend
+from backend.change_feed import make_change_feed
+from backend import assets, deadline, metrics
+from backend.log_buffer import log_buffer
+from backend.log_setup import configure_logging
+import hashlib
+import json
 import time
+import datetime
 import logging
-from snowflake.connector import errors as sf_errors
+import sys
 
 load_dotenv()
 
 # ---------- Logging setup ----------
-logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+# Records are queued to a background thread that writes stderr and the /logs buffer
+configure_logging(log_buffer)
 logger = logging.getLogger('snowflake-admin-app')
 
 app = Flask(__name__)
@@ -25,14 +38,82 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY') or os.getenv('SECRET_KEY', 'dev-secret-key-123')
 if app.config['SECRET_KEY'] == 'dev-secret-key-123':
     logger.warning('Using default development secret key. Set FLASK_SECRET_KEY environment variable for production.')
-app.config['SESSION_TYPE'] = 'filesystem'
-app.config['SESSION_PERMANENT'] = True
 app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour
+# Session data stays server-side (memory, or SQLite shared by workers with
+# SESSION_STORE_PATH); the cookie only carries the session ID
+app.session_interface = ServerSideSessionInterface(make_session_backend())
 app.config['UPLOAD_FOLDER'] = os.path.join(tempfile.gettempdir(), 'snowflake_keys')
 
+# Changes made through the mutation routes, streamed to open tabs by /events/stream
+change_feed = make_change_feed()
+
+# CSS/JS from static/ are served under content-hashed /assets/ URLs with immutable caching
+asset_manifest = assets.init_app(app)
+
 # Ensure the upload folder exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# With SF_BROKER_SOCKET set, the Snowflake session and caches live in the broker
+# process (backend/broker.py).  Otherwise an optional persistent cache lets restarts
+# start warm (off unless SF_PERSIST_CACHE_PATH is set); SF_SHARED_CACHE makes worker
+# processes share it.  Both are opt-in, also under gunicorn.conf.py.
+if BROKER_SOCKET:
+    if not isinstance(sfc.client, BrokerClient):
+        sfc.client = BrokerClient(BROKER_SOCKET)
+        logger.info('Using Snowflake broker at %s', BROKER_SOCKET)
+elif CACHE_PERSIST_PATH and sfc.client._store is None:
+    try:
+        restored = sfc.client.attach_store(SQLiteCacheStore(CACHE_PERSIST_PATH), shared=CACHE_SHARED)
+        logger.info('Restored %d cache entries from %s', restored, CACHE_PERSIST_PATH)
+    except Exception as e:
+        logger.warning('Persistent cache disabled: %s', e)
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.before_request
+def _start_deadline():
+    # Snowflake statements run by this request share its budget (see backend/deadline.py)
+    view = app.view_functions.get(request.endpoint)
+    seconds = getattr(view, 'deadline_seconds', deadline.REQUEST_DEADLINE_SECONDS)
+    if seconds <= 0:
+        return
+    g.deadline = deadline.Deadline(seconds)
+    deadline.set_current(g.deadline)
+    # gunicorn exposes the client socket; a hang-up there cancels running statements
+    sock = request.environ.get('gunicorn.socket')
+    if sock is not None:
+        deadline.watch_disconnect(g.deadline, sock)
+
+@app.teardown_request
+def _end_deadline(exc):
+    active = g.pop('deadline', None)
+    if active is not None:
+        deadline.unwatch_disconnect(active)
+        deadline.set_current(None)
+
+@app.after_request
+def _record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # Use the URL rule, not the path, so usernames/roles don't become labels
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - started, route=route, method=request.method, status=str(response.status_code)
+        )
+    return response
+
+# Registered after the metrics hook so it runs first and 304s are recorded as such
+@app.after_request
+def _conditional_json(response):
+    # Lets the browser's API cache revalidate JSON listings without re-downloading them
+    if (request.method == 'GET' and response.status_code == 200 and response.mimetype == 'application/json'
+            and not response.is_streamed):
+        response.add_etag()
+        response.make_conditional(request)
+    return response
+
 def open_browser():
     """Open the browser after the server has started."""
     # Only open browser if not already opened
@@ -58,6 +139,7 @@ def generate_key_pair(username, encrypted=True, passphrase=None, create_processe
         'files': {},
         'snowflake_command': None
     }
+    started = time.perf_counter()
     
     try:
         # Create a temporary directory for this session
@@ -157,12 +239,28 @@ DESC USER {username};"""
     except Exception as e:
         results['messages'].append(f"Error: {str(e)}")
     
+    metrics.KEYGEN_DURATION.observe(time.perf_counter() - started, encrypted=str(bool(encrypted)).lower())
     return results
 
+# Rendered landing page per auth variant: {authenticated: (template, assets version, etag, html)}
+_index_pages = {}
+
 @app.route('/')
 def index():
     authed = oauth.authenticated()
-    return render_template('index.html', authenticated=authed)
+    # Jinja returns a new Template object when the file changed (with auto-reload on)
+    template = app.jinja_env.get_template('index.html')
+    version = asset_manifest.refresh()
+    cached = _index_pages.get(authed)
+    if cached is None or cached[0] is not template or cached[1] != version:
+        html = render_template(template, authenticated=authed)
+        etag = hashlib.sha256(html.encode()).hexdigest()[:16]
+        cached = _index_pages[authed] = (template, version, etag, html)
+    resp = Response(cached[3], mimetype='text/html')
+    resp.set_etag(cached[2])
+    # Revalidate every time: the page differs by login state and links the current asset hashes
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp.make_conditional(request)
 
 @app.route('/generate', methods=['POST'])
 def generate():
@@ -223,8 +321,22 @@ def process_key():
 
     return jsonify(results)
 
+def deadline_budget(seconds):
+    """Give a route a Snowflake time budget other than REQUEST_DEADLINE_SECONDS."""
+    def decorate(f):
+        f.deadline_seconds = seconds
+        return f
+    return decorate
+
+def passive_session(f):
+    """Mark a route (e.g. a stream that reconnects on its own) as not counting as user activity."""
+    f.passive_session = True
+    return f
+
 def require_oauth(f):
     """Decorator to ensure the user has a valid Snowflake OAuth token in session."""
+    touch = not getattr(f, 'passive_session', False)
+
     @wraps(f)
     def wrapper(*args, **kwargs):
         if not oauth.authenticated():
@@ -235,7 +347,8 @@ def require_oauth(f):
         if (now - last) > sec.INACTIVITY_TIMEOUT_SECONDS:
             session.clear()
             return jsonify({'error': 'Session expired due to inactivity'}), 401
-        session['last_activity'] = now
+        if touch:
+            session['last_activity'] = now
         return f(*args, **kwargs)
     return wrapper
 
@@ -252,72 +365,62 @@ def _redact(token: str, show: int = 4) -> str:
 # Test route
 @app.route('/test')
 def test():
-    print("Test route hit")
+    logger.debug("Test route hit")
     return jsonify({'status': 'ok', 'message': 'Server is responding'})
 
 # OAuth routes
 @app.route('/login')
 def login():
-    # Add debug logging
-    print("Login route hit")
-    print("OAuth Configuration:")
-    print(f"OAUTH_CLIENT_ID: {oauth.OAUTH_CLIENT_ID}")
-    print(f"OAUTH_AUTH_URL: {oauth.OAUTH_AUTH_URL}")
-    print(f"OAUTH_TOKEN_URL: {oauth.OAUTH_TOKEN_URL}")
-    print(f"OAUTH_REDIRECT_URI: {oauth.OAUTH_REDIRECT_URI}")
-    print(f"OAUTH_SCOPE: {oauth.OAUTH_SCOPE}")
+    logger.debug("Login route hit; auth_url=%s token_url=%s redirect_uri=%s scope=%s",
+                 oauth.OAUTH_AUTH_URL, oauth.OAUTH_TOKEN_URL, oauth.OAUTH_REDIRECT_URI, oauth.OAUTH_SCOPE)
     
     try:
         if not oauth.OAUTH_CLIENT_ID:
-            print("Error: OAUTH_CLIENT_ID not set")
+            logger.error("OAUTH_CLIENT_ID not set")
             return jsonify({'error': 'OAuth client ID not configured'}), 500
         if not oauth.OAUTH_AUTH_URL:
-            print("Error: OAUTH_AUTH_URL not set")
+            logger.error("OAUTH_AUTH_URL not set")
             return jsonify({'error': 'OAuth auth URL not configured'}), 500
         if not oauth.OAUTH_TOKEN_URL:
-            print("Error: OAUTH_TOKEN_URL not set")
+            logger.error("OAUTH_TOKEN_URL not set")
             return jsonify({'error': 'OAuth token URL not configured'}), 500
             
         auth_url = oauth.build_authorize_url()
-        print(f"Generated auth URL: {auth_url}")
         # Redirect user to Snowflake OAuth authorize URL
         return redirect(auth_url)
     except Exception as e:
-        print(f"Error in login route: {str(e)}")
+        logger.error("Error in login route: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/oauth/callback')
 def oauth_callback():
     # Handle redirect from Snowflake OAuth
-    print("OAuth callback received")
     code = request.args.get('code')
     state = request.args.get('state')
-    print(f"Code: {code}")
-    print(f"State: {state}")
     
     if not code:
-        print("Error: No code received")
+        logger.warning("OAuth callback without authorization code")
         return "No authorization code received.", 400
         
     if not state:
-        print("Error: No state received")
+        logger.warning("OAuth callback without state parameter")
         return "No state parameter received.", 400
         
-    print("Attempting to exchange code for token")
     if not oauth.exchange_code(code):
-        print("Token exchange failed")
+        logger.warning("OAuth token exchange failed")
         return "OAuth token exchange failed.", 400
         
-    print("OAuth flow completed successfully")
+    logger.info("OAuth flow completed successfully")
+    start_warmup(oauth.get_access_token())
     return redirect(url_for('index'))
 
 @app.route('/auth/status')
 def auth_status():
     authed = oauth.authenticated()
-    print('auth_status called; authenticated=', authed)
-    # Optional: print session keys for debugging (omit token values for brevity)
-    print('Session keys:', list(session.keys()))
-    return jsonify({'authenticated': authed})
+    if not authed:
+        # Warm-up progress is server state; anonymous callers only learn they are signed out
+        return jsonify({'authenticated': False})
+    return jsonify({'authenticated': True, 'warmup': warmup.status()})
 
 @app.route('/auth/logout', methods=['POST'])
 def auth_logout():
@@ -345,6 +448,25 @@ def admin_ping():
 def ping():
     return 'pong', 200
 
+# Bearer token Prometheus sends to scrape /metrics; without it only signed-in users can read them
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Prometheus scrape endpoint (labels are route templates and method names only)
+@app.route('/metrics')
+def prometheus_metrics():
+    supplied = request.headers.get('Authorization', '')
+    if METRICS_TOKEN and secrets.compare_digest(supplied.encode(), f'Bearer {METRICS_TOKEN}'.encode()):
+        return _metrics_response()
+    return _signed_in_metrics()
+
+@require_oauth
+@passive_session
+def _signed_in_metrics():
+    return _metrics_response()
+
+def _metrics_response():
+    return Response(metrics.REGISTRY.render(), mimetype=metrics.CONTENT_TYPE)
+
 # ------------------ Grant Permissions API (Phase 2 Stub) ------------------
 
 # In a real implementation, these will query Snowflake ACCOUNT_USAGE views.
@@ -372,6 +494,19 @@ def list_schemas():
     except Exception as e:
         return error_response(e)
 
+@app.route('/schemas/tree')
+@deadline_budget(deadline.SLOW_REQUEST_DEADLINE_SECONDS)
+@require_oauth
+def list_schema_tree():
+    """Return every database with its schemas, loaded in parallel and cached."""
+    ensure_sf_conn()
+    try:
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+        tree = sfc.client.list_schema_tree(refresh=refresh)
+        return jsonify({"success": True, "data": tree})
+    except Exception as e:
+        return error_response(e)
+
 @app.route('/roles')
 @require_oauth
 def list_roles():
@@ -415,7 +550,20 @@ def get_role_grants(role_name):
     except Exception as e:
         return error_response(e)
 
+@app.route('/roles/<role_name>/details')
+@require_oauth
+def get_role_details(role_name):
+    """Privileges and grantees of a role in one response, for the role details dialog."""
+    ensure_sf_conn()
+    try:
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+        details = sfc.client.get_role_details(role_name, refresh=refresh)
+        return jsonify({"success": True, "data": details})
+    except Exception as e:
+        return error_response(e)
+
 @app.route('/grant_permissions', methods=['POST'])
+@deadline_budget(deadline.SLOW_REQUEST_DEADLINE_SECONDS)
 @require_oauth
 def grant_permissions():
     payload = request.json or {}
@@ -426,13 +574,16 @@ def grant_permissions():
         schema = payload.get('schema')
         role = payload.get('role')
         warehouse = payload.get('warehouse')
+        dry_run = bool(payload.get('dry_run', False))
+        # Opt-in only: the plan does not model the object-level and future grants
+        skip_if_satisfied = bool(payload.get('skip_if_satisfied', False))
 
         # Validate required fields
         if not warehouse:
             return jsonify({'success': False, 'error': 'Warehouse is required'}), 400
 
         # Enhanced logging
-        print(f"Grant request: {perm_type} on {db}.{schema} to role {role} using warehouse {warehouse}")
+        logger.info("Grant request: %s on %s.%s to role %s using warehouse %s", perm_type, db, schema, role, warehouse)
 
         # Set the warehouse before executing stored procedure
         sfc.client.set_warehouse(warehouse)
@@ -450,13 +601,32 @@ def grant_permissions():
             return jsonify({'success': False, 'error': f'Unknown permission type: {perm_type}'}), 400
 
         proc_name, args = proc_map[perm_type]
-        print(f"Executing stored procedure: {proc_name} with args: {args}")
-        
+        verb = "granted" if "grant" in perm_type else "revoked"
+
+        # Advisory diff against a fresh SHOW GRANTS TO ROLE (container-level privileges only)
+        plan = None
+        if dry_run or skip_if_satisfied:
+            try:
+                plan = sfc.client.plan_grant(perm_type, db, schema, role)
+            except Exception as plan_error:
+                if dry_run:
+                    raise
+                logger.warning("Grant plan unavailable, calling procedure anyway: %s", plan_error)
+
+        if dry_run:
+            return jsonify({'success': True, 'dry_run': True, 'plan': plan})
+
+        if skip_if_satisfied and plan is not None and plan['noop']:
+            logger.info("Skipping %s: role %s already matches requested state", proc_name, role)
+            return jsonify({'success': True, 'skipped': True, 'message': f'Permissions already {verb}; no changes needed', 'plan': plan})
+
         result = sfc.client.call_stored_procedure(proc_name, args)
-        return jsonify({'success': True, 'message': f'Permissions {"granted" if "grant" in perm_type else "revoked"} successfully', 'details': result})
+        sfc.client.invalidate_role(role or '')
+        publish_change('role_grants', role=role, action=verb)
+        return jsonify({'success': True, 'message': f'Permissions {verb} successfully', 'details': result, 'plan': plan})
     except Exception as e:
         error_msg = str(e)
-        print(f"Detailed error in grant_permissions: {error_msg}")
+        logger.error("Error in grant_permissions: %s", error_msg)
         
         # Check for specific permission-related errors
         if "Insufficient privileges" in error_msg:
@@ -479,16 +649,28 @@ def list_warehouses():
         return error_response(e)
 
 @app.route('/keys/users')
+@deadline_budget(deadline.SLOW_REQUEST_DEADLINE_SECONDS)
 @require_oauth
 def list_users_with_keys():
     """List all users with enhanced key information for key management."""
     ensure_sf_conn()
     try:
-        users = sfc.client.list_users_with_keys_optimized()
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+        users = sfc.client.list_users_with_keys_optimized(refresh=refresh)
         return jsonify({"success": True, "data": users})
     except Exception as e:
         return error_response(e)
 
+@app.route('/keys/hygiene')
+@require_oauth
+def key_hygiene_summary():
+    """Counts of users by RSA key, MFA, password and lock status, without the user list."""
+    ensure_sf_conn()
+    try:
+        return jsonify({"success": True, "data": sfc.client.key_hygiene()})
+    except Exception as e:
+        return error_response(e)
+
 @app.route('/keys/users/<username>/details')
 @require_oauth
 def get_user_key_details(username):
@@ -507,6 +689,7 @@ def get_user_key_details(username):
         return error_response(e)
 
 @app.route('/keys/users/<username>/set', methods=['POST'])
+@deadline_budget(deadline.SLOW_REQUEST_DEADLINE_SECONDS)
 @require_oauth
 def set_user_public_key(username):
     """Set or update RSA public key for a user using enhanced stored procedure."""
@@ -537,6 +720,7 @@ def set_user_public_key(username):
             )
         
         if result['success']:
+            user_changed(username, 'key_set', key_set_changes(key_number, unset_password, new_type))
             return jsonify(result)
         else:
             return jsonify(result), 400
@@ -565,6 +749,7 @@ def unset_user_public_key(username):
         result = sfc.client.unset_user_public_key(username, key_number)
         
         if result['success']:
+            user_changed(username, 'key_unset', {'has_rsa_public_key': False} if key_number == 1 else {})
             return jsonify(result)
         else:
             return jsonify(result), 400
@@ -589,6 +774,7 @@ def debug_procedures():
         return error_response(e)
 
 @app.route('/users')
+@deadline_budget(deadline.SLOW_REQUEST_DEADLINE_SECONDS)
 @require_oauth
 def list_users():
     """List all users with their details."""
@@ -613,6 +799,7 @@ def unlock_user(username):
             'UPLAND_MAINTENANCE.SECURITY.sp_unlock_user', 
             [username]
         )
+        user_changed(username, 'unlocked', {'snowflake_lock': False})
         return jsonify({
             "success": True, 
             "message": f"User {username} unlocked successfully",
@@ -620,7 +807,7 @@ def unlock_user(username):
         })
     except Exception as e:
         error_msg = str(e)
-        print(f"Error unlocking user {username}: {error_msg}")
+        logger.error("Error unlocking user %s: %s", username, error_msg)
         
         if "does not exist" in error_msg.lower():
             return jsonify({
@@ -650,6 +837,7 @@ def reset_user_password(username):
             'UPLAND_MAINTENANCE.SECURITY.sp_reset_password', 
             [username, new_password]
         )
+        user_changed(username, 'password_reset', {'has_password': True})
         return jsonify({
             "success": True, 
             "message": f"Password reset for user {username}",
@@ -657,7 +845,7 @@ def reset_user_password(username):
         })
     except Exception as e:
         error_msg = str(e)
-        print(f"Error resetting password for user {username}: {error_msg}")
+        logger.error("Error resetting password for user %s: %s", username, error_msg)
         
         if "does not exist" in error_msg.lower():
             return jsonify({
@@ -681,6 +869,7 @@ def unset_user_password(username):
             'UPLAND_MAINTENANCE.SECURITY.sp_unset_password', 
             [username]
         )
+        user_changed(username, 'password_unset', {'has_password': False})
         return jsonify({
             "success": True, 
             "message": f"Password unset for user {username}",
@@ -688,7 +877,7 @@ def unset_user_password(username):
         })
     except Exception as e:
         error_msg = str(e)
-        print(f"Error unsetting password for user {username}: {error_msg}")
+        logger.error("Error unsetting password for user %s: %s", username, error_msg)
         
         if "does not exist" in error_msg.lower():
             return jsonify({
@@ -705,6 +894,7 @@ def clear_cache():
     ensure_sf_conn()
     try:
         sfc.client.clear_users_cache()
+        publish_change('users', action='reloaded')
         return jsonify({"success": True, "message": "User cache cleared"})
     except Exception as e:
         return error_response(e)
@@ -712,91 +902,21 @@ def clear_cache():
 @app.route('/logs')
 @require_oauth
 def get_server_logs():
-    """Get server logs with filtering options."""
+    """Get recent server log records from the in-memory ring buffer."""
     try:
-        lines = request.args.get('lines', '100', type=int)
+        lines = max(1, min(request.args.get('lines', 100, type=int) or 100, log_buffer.capacity))
         level_filter = request.args.get('level', '')
         search_term = request.args.get('search', '')
-        
-        # Get log entries
-        log_entries = []
-        
-        try:
-            import datetime
-            current_time = datetime.datetime.now()
-            
-            # For a real implementation, you would read from actual log files
-            # For now, we'll provide sample data that demonstrates the functionality
-            log_levels = ['INFO', 'DEBUG', 'WARNING', 'ERROR']
-            log_sources = ['app', 'snowflake.connector', 'werkzeug', 'oauth']
-            
-            sample_messages = [
-                "Successfully connected to Snowflake",
-                "Processing user authentication", 
-                "Loading user data from cache",
-                "Database query completed in 0.5s",
-                "OAuth token refreshed",
-                "127.0.0.1 - - [GET /auth/status HTTP/1.1] 200 -",
-                "User management data loaded: 75 users",
-                "Role privileges query executed",
-                "Cache hit for user lookup",
-                "Warehouse context set successfully",
-                "Starting list_users_from_view method",
-                "View query successful! Retrieved 75 rows",
-                "Single view call loaded 75 users",
-                "Current context - Role: SYSADMIN, User: ADMIN_MSTEGMAIER",
-                "Finding available warehouses",
-                "Successfully set warehouse to UPLAND_ENGINEERING_WH"
-            ]
-            
-            for i in range(lines):
-                timestamp = (current_time - datetime.timedelta(minutes=i*2)).strftime('%Y-%m-%d %H:%M:%S,%f')[:-3]
-                level = log_levels[i % len(log_levels)]
-                source = log_sources[i % len(log_sources)]
-                message = sample_messages[i % len(sample_messages)]
-                
-                # Make some entries errors/warnings for realism
-                if i % 15 == 0:
-                    level = 'ERROR'
-                    message = "Connection timeout to database"
-                elif i % 8 == 0:
-                    level = 'WARNING'
-                    message = "Slow query detected (>2s): SELECT * FROM V_USER_KEY_MANAGEMENT"
-                
-                log_entry = f"{timestamp} {level} {source}: {message}"
-                
-                # Apply filters
-                if level_filter and level != level_filter:
-                    continue
-                if search_term and search_term.lower() not in log_entry.lower():
-                    continue
-                    
-                log_entries.append({
-                    'timestamp': timestamp,
-                    'level': level,
-                    'source': source,
-                    'message': message,
-                    'full_entry': log_entry
-                })
-            
-            # Sort by timestamp (newest first)
-            log_entries.sort(key=lambda x: x['timestamp'], reverse=True)
-            log_entries = log_entries[:lines]  # Limit to requested number of lines
-            
-        except Exception as e:
-            logger.error(f"Error generating log entries: {e}")
-            log_entries = [{
-                'timestamp': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S,%f')[:-3],
-                'level': 'ERROR',
-                'source': 'app',
-                'message': f'Failed to read server logs: {str(e)}',
-                'full_entry': f'ERROR: Failed to read server logs: {str(e)}'
-            }]
-        
+        after_seq = request.args.get('after', -1, type=int)
+
+        log_entries = log_buffer.query(lines=lines, level=level_filter, search=search_term, after_seq=after_seq)
+
         return jsonify({
             'success': True,
             'logs': log_entries,
             'total_lines': len(log_entries),
+            'last_seq': log_buffer.last_seq,
+            'buffer': log_buffer.stats(),
             'filters': {
                 'level': level_filter,
                 'search': search_term,
@@ -814,7 +934,136 @@ def get_server_logs():
             'total_lines': 0
         }), 500
 
+# ------------------ Server-Sent Events ------------------
+
+# Seconds a stream stays open; EventSource then reconnects, which re-runs require_oauth
+SSE_MAX_SECONDS = int(os.getenv('SSE_MAX_SECONDS', '300'))
+# Streams one worker process serves at once.  Each holds a thread, so keep this
+# below the thread count (GUNICORN_THREADS); extra tabs are told to retry later
+SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', '4'))
+# Idle streams send a comment this often, after checking the session is still valid
+SSE_KEEPALIVE_SECONDS = 15
+# Reconnect delay sent to a tab that found every stream slot taken
+SSE_BUSY_RETRY_MS = 30000
+
+_sse_lock = Lock()
+_sse_open = 0
+
+def _stream_session_valid():
+    """Re-read the session behind a running stream; logout, token expiry or inactivity end it."""
+    current = app.session_interface.open_session(app, request)
+    now = time.time()
+    if not current.get(oauth.TOKEN_KEY) or now > current.get(oauth.EXP_KEY, 0):
+        return False
+    return now - current.get('last_activity', 0) <= sec.INACTIVITY_TIMEOUT_SECONDS
+
+def _release_stream_slot():
+    global _sse_open
+    with _sse_lock:
+        _sse_open -= 1
+
+def sse_response(next_batch):
+    """Serve SSE chunks from *next_batch(timeout)* for at most SSE_MAX_SECONDS.
+
+    *next_batch* returns the chunks that became available within *timeout*
+    seconds, or None if nothing did.
+    """
+    global _sse_open
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    with _sse_lock:
+        full = _sse_open >= SSE_MAX_STREAMS
+        if not full:
+            _sse_open += 1
+    if full:
+        # A 200 with a retry hint makes EventSource come back later; an error status would stop it
+        return Response(f'retry: {SSE_BUSY_RETRY_MS}\n\n', mimetype='text/event-stream', headers=headers)
+
+    def generate():
+        ends_at = time.monotonic() + SSE_MAX_SECONDS
+        while True:
+            remaining = ends_at - time.monotonic()
+            if remaining <= 0:
+                return
+            chunks = next_batch(min(SSE_KEEPALIVE_SECONDS, remaining))
+            if chunks is not None:
+                yield from chunks
+                continue
+            if not _stream_session_valid():
+                return
+            yield ': keep-alive\n\n'
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream', headers=headers)
+    # Runs even if the client leaves before the first chunk is sent
+    response.call_on_close(_release_stream_slot)
+    return response
+
+@app.route('/logs/stream')
+@require_oauth
+@passive_session
+def stream_server_logs():
+    """Tail the log buffer as Server-Sent Events, honouring level/search filters."""
+    level_filter = request.args.get('level', '')
+    search_term = request.args.get('search', '')
+    # EventSource resends the last id on reconnect so no records are skipped
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('after')
+    cursor = int(last_id) if last_id and last_id.lstrip('-').isdigit() else log_buffer.last_seq
+
+    def next_batch(timeout):
+        nonlocal cursor
+        if not log_buffer.wait_for(cursor, timeout=timeout):
+            return None
+        newest = log_buffer.last_seq
+        entries = log_buffer.query(lines=log_buffer.capacity, level=level_filter, search=search_term, after_seq=cursor)
+        cursor = newest
+        return [f"id: {entry['seq']}\ndata: {json.dumps(entry)}\n\n" for entry in reversed(entries)]
+
+    return sse_response(next_batch)
+
+def publish_change(kind, **fields):
+    """Tell open tabs about a change; a failure here must not fail the mutation itself."""
+    try:
+        change_feed.publish(kind, **fields)
+    except Exception as e:
+        logger.warning("Could not publish %s change: %s", kind, e)
+
+def user_changed(username, action, changes):
+    """Patch the user's row in the cached listing (or drop the listing) and tell open tabs."""
+    if not changes or not sfc.client.patch_cached_user(username, changes):
+        sfc.client.clear_users_cache()
+    publish_change('user', name=username, action=action, changes=changes)
+
+def key_set_changes(key_number, unset_password=False, new_type=None):
+    """User fields known to have changed after an RSA key was set."""
+    # The users view's HAS_RSA_PUBLIC_KEY only reflects the primary key
+    changes = {'has_rsa_public_key': True} if key_number == 1 else {}
+    if unset_password:
+        changes['has_password'] = False
+    if new_type and new_type != 'NULL':
+        changes['type'] = new_type.upper()
+    return changes
+
+@app.route('/events/stream')
+@require_oauth
+@passive_session
+def stream_changes():
+    """Stream change events (backend/change_feed.py) as Server-Sent Events."""
+    # EventSource resends the last id on reconnect so no change is missed
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('after')
+    cursor = int(last_id) if last_id and last_id.isdigit() else change_feed.last_seq
+
+    def next_batch(timeout):
+        nonlocal cursor
+        if not change_feed.wait_for(cursor, timeout=timeout):
+            return None
+        events = change_feed.since(cursor)
+        if events:
+            cursor = events[-1]['seq']
+        return [f"id: {event['seq']}\ndata: {json.dumps(event)}\n\n" for event in events]
+
+    return sse_response(next_batch)
+
 @app.route('/keys/generate-and-rotate', methods=['POST'])
+@deadline_budget(deadline.SLOW_REQUEST_DEADLINE_SECONDS)
 @require_oauth
 def generate_and_rotate_key():
     """Generate encrypted RSA key pair and optionally set in Snowflake with enhanced options."""
@@ -868,37 +1117,32 @@ def generate_and_rotate_key():
         # Optionally set in Snowflake using enhanced stored procedure
         if set_in_snowflake:
             try:
-                print(f"Attempting to set key in Snowflake for user: {username}")
-                print(f"Additional options - unset_password: {unset_password}, new_type: {new_type}")
+                logger.info("Setting key in Snowflake for %s (unset_password=%s, new_type=%s)", username, unset_password, new_type)
                 ensure_sf_conn()
                 
                 # Get the public key content from the generated file
                 public_key_filename = result['files'].get('public_key')
-                print(f"Public key filename: {public_key_filename}")
                 
                 if public_key_filename:
                     public_key_path = os.path.join(app.config['UPLOAD_FOLDER'], username, public_key_filename)
-                    print(f"Looking for public key at: {public_key_path}")
                     
                     if os.path.exists(public_key_path):
                         with open(public_key_path, 'r') as f:
                             public_key_content = f.read().strip()
-                        print(f"Successfully read public key content ({len(public_key_content)} chars)")
                         
                         # Use the enhanced stored procedure
-                        print(f"Calling update_user_rsa_key for {username}")
                         sf_result = sfc.client.update_user_rsa_key(
                             username, 
                             public_key_content, 
                             unset_password, 
                             new_type if new_type and new_type != 'NULL' else None
                         )
-                        print(f"Snowflake update_user_rsa_key result: {sf_result}")
                         
                         if sf_result.get('success'):
                             response_data['snowflake_success'] = True
+                            user_changed(username, 'key_set', key_set_changes(1, unset_password, new_type))
                             response_data['actions_performed'] = sf_result.get('actions_performed', {})
-                            print("✓ Successfully updated RSA key in Snowflake with enhanced options")
+                            logger.info("Updated RSA key in Snowflake for %s", username)
                         else:
                             # Generate manual command for fallback - ensure key content is stripped
                             lines = public_key_content.strip().split('\n')
@@ -919,19 +1163,19 @@ def generate_and_rotate_key():
                             # Extract error from either 'error' or 'message' field
                             error_msg = sf_result.get('error') or sf_result.get('message', 'Unknown error')
                             response_data['snowflake_error'] = error_msg
-                            print(f"✗ Failed to update RSA key in Snowflake: {error_msg}")
+                            logger.warning("Failed to update RSA key in Snowflake for %s: %s", username, error_msg)
                     else:
                         # Still provide a fallback command even if file not found
                         response_data['snowflake_command'] = f"-- Could not find generated public key file: {public_key_filename}\n-- Please download the public key file and run the enhanced stored procedure manually"
                         response_data['snowflake_error'] = 'Public key file not found'
-                        print(f"✗ Public key file not found at: {public_key_path}")
+                        logger.warning("Public key file not found at %s", public_key_path)
                 else:
                     response_data['snowflake_command'] = f"-- No public key file generated for {username}\n-- Please ensure key generation completed successfully"
                     response_data['snowflake_error'] = 'No public key in generation result'
-                    print("✗ No public key file in generation result")
+                    logger.warning("No public key file in generation result for %s", username)
                     
             except Exception as sf_error:
-                print(f"Exception while setting key in Snowflake: {str(sf_error)}")
+                logger.error("Exception while setting key in Snowflake for %s: %s", username, sf_error)
                 # Generate manual command for fallback
                 public_key_content = "-- Replace with actual public key content --"
                 try:
@@ -958,22 +1202,22 @@ def generate_and_rotate_key():
                 
                 response_data['snowflake_command'] = f"-- Call the stored procedure manually:\nCALL UPLAND_MAINTENANCE.SECURITY.sp_update_user_rsa_key('{username}', '{clean_key_content}', {str(unset_password).lower()}, {repr(new_type)});"
                 response_data['snowflake_error'] = str(sf_error)
-                print("✗ Generated fallback command due to exception")
         
         return jsonify(response_data)
         
     except Exception as e:
-        print(f"Error in generate_and_rotate_key: {str(e)}")
+        logger.error("Error in generate_and_rotate_key: %s", e)
         return error_response(e)
 
 # helper to ensure connection
-def ensure_sf_conn():
+def ensure_sf_conn(token: str | None = None):
     # Skip connection during unit tests
     if app.config.get('TESTING'):
         return
     if sfc.client._conn is not None:
         return
-    token = oauth.get_access_token()
+    # Background callers pass the token explicitly since they have no session
+    token = token or oauth.get_access_token()
     if not token:
         raise RuntimeError('No OAuth token in session')
     account_raw = os.getenv('SNOWFLAKE_ACCOUNT', 'UPLAND-EDP')
@@ -984,9 +1228,19 @@ def ensure_sf_conn():
     logger.info('Opening Snowflake connection as %s role=%s warehouse=%s token=%s', user, role, warehouse, _redact(token))
     sfc.client.connect(pat=token, account=account, user=user, warehouse=warehouse, role=role)
 
+def start_warmup(token: str | None) -> None:
+    """Open the connection and preload caches in the background after login."""
+    if not WARMUP_ON_LOGIN or not token or app.config.get('TESTING'):
+        return
+    warmup.start(lambda: ensure_sf_conn(token), default_steps(sfc.client))
+
 # Standard JSON error envelope
 def error_response(exc: Exception, status: int = 500):
-    if isinstance(exc, sf_errors.Error):
+    if isinstance(exc, deadline.DeadlineExceeded):
+        status = 504
+    # The connector is imported lazily; if it never was, exc cannot be one of its errors
+    sf_errors = sys.modules.get('snowflake.connector.errors')
+    if sf_errors is not None and isinstance(exc, sf_errors.Error):
         msg = exc.msg or str(exc)
     else:
         msg = str(exc)
@@ -998,5 +1252,7 @@ def error_response(exc: Exception, status: int = 500):
 if __name__ == '__main__':
     # Open browser after a short delay
     Timer(1.5, open_browser).start()
+    # Pick up edits to static/ without a restart
+    asset_manifest.auto_reload = True
     # Run on port 5001 to match OAuth redirect URI
     app.run(host='127.0.0.1', port=5001, debug=True) 
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""assets.py – content-hashed static assets without a build step.
+
+At startup every file under ``static/`` is read, hashed and compressed once.
+Templates link to ``asset_url('js/app.js')``, which resolves to
+``/assets/js/app.<hash>.js``; because the URL changes whenever the content
+does, responses carry ``Cache-Control: immutable`` and browsers only refetch
+the small HTML page on repeat visits.  Each asset is served gzip- or
+brotli-compressed when the client accepts it (brotli needs the optional
+``brotli`` package).
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from typing import Dict, NamedTuple
+
+from flask import Blueprint, Flask, Response, abort, request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+# Hex digits of the content hash embedded in asset file names
+HASH_LENGTH = 12
+# Smaller files are not worth compressing
+MIN_COMPRESS_BYTES = 512
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class Asset(NamedTuple):
+    url_path: str  # path below /assets/, including the content hash
+    digest: str
+    mimetype: str
+    mtime: float
+    identity: bytes
+    gzip: bytes | None
+    br: bytes | None
+
+
+def _hashed_name(path: str, digest: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest}{ext}"
+
+
+class AssetManifest:
+    """Hashed, precompressed copies of the files in *static_folder*.
+
+    With *auto_reload* (the debug server) changed files are re-read when their
+    URL is next requested.
+    """
+
+    def __init__(self, static_folder: str, auto_reload: bool = False) -> None:
+        self.static_folder = static_folder
+        self.auto_reload = auto_reload
+        self._lock = threading.Lock()
+        # Bumped whenever an asset is (re)loaded, so pages linking to assets know to re-render
+        self.version = 0
+        self._by_name: Dict[str, Asset] = {}
+        self._by_url: Dict[str, Asset] = {}
+        for dirpath, _, filenames in os.walk(static_folder):
+            for filename in filenames:
+                full = os.path.join(dirpath, filename)
+                self._load(os.path.relpath(full, static_folder).replace(os.sep, "/"))
+
+    def _load(self, name: str) -> Asset:
+        full = os.path.join(self.static_folder, name)
+        with open(full, "rb") as fh:
+            data = fh.read()
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        compressible = len(data) >= MIN_COMPRESS_BYTES and (
+            mimetype.startswith("text/") or mimetype in ("application/javascript", "application/json", "image/svg+xml")
+        )
+        asset = Asset(
+            url_path=_hashed_name(name, digest),
+            digest=digest,
+            mimetype=mimetype,
+            mtime=os.path.getmtime(full),
+            identity=data,
+            gzip=gzip.compress(data, compresslevel=9, mtime=0) if compressible else None,
+            br=brotli.compress(data, quality=11) if compressible and brotli is not None else None,
+        )
+        with self._lock:
+            old = self._by_name.get(name)
+            if old is not None:
+                self._by_url.pop(old.url_path, None)
+            self._by_name[name] = asset
+            self._by_url[asset.url_path] = asset
+            self.version += 1
+        return asset
+
+    def get(self, name: str) -> Asset:
+        asset = self._by_name.get(name)
+        if asset is None:
+            raise KeyError(name)
+        if self.auto_reload and os.path.getmtime(os.path.join(self.static_folder, name)) != asset.mtime:
+            asset = self._load(name)
+        return asset
+
+    def refresh(self) -> int:
+        """Re-read changed files when auto-reloading; returns the current :py:attr:`version`."""
+        if self.auto_reload:
+            for name in list(self._by_name):
+                self.get(name)
+        return self.version
+
+    def url(self, name: str) -> str:
+        return "/assets/" + self.get(name).url_path
+
+    def by_url(self, url_path: str) -> Asset | None:
+        return self._by_url.get(url_path)
+
+
+def _accepts(encoding: str) -> bool:
+    return request.accept_encodings[encoding] > 0
+
+
+def init_app(app: Flask) -> AssetManifest:
+    """Register ``/assets/<path>`` and the ``asset_url`` template global on *app*."""
+    manifest = AssetManifest(app.static_folder, auto_reload=app.debug)
+    bp = Blueprint("assets", __name__)
+
+    @bp.route("/assets/<path:url_path>")
+    def hashed_asset(url_path: str) -> Response:
+        asset = manifest.by_url(url_path)
+        if asset is None:
+            abort(404)
+        if asset.br is not None and _accepts("br"):
+            encoding, body = "br", asset.br
+        elif asset.gzip is not None and _accepts("gzip"):
+            encoding, body = "gzip", asset.gzip
+        else:
+            encoding, body = None, asset.identity
+        # Each encoding is a different representation, so each gets its own strong tag
+        etag = f"{asset.digest}-{encoding}" if encoding else asset.digest
+        if request.if_none_match.contains(etag):
+            resp = Response(status=304)
+        else:
+            resp = Response(body, mimetype=asset.mimetype)
+            if encoding:
+                resp.headers["Content-Encoding"] = encoding
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        resp.vary.add("Accept-Encoding")
+        return resp
+
+    app.register_blueprint(bp)
+    app.add_template_global(manifest.url, "asset_url")
+    return manifest
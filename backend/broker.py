@@ -0,0 +1,340 @@
+"""broker.py – Snowflake connection broker for multi-worker deployments.
+
+One broker process owns the Snowflake session, the connection pool and the
+metadata caches; web workers talk to it over a Unix socket instead of each
+opening their own session.  The total session count and cache warmth then no
+longer depend on how many workers run.
+
+    python -m backend.broker --socket /run/snowflake-admin/broker.sock
+    SF_BROKER_SOCKET=/run/snowflake-admin/broker.sock gunicorn -c gunicorn.conf.py wsgi:app
+
+Wire format: every message is a 6-byte header (protocol version, flags,
+big-endian body length) followed by a compact JSON body.  Requests carry
+``[method, args, kwargs]``, plus the seconds left to the worker request's
+deadline when it has one (see backend.deadline); responses carry the return value, or
+``[exception type, message]`` when the ERROR flag is set.  Lists of dicts that
+share their keys (user, role and grant listings) are sent as a key list plus
+value rows, and the encoded body of a cached result is reused until the cache
+entry changes.
+
+The framing is binary but the body is JSON rather than struct- or
+msgpack-encoded.  The payloads are almost all strings (names, comments,
+timestamps), so a binary encoding would save little once the repeated dict keys
+are folded into the key list above. JSON needs no extra dependency, and it
+shares its datetime handling with the persistent cache (``backend.cache_store``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+from backend import deadline
+from backend.cache_store import json_default, json_object_hook
+
+logger = logging.getLogger(__name__)
+
+# Unix socket of a running broker; workers use it instead of their own session when set
+BROKER_SOCKET = os.getenv("SF_BROKER_SOCKET", "")
+
+PROTOCOL_VERSION = 1
+FLAG_ERROR = 0x01
+_HEADER = struct.Struct("!BBI")
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+
+# SnowflakeClient methods workers may call; everything else stays broker-internal
+REMOTE_METHODS = frozenset({
+    "connect", "is_connected", "pool_stats", "singleflight_stats", "invalidate_cache", "clear_users_cache",
+    "call_stored_procedure", "list_databases", "list_schemas", "list_schema_tree",
+    "list_roles", "list_roles_detailed", "get_role_privileges", "get_role_privileges_cached",
+    "get_role_grants", "get_role_details", "invalidate_role", "plan_grant", "list_warehouses",
+    "set_warehouse", "list_stored_procedures",
+    "list_users", "list_users_with_keys", "list_users_with_keys_optimized", "get_user_details",
+    "set_user_public_key", "unset_user_public_key", "update_user_rsa_key",
+    "patch_cached_user", "key_hygiene",
+})
+# Safe to resend after the broker restarts mid-call
+_IDEMPOTENT = frozenset(m for m in REMOTE_METHODS if m.startswith(("list_", "get_", "plan_", "is_", "pool_")))
+
+# Exception types re-raised as themselves in the worker
+_EXCEPTIONS: Dict[str, type] = {
+    "ValueError": ValueError,
+    "RuntimeError": RuntimeError,
+    "KeyError": KeyError,
+    "PermissionError": PermissionError,
+    "DeadlineExceeded": deadline.DeadlineExceeded,
+}
+
+
+class BrokerError(Exception):
+    """Raised in a worker for broker-side exceptions without a local equivalent."""
+
+    def __init__(self, type_name: str, message: str) -> None:
+        super().__init__(message)
+        self.type_name = type_name
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("broker connection closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def _pack(value: Any) -> Any:
+    """Turn a list of same-keyed dicts into ``{"__table__": keys, "rows": [...]}``."""
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+        keys = list(value[0])
+        if all(type(row) is dict and len(row) == len(keys) for row in value):
+            try:
+                return {"__table__": keys, "rows": [[row[k] for k in keys] for row in value]}
+            except KeyError:
+                pass
+    return value
+
+
+def _unpack_hook(obj: Dict[str, Any]) -> Any:
+    if "__table__" in obj:
+        keys = obj["__table__"]
+        return [dict(zip(keys, row)) for row in obj["rows"]]
+    return json_object_hook(obj)
+
+
+def encode_body(payload: Any) -> bytes:
+    return json.dumps(_pack(payload), default=json_default, separators=(",", ":")).encode()
+
+
+def send_message(sock: socket.socket, payload: Any, flags: int = 0, body: bytes | None = None) -> None:
+    """Send *payload*, or an already encoded *body*."""
+    if body is None:
+        body = encode_body(payload)
+    sock.sendall(_HEADER.pack(PROTOCOL_VERSION, flags, len(body)) + body)
+
+
+def recv_message(sock: socket.socket) -> Tuple[int, Any]:
+    """Read one message; returns ``(flags, payload)``."""
+    version, flags, size = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if version != PROTOCOL_VERSION:
+        raise ConnectionError(f"unsupported broker protocol version {version}")
+    if size > MAX_MESSAGE_BYTES:
+        raise ConnectionError(f"broker message too large ({size} bytes)")
+    return flags, json.loads(_recv_exact(sock, size), object_hook=_unpack_hook)
+
+
+# ---------------------------------------------------------------------------
+# Broker side
+# ---------------------------------------------------------------------------
+class _Handler(socketserver.BaseRequestHandler):
+    server: "BrokerServer"
+
+    def handle(self) -> None:
+        while True:
+            try:
+                _, (method, args, kwargs, *budget) = recv_message(self.request)
+            except (ConnectionError, OSError):
+                return
+            except (ValueError, TypeError) as e:
+                logger.warning("Dropping malformed broker request: %s", e)
+                return
+            try:
+                if budget:
+                    result = self._dispatch_within(budget[0], method, args, kwargs)
+                else:
+                    result = self.server.dispatch(method, args, kwargs)
+                send_message(self.request, result, body=self.server.encoded(method, args, kwargs, result))
+            except (ConnectionError, OSError):
+                return
+            except Exception as e:
+                send_message(self.request, [type(e).__name__, str(e)], FLAG_ERROR)
+
+    def _dispatch_within(self, seconds: float, method: str, args: list, kwargs: dict) -> Any:
+        """Run the call under the worker's deadline; a worker hanging up cancels its statements."""
+        active = deadline.Deadline(seconds)
+        deadline.watch_disconnect(active, self.request)
+        try:
+            with deadline.activate(active):
+                return self.server.dispatch(method, args, kwargs)
+        finally:
+            deadline.unwatch_disconnect(active)
+
+
+class BrokerServer(socketserver.ThreadingUnixStreamServer):
+    """Serves :py:data:`REMOTE_METHODS` of *client* on a Unix socket, one thread per worker connection."""
+
+    daemon_threads = True
+    # Encoded responses remembered for reuse while the client returns the same cached object
+    ENCODED_CACHE_SIZE = 64
+
+    def __init__(self, path: str, client: Any) -> None:
+        self.client = client
+        self._encoded: "OrderedDict[str, Tuple[Any, bytes]]" = OrderedDict()
+        self._encoded_lock = threading.Lock()
+        if os.path.exists(path):
+            os.unlink(path)  # stale socket from a previous run
+        old_umask = os.umask(0o177)  # socket file is owner-only
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(old_umask)
+
+    def dispatch(self, method: str, args: list, kwargs: dict) -> Any:
+        if method not in REMOTE_METHODS:
+            raise PermissionError(f"method not available over the broker: {method}")
+        if method == "is_connected":
+            return self.client._conn is not None
+        return getattr(self.client, method)(*args, **kwargs)
+
+    def encoded(self, method: str, args: list, kwargs: dict, result: Any) -> bytes:
+        """Encoded *result*, reused when the call returned the very same object as last time.
+
+        Cache hits in :py:class:`SnowflakeClient` return the stored object
+        itself, so an unchanged entry is only serialised once.
+        """
+        if not isinstance(result, (list, dict)) or not result:
+            return encode_body(result)
+        key = json.dumps([method, args, kwargs], sort_keys=True, default=str)
+        with self._encoded_lock:
+            hit = self._encoded.get(key)
+            if hit is not None and hit[0] is result:
+                self._encoded.move_to_end(key)
+                return hit[1]
+        body = encode_body(result)
+        with self._encoded_lock:
+            # Holding *result* keeps its identity from being reused by a new object
+            self._encoded[key] = (result, body)
+            self._encoded.move_to_end(key)
+            while len(self._encoded) > self.ENCODED_CACHE_SIZE:
+                self._encoded.popitem(last=False)
+        return body
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+class BrokerClient:
+    """Drop-in for :py:class:`~backend.snowflake_client.SnowflakeClient` backed by a broker.
+
+    Each worker thread keeps its own socket to the broker.
+    """
+
+    _warehouse = None  # The broker's session already has its warehouse set
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._connected = False
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self) -> None:
+        self._local = threading.local()
+
+    @property
+    def _conn(self) -> Any:
+        """Truthy once the broker holds a session; mirrors ``SnowflakeClient._conn`` checks."""
+        if not self._connected:
+            self._connected = bool(self._call("is_connected", (), {}))
+        return True if self._connected else None
+
+    def _socket(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.path)
+            self._local.sock = sock
+        return sock
+
+    def _drop_socket(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _call(self, method: str, args: tuple, kwargs: dict) -> Any:
+        active = deadline.current()
+        for attempt in (1, 2):
+            try:
+                sock = self._socket()
+                if active is None:
+                    send_message(sock, [method, list(args), kwargs])
+                    flags, payload = recv_message(sock)
+                else:
+                    # Hanging up on the broker is what makes it cancel the call's statements
+                    with active.running(lambda: sock.shutdown(socket.SHUT_RDWR)):
+                        send_message(sock, [method, list(args), kwargs, active.remaining()])
+                        flags, payload = recv_message(sock)
+                break
+            except (ConnectionError, OSError):
+                self._drop_socket()
+                if active is not None and active.expired:
+                    raise active.error() from None
+                if attempt == 2 or method not in _IDEMPOTENT:
+                    raise
+        if flags & FLAG_ERROR:
+            type_name, message = payload
+            if type_name == "RuntimeError" and "not initialised" in message:
+                self._connected = False  # broker restarted; next ensure_sf_conn reconnects
+            exc_type = _EXCEPTIONS.get(type_name)
+            raise exc_type(message) if exc_type else BrokerError(type_name, message)
+        if method == "connect":
+            self._connected = True
+        return payload
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name not in REMOTE_METHODS:
+            raise AttributeError(name)
+
+        def remote(*args: Any, **kwargs: Any) -> Any:
+            return self._call(name, args, kwargs)
+
+        remote.__name__ = name
+        return remote
+
+
+def main() -> None:
+    from backend import snowflake_client as sfc
+    from backend.cache_store import CACHE_PERSIST_PATH, SQLiteCacheStore
+    from backend.log_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Snowflake connection broker for multi-worker deployments")
+    parser.add_argument("--socket", default=BROKER_SOCKET or "/tmp/snowflake-admin-broker.sock")
+    args = parser.parse_args()
+
+    configure_logging()
+    if CACHE_PERSIST_PATH:
+        restored = sfc.client.attach_store(SQLiteCacheStore(CACHE_PERSIST_PATH))
+        logger.info("Restored %d cache entries from %s", restored, CACHE_PERSIST_PATH)
+
+    server = BrokerServer(args.socket, sfc.client)
+    logger.info("Snowflake broker listening on %s", args.socket)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        sfc.client.close()
+
+
+if __name__ == "__main__":
+    main()
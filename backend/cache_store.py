@@ -0,0 +1,222 @@
+"""cache_store.py – optional on-disk backing store for SnowflakeClient caches.
+
+Disabled unless ``SF_PERSIST_CACHE_PATH`` is set.  Entries are kept in a local
+SQLite file so a restart or deploy can serve the last known metadata while
+fresh data is fetched in the background.  Each entry carries the cache format
+version, the time it was stored and its TTL; only entries that are still valid
+and written by the current format version are loaded at startup.
+
+With ``SF_SHARED_CACHE`` enabled the same file is shared by every worker
+process of a multi-worker deployment: workers read through it on a miss, check
+it for newer or invalidated entries on a hit (at most every
+``SF_SHARED_CHECK_SECONDS``), and take a short lease so only
+one of them runs the Snowflake query for a missing entry.
+"""
+
+from __future__ import annotations
+
+import datetime
+import decimal
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Any, Dict, Tuple
+
+# Path of the SQLite cache file; empty disables persistence
+CACHE_PERSIST_PATH = os.getenv("SF_PERSIST_CACHE_PATH", "")
+# How long a persisted entry may be served after it was stored
+PERSIST_TTL_SECONDS = int(os.getenv("SF_PERSIST_TTL_SECONDS", "3600"))
+# Hard limits on the store; oldest entries are evicted first
+PERSIST_MAX_ENTRIES = int(os.getenv("SF_PERSIST_MAX_ENTRIES", "512"))
+PERSIST_MAX_BYTES = int(os.getenv("SF_PERSIST_MAX_BYTES", str(64 * 1024 * 1024)))
+# Share the store between worker processes (read-through and cross-process invalidation)
+CACHE_SHARED = os.getenv("SF_SHARED_CACHE", "false").lower() in ("1", "true", "yes")
+
+# Bump when the shape of cached values changes so old files are ignored
+CACHE_FORMAT_VERSION = 1
+
+_COLUMNS = ("key", "version", "stored_at", "written_at", "ttl", "size", "value")
+
+
+def json_default(value: Any) -> Any:
+    """JSON fallback for the non-JSON types SHOW commands return."""
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return str(value)
+
+
+def json_object_hook(obj: Dict[str, Any]) -> Any:
+    """Inverse of :py:func:`json_default`, for ``json.loads``."""
+    if "__datetime__" in obj:
+        return datetime.datetime.fromisoformat(obj["__datetime__"])
+    if "__date__" in obj:
+        return datetime.date.fromisoformat(obj["__date__"])
+    return obj
+
+
+class SQLiteCacheStore:
+    """Size-capped, versioned key/value store backed by a single SQLite file."""
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = PERSIST_TTL_SECONDS,
+        max_entries: int = PERSIST_MAX_ENTRIES,
+        max_bytes: int = PERSIST_MAX_BYTES,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._open()
+        with self._db:
+            columns = tuple(row[1] for row in self._db.execute("PRAGMA table_info(cache_entries)"))
+            if columns and columns != _COLUMNS:
+                # Written by an older release; it is only a cache, so start over
+                self._db.execute("DROP TABLE cache_entries")
+            # stored_at is when the value was read from Snowflake (it drives the TTL);
+            # written_at changes whenever the row is rewritten, e.g. by a patch
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " key TEXT PRIMARY KEY, version INTEGER NOT NULL, stored_at REAL NOT NULL,"
+                " written_at REAL NOT NULL, ttl REAL NOT NULL, size INTEGER NOT NULL, value TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS cache_leases (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)")
+        # Cached metadata can include user details; keep the file private
+        try:
+            os.chmod(path, 0o600)
+        except OSError:
+            pass
+
+        # SQLite handles must not cross fork(); preforked workers reopen the file
+        ref = weakref.ref(self)
+
+        def _reopen_in_child() -> None:
+            store = ref()
+            if store is not None:
+                store._open()
+
+        os.register_at_fork(after_in_child=_reopen_in_child)
+
+    def _open(self) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        # WAL lets worker processes read while another one writes
+        self._db.execute("PRAGMA journal_mode=WAL")
+
+    def load_valid(self) -> Dict[str, Tuple[float, Any]]:
+        """Return ``{key: (stored_at, value)}`` for unexpired current-version entries.
+
+        Expired and outdated entries are deleted as a side effect.
+        """
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM cache_entries WHERE version != ? OR stored_at + ttl <= ?",
+                (CACHE_FORMAT_VERSION, now),
+            )
+            rows = self._db.execute("SELECT key, stored_at, value FROM cache_entries").fetchall()
+        entries: Dict[str, Tuple[float, Any]] = {}
+        for key, stored_at, raw in rows:
+            try:
+                entries[key] = (stored_at, json.loads(raw, object_hook=json_object_hook))
+            except ValueError:
+                # Unreadable entry; treat as a miss and let it be rewritten
+                continue
+        return entries
+
+    def get(self, key: str) -> Tuple[float, Any] | None:
+        """Return ``(stored_at, value)`` for *key* if it is valid, else None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT stored_at, value FROM cache_entries WHERE key = ? AND version = ? AND stored_at + ttl > ?",
+                (key, CACHE_FORMAT_VERSION, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return row[0], json.loads(row[1], object_hook=json_object_hook)
+        except ValueError:
+            return None
+
+    def written_at(self, key: str) -> float | None:
+        """When the valid entry under *key* was last written, without decoding it."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT written_at FROM cache_entries WHERE key = ? AND version = ? AND stored_at + ttl > ?",
+                (key, CACHE_FORMAT_VERSION, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def try_lease(self, key: str, seconds: float) -> bool:
+        """Claim *key* for *seconds* so other processes wait instead of reloading it.
+
+        Returns False while another holder's lease is still live.
+        """
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM cache_leases WHERE key = ? AND expires_at <= ?", (key, now))
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO cache_leases (key, expires_at) VALUES (?, ?)", (key, now + seconds)
+            )
+            return cur.rowcount == 1
+
+    def release_lease(self, key: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM cache_leases WHERE key = ?", (key,))
+
+    def put(self, key: str, value: Any, stored_at: float | None = None, written_at: float | None = None) -> bool:
+        """Write *value* under *key*, evicting the oldest entries beyond the limits.
+
+        *written_at* defaults to *stored_at*; pass a later time when rewriting
+        an entry without re-reading it, so other processes notice the change
+        while the entry keeps its original age.  Returns False if the value is
+        too large to store.
+        """
+        raw = json.dumps(value, default=json_default)
+        size = len(raw)
+        if size > self.max_bytes:
+            with self._lock, self._db:
+                self._db.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            return False
+        stored_at = stored_at or time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, version, stored_at, written_at, ttl, size, value)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, CACHE_FORMAT_VERSION, stored_at, written_at or stored_at, self.ttl, size, raw),
+            )
+            self._evict()
+        return True
+
+    def _evict(self) -> None:
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM cache_entries ORDER BY stored_at").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+
+    def delete(self, prefix: str = "", exact: bool = False) -> None:
+        """Delete entries whose key starts with *prefix* (all entries by default), or only *prefix* with *exact*."""
+        if exact:
+            with self._lock, self._db:
+                self._db.execute("DELETE FROM cache_entries WHERE key = ?", (prefix,))
+            return
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM cache_entries WHERE key LIKE ? ESCAPE '\\'", (escaped + "%",))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
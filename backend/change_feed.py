@@ -0,0 +1,162 @@
+"""change_feed.py – recent changes to cached Snowflake data, behind ``/events/stream``.
+
+Routes that change a user or a role's grants publish a small event after
+dropping the affected cache entries, e.g. ``{"kind": "user", "name": "ALICE",
+"action": "unlocked", "changes": {"snowflake_lock": false}}``.  Open browser
+tabs follow the feed over Server-Sent Events and patch the rows they already
+hold instead of re-downloading whole listings.
+
+Each event carries an increasing ``seq``.  A reader that asks for events after
+a ``seq`` the feed no longer retains (or never issued, after a restart) gets a
+single ``resync`` event instead and should reload everything it shows.
+
+Events are kept in process memory by default.  With ``CHANGE_FEED_PATH`` set
+they go to a SQLite file, so tabs connected to one worker process also see
+changes made through another.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+# SQLite file shared by worker processes; empty keeps events in process memory
+CHANGE_FEED_PATH = os.getenv("CHANGE_FEED_PATH", "")
+# Events retained for reconnecting tabs; a tab further behind is told to resync
+CHANGE_FEED_SIZE = int(os.getenv("CHANGE_FEED_SIZE", "1000"))
+# How often the SQLite feed is checked for events written by other processes
+POLL_INTERVAL_SECONDS = 0.5
+
+
+def _resync(last_seq: int) -> Dict[str, Any]:
+    return {"seq": last_seq, "time": time.time(), "kind": "resync"}
+
+
+class MemoryChangeFeed:
+    """Keeps the last *capacity* events of this process."""
+
+    def __init__(self, capacity: int = CHANGE_FEED_SIZE) -> None:
+        self.capacity = capacity
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._next_seq = 1
+        self._cond = threading.Condition()
+
+        # A stream waiting in the parent may have held the lock at fork time
+        ref = weakref.ref(self)
+
+        def _reinit_in_child() -> None:
+            feed = ref()
+            if feed is not None:
+                feed._cond = threading.Condition()
+
+        os.register_at_fork(after_in_child=_reinit_in_child)
+
+    def publish(self, kind: str, **fields: Any) -> int:
+        """Append an event and wake waiting streams; returns its ``seq``."""
+        with self._cond:
+            seq = self._next_seq
+            self._events.append({"seq": seq, "time": time.time(), "kind": kind, **fields})
+            self._next_seq = seq + 1
+            self._cond.notify_all()
+        return seq
+
+    @property
+    def last_seq(self) -> int:
+        """``seq`` of the newest event, or 0 when none was published."""
+        return self._next_seq - 1
+
+    def since(self, after_seq: int) -> List[Dict[str, Any]]:
+        """Events newer than *after_seq*, oldest first, or a lone ``resync`` event."""
+        with self._cond:
+            last = self._next_seq - 1
+            oldest = self._events[0]["seq"] if self._events else self._next_seq
+            if after_seq > last or after_seq < oldest - 1:
+                return [_resync(last)]
+            return list(itertools.islice(self._events, after_seq - oldest + 1, None))
+
+    def wait_for(self, after_seq: int, timeout: float) -> bool:
+        """Block until the feed moves past *after_seq*; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._next_seq - 1 != after_seq, timeout=timeout)
+
+
+class SQLiteChangeFeed:
+    """Feed shared between worker processes through a single SQLite file."""
+
+    def __init__(self, path: str, capacity: int = CHANGE_FEED_SIZE) -> None:
+        self.path = path
+        self.capacity = capacity
+        self._open()
+        with self._db:
+            # AUTOINCREMENT so a seq is never reused once the size cap has deleted it
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS change_events (seq INTEGER PRIMARY KEY AUTOINCREMENT, event TEXT NOT NULL)"
+            )
+        try:
+            os.chmod(path, 0o600)
+        except OSError:
+            pass
+
+        # SQLite handles must not cross fork(); preforked workers reopen the file
+        ref = weakref.ref(self)
+
+        def _reopen_in_child() -> None:
+            feed = ref()
+            if feed is not None:
+                feed._open()
+
+        os.register_at_fork(after_in_child=_reopen_in_child)
+
+    def _open(self) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+
+    def publish(self, kind: str, **fields: Any) -> int:
+        event = json.dumps({"time": time.time(), "kind": kind, **fields})
+        with self._lock, self._db:
+            cur = self._db.execute("INSERT INTO change_events (event) VALUES (?)", (event,))
+            self._db.execute("DELETE FROM change_events WHERE seq <= ?", (cur.lastrowid - self.capacity,))
+        return cur.lastrowid
+
+    @property
+    def last_seq(self) -> int:
+        with self._lock:
+            row = self._db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_events'").fetchone()
+        return row[0] if row else 0
+
+    def since(self, after_seq: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, event FROM change_events WHERE seq > ? ORDER BY seq", (after_seq,)
+            ).fetchall()
+            # Bounds are read after the rows: an event trimmed in between then
+            # shows up as a gap (a needless resync) rather than being skipped
+            row = self._db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_events'").fetchone()
+            last = row[0] if row else 0
+            oldest = self._db.execute("SELECT MIN(seq) FROM change_events").fetchone()[0] or last + 1
+        if after_seq > last or after_seq < oldest - 1:
+            return [_resync(last)]
+        return [{"seq": seq, **json.loads(event)} for seq, event in rows]
+
+    def wait_for(self, after_seq: int, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while self.last_seq == after_seq:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(POLL_INTERVAL_SECONDS, remaining))
+        return True
+
+
+def make_change_feed() -> MemoryChangeFeed | SQLiteChangeFeed:
+    if CHANGE_FEED_PATH:
+        return SQLiteChangeFeed(CHANGE_FEED_PATH)
+    return MemoryChangeFeed()
@@ -0,0 +1,205 @@
+"""deadline.py – per-request time budgets for Snowflake statements.
+
+Each request runs under a :py:class:`Deadline` (opened in ``app.py``) that the
+Snowflake client finds through a context variable.  Statements get the time
+left as their ``timeout``, so the connector cancels them on the server once
+the budget is spent, and nothing new is sent after it is.  If the browser
+disconnects while a statement runs, :py:func:`watch_disconnect` notices and
+the running statements are aborted right away instead of holding the worker
+thread and the warehouse until they finish.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import math
+import os
+import select
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds a request may spend on Snowflake statements; 0 disables deadlines
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "30"))
+
+# Budget for routes that scan the user view or run grant and key procedures
+SLOW_REQUEST_DEADLINE_SECONDS = float(os.getenv("SLOW_REQUEST_DEADLINE_SECONDS", "120"))
+
+# How often the sockets of requests with running statements are checked for a hang-up
+DISCONNECT_POLL_SECONDS = 0.25
+
+
+class DeadlineExceeded(RuntimeError):
+    """The request ran out of time, or its client went away, before Snowflake answered."""
+
+
+class Deadline:
+    """Time budget of one request, shared by every statement it runs."""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.reason: str | None = None  # Set by cancel()
+        self._running: Dict[int, Callable[[], None]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.reason is not None or self.remaining() <= 0
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._running)
+
+    def error(self) -> DeadlineExceeded:
+        if self.reason is not None:
+            return DeadlineExceeded(f"Request cancelled: {self.reason}")
+        return DeadlineExceeded(f"Request exceeded its {self.seconds:g}s deadline")
+
+    def check(self) -> None:
+        if self.expired:
+            raise self.error()
+
+    def statement_timeout(self) -> int:
+        """Whole seconds left for the next statement (the connector's unit); raises when none are."""
+        self.check()
+        return max(1, math.ceil(self.remaining()))
+
+    @contextmanager
+    def running(self, cancel: Callable[[], None]) -> Iterator[None]:
+        """Register *cancel* to abort the work done inside the block if :py:meth:`cancel` is called."""
+        self.check()
+        token = next(self._ids)
+        with self._lock:
+            self._running[token] = cancel
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running.pop(token, None)
+
+    def cancel(self, reason: str) -> None:
+        """Expire the deadline now and abort whatever is running under it."""
+        with self._lock:
+            if self.reason is not None:
+                return
+            self.reason = reason
+            cancels = list(self._running.values())
+        for cancel in cancels:
+            try:
+                cancel()
+            except Exception as e:
+                logger.warning("Could not cancel work after %s: %s", reason, e)
+
+
+_current: ContextVar[Deadline | None] = ContextVar("deadline", default=None)
+
+
+def current() -> Deadline | None:
+    """The deadline of the request being served, if any."""
+    return _current.get()
+
+
+def set_current(deadline: Deadline | None) -> None:
+    _current.set(deadline)
+
+
+@contextmanager
+def activate(deadline: Deadline | None) -> Iterator[Deadline | None]:
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def propagate(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap *fn* to run under the current deadline, e.g. in a thread pool."""
+    deadline = current()
+
+    @wraps(fn)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        with activate(deadline):
+            return fn(*args, **kwargs)
+
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Client disconnects
+# ---------------------------------------------------------------------------
+def _hung_up(sock: socket.socket) -> bool:
+    """True once the peer closed *sock*; pipelined request bytes do not count."""
+    try:
+        if sock.fileno() < 0:
+            return True
+        readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return False
+        return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b""
+    except (BlockingIOError, InterruptedError):
+        return False
+    except ValueError:
+        return False  # TLS sockets cannot be peeked; rely on the deadline alone
+    except OSError:
+        return True
+
+
+class _DisconnectWatcher:
+    """One background thread polling the client sockets of busy requests."""
+
+    def __init__(self) -> None:
+        self._watched: Dict[int, Tuple[Deadline, socket.socket]] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def watch(self, deadline: Deadline, sock: socket.socket) -> None:
+        with self._lock:
+            self._watched[id(deadline)] = (deadline, sock)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="deadline-watcher", daemon=True)
+                self._thread.start()
+
+    def unwatch(self, deadline: Deadline) -> None:
+        with self._lock:
+            self._watched.pop(id(deadline), None)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(DISCONNECT_POLL_SECONDS)
+            with self._lock:
+                watched = list(self._watched.values())
+            for deadline, sock in watched:
+                # Only requests waiting on Snowflake have anything to cancel
+                if deadline.busy and deadline.reason is None and _hung_up(sock):
+                    logger.info("Client disconnected; cancelling its running statements")
+                    deadline.cancel("client disconnected")
+
+    def _reset_after_fork(self) -> None:
+        self._watched = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+
+_watcher = _DisconnectWatcher()
+os.register_at_fork(after_in_child=_watcher._reset_after_fork)
+
+
+def watch_disconnect(deadline: Deadline, sock: socket.socket) -> None:
+    """Cancel *deadline* if the peer of *sock* hangs up while work is running under it."""
+    _watcher.watch(deadline, sock)
+
+
+def unwatch_disconnect(deadline: Deadline) -> None:
+    _watcher.unwatch(deadline)
@@ -0,0 +1,94 @@
+"""key_hygiene.py – running counts of users by key, password and MFA status.
+
+:py:class:`KeyHygiene` keeps one counter per bucket (with/without RSA key,
+MFA, password, disabled, locked, key adoption per user type, password-only
+service users).  The counts are built in one pass when the users listing is
+loaded and then adjusted per user as cached rows are replaced by patched
+copies, so reading them never walks the user list.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List
+
+# User types that authenticate as programs; a password without a key there is a finding
+SERVICE_TYPES = frozenset({"SERVICE", "LEGACY_SERVICE"})
+
+
+def _user_type(user: Dict[str, Any]) -> str:
+    return (user.get("type") or "NULL").upper()
+
+
+def _buckets(user: Dict[str, Any]) -> List[str]:
+    has_key = bool(user.get("has_rsa_public_key"))
+    kind = _user_type(user)
+    buckets = ["total", "with_rsa_key" if has_key else "without_rsa_key", f"type:{kind}"]
+    if has_key:
+        buckets.append(f"type:{kind}:with_rsa_key")
+    if user.get("has_mfa"):
+        buckets.append("with_mfa")
+    if user.get("has_password"):
+        buckets.append("with_password")
+        if not has_key:
+            buckets.append("password_only")
+            if kind in SERVICE_TYPES:
+                buckets.append("password_only_service")
+    if user.get("disabled"):
+        buckets.append("disabled")
+    if user.get("snowflake_lock"):
+        buckets.append("locked")
+    return buckets
+
+
+class KeyHygiene:
+    """Bucket counts over the rows of a users listing, kept current as rows are patched.
+
+    Not thread-safe; :py:class:`~backend.snowflake_client.SnowflakeClient`
+    holds its cache lock around every call.
+    """
+
+    def __init__(self, users: Iterable[Dict[str, Any]] = ()) -> None:
+        self._counts: Counter = Counter()
+        self._users: Dict[str, Dict[str, Any]] = {}
+        for user in users:
+            self._users[user["name"]] = user
+            self._counts.update(_buckets(user))
+
+    def patch(self, name: str, changes: Dict[str, Any]) -> Dict[str, Any] | None:
+        """Move user *name* between buckets for *changes* and return the patched row.
+
+        The row is a copy; rows already handed out are never modified, so the
+        caller swaps the copy into its listing.  Only fields the row already
+        has are changed.  Returns None if *name* is not in the listing.
+        """
+        user = self._users.get(name)
+        if user is None:
+            return None
+        patched = dict(user)
+        patched.update((field, value) for field, value in changes.items() if field in user)
+        self._counts.subtract(_buckets(user))
+        self._counts.update(_buckets(patched))
+        self._users[name] = patched
+        return patched
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._users
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The counts as served by ``/keys/hygiene``."""
+        counts = self._counts
+        by_type = {}
+        for bucket, users in counts.items():
+            if bucket.startswith("type:") and bucket.count(":") == 1 and users > 0:
+                by_type[bucket[len("type:"):]] = {
+                    "users": users,
+                    "with_rsa_key": counts[f"{bucket}:with_rsa_key"],
+                }
+        summary: Dict[str, Any] = {
+            bucket: counts[bucket]
+            for bucket in ("total", "with_rsa_key", "without_rsa_key", "with_mfa", "with_password",
+                           "password_only", "password_only_service", "disabled", "locked")
+        }
+        summary["key_adoption_by_type"] = dict(sorted(by_type.items()))
+        return summary
@@ -0,0 +1,115 @@
+"""log_buffer.py – bounded in-memory log store behind the ``/logs`` routes.
+
+:py:class:`RingBufferHandler` is a :py:class:`logging.Handler` that keeps the
+most recent records in a fixed-size ring.  Appends are O(1), memory is bounded
+by ``LOG_BUFFER_SIZE`` no matter how much the app logs, and each level keeps
+its own index so level-filtered queries only touch matching entries.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List
+
+# Number of log records retained in memory
+LOG_BUFFER_SIZE = int(os.getenv("LOG_BUFFER_SIZE", "5000"))
+
+_formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last *capacity* records with per-level indexes."""
+
+    def __init__(self, capacity: int = LOG_BUFFER_SIZE) -> None:
+        super().__init__()
+        self.capacity = capacity
+        self._entries: List[Dict[str, Any] | None] = [None] * capacity
+        self._next_seq = 0  # sequence number of the next record; slot = seq % capacity
+        self._by_level: Dict[str, Deque[int]] = {}
+        self._cond = threading.Condition()
+
+    def _at_fork_reinit(self) -> None:
+        # Called by logging in a forked child; the listener may have held the lock
+        super()._at_fork_reinit()
+        self._cond = threading.Condition()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            message = record.getMessage()
+            full_entry = _formatter.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._cond:
+            seq = self._next_seq
+            self._entries[seq % self.capacity] = {
+                "seq": seq,
+                "timestamp": _formatter.formatTime(record),
+                "level": record.levelname,
+                "source": record.name,
+                "message": message,
+                "full_entry": full_entry,
+                # Pre-lowered once so searches don't re-lower every entry
+                "_search": full_entry.lower(),
+            }
+            index = self._by_level.get(record.levelname)
+            if index is None:
+                index = self._by_level[record.levelname] = deque(maxlen=self.capacity)
+            index.append(seq)
+            self._next_seq = seq + 1
+            self._cond.notify_all()
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest record, or -1 when empty."""
+        return self._next_seq - 1
+
+    def _get(self, seq: int) -> Dict[str, Any] | None:
+        if seq < self._next_seq - self.capacity or seq >= self._next_seq:
+            return None  # overwritten or not written yet
+        return self._entries[seq % self.capacity]
+
+    def _newest_first(self, level: str) -> Iterator[int]:
+        if level:
+            return reversed(self._by_level.get(level.upper(), ()))
+        oldest = max(0, self._next_seq - self.capacity)
+        return iter(range(self._next_seq - 1, oldest - 1, -1))
+
+    def query(self, lines: int = 100, level: str = "", search: str = "", after_seq: int = -1) -> List[Dict[str, Any]]:
+        """Return up to *lines* matching entries, newest first.
+
+        *level* matches the level name exactly, *search* is a case-insensitive
+        substring, and *after_seq* limits results to records newer than it.
+        """
+        needle = search.lower()
+        results: List[Dict[str, Any]] = []
+        with self._cond:
+            for seq in self._newest_first(level):
+                if seq <= after_seq or len(results) >= lines:
+                    break
+                entry = self._get(seq)
+                if entry is None:
+                    break
+                if needle and needle not in entry["_search"]:
+                    continue
+                results.append({k: v for k, v in entry.items() if k != "_search"})
+        return results
+
+    def wait_for(self, after_seq: int, timeout: float) -> bool:
+        """Block until a record newer than *after_seq* arrives; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._next_seq - 1 > after_seq, timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            retained = min(self._next_seq, self.capacity)
+            oldest = self._next_seq - retained
+            levels = {lvl: sum(1 for s in idx if s >= oldest) for lvl, idx in self._by_level.items()}
+        return {"capacity": self.capacity, "retained": retained, "total_seen": self._next_seq, "levels": levels}
+
+
+# Module-level singleton installed on the root logger by app.py
+log_buffer = RingBufferHandler()
@@ -0,0 +1,113 @@
+"""log_setup.py – non-blocking logging pipeline for the app.
+
+Request threads only enqueue records: a :py:class:`logging.handlers.QueueHandler`
+on the root logger hands them to a :py:class:`logging.handlers.QueueListener`
+thread, which does the formatting I/O (stderr) and feeds the ``/logs`` ring
+buffer.  Modules log through ``logging.getLogger(__name__)`` with %-style
+arguments so messages below the configured level are never formatted, and
+high-volume DEBUG output is sampled.
+
+The listener thread does not survive ``fork()``, so preforked workers (see
+``gunicorn.conf.py``) get a fresh queue and listener automatically.
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import logging
+import logging.handlers
+import os
+import queue
+from typing import List
+
+# Root log level (DEBUG, INFO, WARNING, ...)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Keep 1 in N DEBUG records; 1 keeps them all
+LOG_DEBUG_SAMPLE_RATE = max(1, int(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1")))
+# Records buffered for the listener thread before new ones are dropped
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+class DebugSampler(logging.Filter):
+    """Pass every INFO+ record but only one in *rate* DEBUG records."""
+
+    def __init__(self, rate: int = LOG_DEBUG_SAMPLE_RATE) -> None:
+        super().__init__()
+        self.rate = rate
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate <= 1:
+            return True
+        return next(self._counter) % self.rate == 0
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers formatting to the listener and never blocks.
+
+    The queue stays in-process, so records are passed through untouched and
+    ``msg % args`` only runs on the listener thread.  Once *max_size* records
+    are waiting, new ones are dropped rather than growing memory.
+    """
+
+    def __init__(self, q: queue.SimpleQueue, max_size: int = LOG_QUEUE_SIZE) -> None:
+        super().__init__(q)
+        self.max_size = max_size
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.queue.qsize() < self.max_size:
+            self.queue.put_nowait(record)
+
+
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: _DroppingQueueHandler | None = None
+
+
+def configure_logging(*handlers: logging.Handler, level: str = LOG_LEVEL) -> logging.handlers.QueueListener:
+    """Route root logging through a queue to *handlers* (plus stderr).
+
+    Safe to call more than once; only the first call installs the pipeline.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter(LOG_FORMAT))
+    targets: List[logging.Handler] = [stream, *handlers]
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = _DroppingQueueHandler(log_queue)
+    _queue_handler.addFilter(DebugSampler())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, *targets, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def _restart_after_fork() -> None:
+    """Give a forked child its own queue and listener thread."""
+    if _listener is None or _queue_handler is None:
+        return
+    # The parent's queue may have been mid-put when it forked; don't reuse it
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener.queue = log_queue
+    _listener._thread = None
+    _listener.start()
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
@@ -2,15 +2,23 @@
 
 from __future__ import annotations
 
+import logging
 import os
+import threading
 import time
 import secrets
 import string
+from typing import Any, Dict, Tuple
 from urllib.parse import urlencode
 import base64
+import hashlib
+from collections import OrderedDict
 
-import requests
-from flask import session, request
+from flask import g, has_request_context, session, request
+
+from backend.oauth_state import OAUTH_STATE_TTL_SECONDS, make_state_store
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 OAUTH_CLIENT_ID = os.getenv("OAUTH_CLIENT_ID")
@@ -25,8 +33,61 @@ TOKEN_KEY = "oauth_token"
 REFRESH_KEY = "oauth_refresh"
 EXP_KEY = "oauth_exp"
 
-# Server-side state storage
-_oauth_states = {}
+# Server-side state storage; bounded and expiring, shared by workers when OAUTH_STATE_PATH is set
+_state_store = make_state_store()
+
+# Keep-alive connections to the token endpoint, shared by all requests
+TOKEN_HTTP_POOL_SIZE = int(os.getenv("OAUTH_HTTP_POOL_SIZE", "4"))
+# How long the outcome of a refresh is reused for requests still carrying the old refresh token
+REFRESH_REUSE_SECONDS = 30
+# Identities decoded from access tokens are reused for this long (or until the token expires)
+IDENTITY_CACHE_SECONDS = 300
+IDENTITY_CACHE_SIZE = 1024
+
+
+def _requests() -> Any:
+    # Imported on first token request: with urllib3 and certifi it is one of the
+    # slowest imports at startup, and key generation never needs it
+    import requests
+
+    return requests
+
+
+def _new_http_session() -> Any:
+    from requests.adapters import HTTPAdapter
+
+    http = _requests().Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=TOKEN_HTTP_POOL_SIZE)
+    http.mount("https://", adapter)
+    http.mount("http://", adapter)
+    return http
+
+
+class _TokenHTTP:
+    """Pooled session for the token endpoint, created on first use."""
+
+    def __init__(self) -> None:
+        self._session = None
+        self._lock = threading.Lock()
+
+    def post(self, *args: Any, **kwargs: Any) -> Any:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = _new_http_session()
+        return self._session.post(*args, **kwargs)
+
+
+_http = _TokenHTTP()
+
+
+def _reset_http_after_fork() -> None:
+    # Pooled sockets must not be shared with the parent process
+    global _http
+    _http = _TokenHTTP()
+
+
+os.register_at_fork(after_in_child=_reset_http_after_fork)
 
 # Roles allowed to grant permissions (comma-separated env var)
 ALLOW_GRANT_ROLES = {
@@ -41,7 +102,9 @@ def _gen_state(length: int = 32) -> str:
 
 def build_authorize_url() -> str:
     state = _gen_state()
-    _oauth_states[state] = time.time()
+    _state_store.add(state)
+    # Also kept in the signed session: the callback may reach a worker without the shared store
+    session[STATE_KEY] = [state, time.time()]
     
     params = {
         "response_type": "code",
@@ -53,122 +116,206 @@ def build_authorize_url() -> str:
     return f"{OAUTH_AUTH_URL}?{urlencode(params)}"
 
 def exchange_code(code: str) -> bool:
-    state = request.args.get('state')
+    state = request.args.get('state') or ''
+    # Consumed up front either way so a state can never be replayed
+    valid = bool(state) and _state_store.consume(state)
+    saved = session.pop(STATE_KEY, None)
+    if not valid and state and saved and secrets.compare_digest(str(saved[0]), state):
+        valid = time.time() - saved[1] <= OAUTH_STATE_TTL_SECONDS
     
-    if state not in _oauth_states or time.time() - _oauth_states.get(state, 0) > 300:
-        print(f"Invalid or expired state: {state}")
+    if not valid:
+        logger.warning("Invalid or expired OAuth state")
         return False
     
-    client_id = OAUTH_CLIENT_ID.strip('"')
-    client_secret = OAUTH_CLIENT_SECRET.strip('"')
-    
-    auth_string = f"{client_id}:{client_secret}"
-    auth_b64 = base64.b64encode(auth_string.encode('ascii')).decode('ascii')
-    
     data = {
         "grant_type": "authorization_code",
         "code": code,
         "redirect_uri": OAUTH_REDIRECT_URI,
     }
     
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-        "Accept": "application/json",
-        "Authorization": f"Basic {auth_b64}"
-    }
-    
     try:
-        resp = requests.post(OAUTH_TOKEN_URL, data=data, headers=headers, timeout=10)
+        resp = _http.post(OAUTH_TOKEN_URL, data=data, headers=_token_headers(), timeout=10)
         
         if resp.status_code != 200:
-            print(f"Token exchange failed: {resp.status_code} - {resp.text}")
+            logger.error("Token exchange failed: %s - %s", resp.status_code, resp.text)
             return False
             
-        payload = resp.json()
-        session[TOKEN_KEY] = payload["access_token"]
-        session[REFRESH_KEY] = payload.get("refresh_token")
-        expires_in = payload.get("expires_in", 3600)
-        session[EXP_KEY] = time.time() + expires_in - 60
-        session.modified = True
-        
-        _oauth_states.pop(state, None)
+        # Signed in under a new session ID so a cookie planted before login is worthless
+        session.regenerate()
+        _store_tokens(resp.json())
         return True
             
-    except requests.RequestException as e:
-        print(f"Request failed: {e}")
+    except _requests().RequestException as e:
+        logger.error("Token request failed: %s", e)
         return False
 
-def refresh_token() -> bool:
-    refresh = session.get(REFRESH_KEY)
-    if not refresh:
-        return False
-    
+def _token_headers() -> Dict[str, str]:
     client_id = OAUTH_CLIENT_ID.strip('"')
     client_secret = OAUTH_CLIENT_SECRET.strip('"')
     
     auth_string = f"{client_id}:{client_secret}"
     auth_b64 = base64.b64encode(auth_string.encode('ascii')).decode('ascii')
-    
-    data = {
-        "grant_type": "refresh_token",
-        "refresh_token": refresh,
-    }
-    
-    headers = {
+    return {
         "Content-Type": "application/x-www-form-urlencoded",
         "Accept": "application/json",
         "Authorization": f"Basic {auth_b64}"
     }
-    
+
+def _store_tokens(payload: Dict[str, Any], refresh: str | None = None) -> None:
+    session[TOKEN_KEY] = payload["access_token"]
+    session[REFRESH_KEY] = payload.get("refresh_token", refresh)
+    expires_in = payload.get("expires_in", 3600)
+    session[EXP_KEY] = time.time() + expires_in - 60
+    session.modified = True
+    _forget_request_auth()
+
+class _RefreshFlight:
+    """One in-flight (or just finished) refresh that concurrent requests share."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.outcome: Tuple[str, Dict[str, Any] | None] = ("error", None)
+        self.finished_at = 0.0
+
+_refresh_lock = threading.Lock()
+_refresh_flights: Dict[str, _RefreshFlight] = {}
+
+def _refresh_once(refresh: str) -> Tuple[str, Dict[str, Any] | None]:
+    """POST the refresh grant once per refresh token.
+
+    Requests that arrive while it is in flight, or shortly after with the same
+    (now rotated) refresh token, get the same outcome instead of posting
+    again.  Returns ``("ok", payload)``, ``("rejected", None)`` when the
+    endpoint refused the token, or ``("error", None)`` on transport failures.
+    """
+    now = time.time()
+    with _refresh_lock:
+        for key in [k for k, f in _refresh_flights.items()
+                    if f.done.is_set() and now - f.finished_at > REFRESH_REUSE_SECONDS]:
+            del _refresh_flights[key]
+        flight = _refresh_flights.get(refresh)
+        leader = flight is None
+        if leader:
+            flight = _refresh_flights[refresh] = _RefreshFlight()
+
+    if not leader:
+        if not flight.done.wait(timeout=15):
+            return ("error", None)
+        return flight.outcome
+
+    data = {
+        "grant_type": "refresh_token",
+        "refresh_token": refresh,
+    }
     try:
-        resp = requests.post(OAUTH_TOKEN_URL, data=data, headers=headers, timeout=10)
-        
+        resp = _http.post(OAUTH_TOKEN_URL, data=data, headers=_token_headers(), timeout=10)
         if resp.status_code != 200:
-            logout()
-            return False
-            
-        payload = resp.json()
-        session[TOKEN_KEY] = payload["access_token"]
-        session[REFRESH_KEY] = payload.get("refresh_token", refresh)
-        expires_in = payload.get("expires_in", 3600)
-        session[EXP_KEY] = time.time() + expires_in - 60
-        return True
-    except requests.RequestException:
+            flight.outcome = ("rejected", None)
+        else:
+            flight.outcome = ("ok", resp.json())
+    except (_requests().RequestException, ValueError) as e:
+        logger.warning("Token refresh failed: %s", e)
+    finally:
+        flight.finished_at = time.time()
+        flight.done.set()
+        if flight.outcome[0] == "error":
+            # Transport errors are not remembered; the next request tries again
+            with _refresh_lock:
+                _refresh_flights.pop(refresh, None)
+    return flight.outcome
+
+def refresh_token() -> bool:
+    refresh = session.get(REFRESH_KEY)
+    if not refresh:
+        return False
+    
+    status, payload = _refresh_once(refresh)
+    if status == "rejected":
+        logout()
+        return False
+    if status != "ok":
+        return False
+    try:
+        _store_tokens(payload, refresh)
+    except KeyError:
         return False
+    return True
+
+# Per-request memo of the validated token and identity, so a request that checks
+# authentication several times refreshes and decodes at most once
+_G_TOKEN = "_oauth_access_token"
+_G_IDENTITY = "_oauth_identity"
+
+def _forget_request_auth() -> None:
+    if has_request_context():
+        g.pop(_G_TOKEN, None)
+        g.pop(_G_IDENTITY, None)
 
 def get_access_token() -> str | None:
-    if time.time() > session.get(EXP_KEY, 0):
-        if not refresh_token():
-            return None
-    return session.get(TOKEN_KEY)
+    if has_request_context() and _G_TOKEN in g:
+        return g.get(_G_TOKEN)
+    token = None
+    if time.time() <= session.get(EXP_KEY, 0) or refresh_token():
+        token = session.get(TOKEN_KEY)
+    if has_request_context():
+        setattr(g, _G_TOKEN, token)
+    return token
 
 def logout() -> None:
     for k in (TOKEN_KEY, REFRESH_KEY, EXP_KEY, STATE_KEY):
         session.pop(k, None)
     session.modified = True
+    _forget_request_auth()
 
 def authenticated() -> bool:
     return get_access_token() is not None
 
-def current_identity() -> dict | None:
-    token = session.get(TOKEN_KEY)
-    if not token:
-        return None
+_identity_lock = threading.Lock()
+# sha256(token) -> (valid until, identity); tokens themselves are not kept
+_identity_cache: "OrderedDict[str, Tuple[float, Dict[str, str]]]" = OrderedDict()
+
+def _decode_identity(token: str) -> Tuple[Dict[str, str], float | None]:
+    """Identity carried by *token* and the token's own expiry, if it has one."""
     try:
         # We need to import jwt here, but only for this function
         import jwt
         payload = jwt.decode(token, options={"verify_signature": False})
         user = payload.get("sub", "").split(".")[-1]
         role = payload.get("scope", "").split(":")[-1] # Example: session:role:SYSADMIN
-        return {"user": user.upper(), "role": (role or "").upper()}
+        exp = payload.get("exp")
+        return {"user": user.upper(), "role": (role or "").upper()}, float(exp) if exp else None
     except Exception as e:
-        print(f"Could not decode token: {e}")
+        logger.warning("Could not decode token: %s", e)
         # Fallback: if we can't decode the token but we have one, return a basic identity
         # This allows the app to function even if token parsing fails
-        if token:
-            # Extract user from environment as fallback
-            import os
-            user = os.getenv('SNOWFLAKE_USER', 'UNKNOWN_USER')
-            role = os.getenv('SNOWFLAKE_ROLE', 'SYSADMIN')
-            return {"user": user.upper(), "role": role.upper()}
-        return None 
\ No newline at end of file
+        user = os.getenv('SNOWFLAKE_USER', 'UNKNOWN_USER')
+        role = os.getenv('SNOWFLAKE_ROLE', 'SYSADMIN')
+        return {"user": user.upper(), "role": role.upper()}, None
+
+def _identity_for(token: str) -> Dict[str, str]:
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    now = time.time()
+    with _identity_lock:
+        hit = _identity_cache.get(digest)
+        if hit is not None and hit[0] > now:
+            _identity_cache.move_to_end(digest)
+            return dict(hit[1])
+    ident, token_exp = _decode_identity(token)
+    valid_until = now + IDENTITY_CACHE_SECONDS
+    if token_exp is not None:
+        valid_until = min(valid_until, token_exp)
+    with _identity_lock:
+        _identity_cache[digest] = (valid_until, ident)
+        _identity_cache.move_to_end(digest)
+        while len(_identity_cache) > IDENTITY_CACHE_SIZE:
+            _identity_cache.popitem(last=False)
+    return dict(ident)
+
+def current_identity() -> dict | None:
+    if has_request_context() and _G_IDENTITY in g:
+        return g.get(_G_IDENTITY)
+    token = session.get(TOKEN_KEY)
+    ident = _identity_for(token) if token else None
+    if has_request_context():
+        setattr(g, _G_IDENTITY, ident)
+    return ident
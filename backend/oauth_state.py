@@ -0,0 +1,136 @@
+"""oauth_state.py – bounded, expiring store for pending OAuth ``state`` values.
+
+A state is added when a login redirects to the authorisation server and
+consumed, at most once, by the callback.  Abandoned logins expire after
+``OAUTH_STATE_TTL_SECONDS`` and the store never holds more than
+``OAUTH_STATE_MAX_ENTRIES`` states; the oldest are dropped first.
+
+With ``OAUTH_STATE_PATH`` set, states live in a SQLite file shared by every
+worker process, so the callback may land on a different worker than the login.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+# How long a login may take between redirect and callback
+OAUTH_STATE_TTL_SECONDS = int(os.getenv("OAUTH_STATE_TTL_SECONDS", "300"))
+# Hard cap on pending logins; the oldest are dropped beyond it
+OAUTH_STATE_MAX_ENTRIES = int(os.getenv("OAUTH_STATE_MAX_ENTRIES", "10000"))
+# SQLite file shared by worker processes; empty keeps states in process memory
+OAUTH_STATE_PATH = os.getenv("OAUTH_STATE_PATH", "")
+
+
+class MemoryStateStore:
+    """In-process store; insertion order is expiry order, so sweeps stop at the first live state."""
+
+    def __init__(self, ttl: float = OAUTH_STATE_TTL_SECONDS, max_entries: int = OAUTH_STATE_MAX_ENTRIES) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._states: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sweep(self, now: float) -> None:
+        while self._states:
+            state, issued = next(iter(self._states.items()))
+            if now - issued <= self.ttl:
+                break
+            del self._states[state]
+
+    def add(self, state: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            self._states[state] = now
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+
+    def consume(self, state: str) -> bool:
+        """Remove *state*; True if it was pending and unexpired."""
+        with self._lock:
+            issued = self._states.pop(state, None)
+        return issued is not None and time.monotonic() - issued <= self.ttl
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sweep(time.monotonic())
+            return len(self._states)
+
+
+class SQLiteStateStore:
+    """Store shared between worker processes through a single SQLite file."""
+
+    def __init__(
+        self, path: str, ttl: float = OAUTH_STATE_TTL_SECONDS, max_entries: int = OAUTH_STATE_MAX_ENTRIES
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._open()
+        with self._db:
+            # The rowid follows insertion order, so the size cap is a range delete
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS oauth_states ("
+                " id INTEGER PRIMARY KEY, state TEXT NOT NULL UNIQUE, issued REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS oauth_states_issued ON oauth_states (issued)")
+        try:
+            os.chmod(path, 0o600)
+        except OSError:
+            pass
+
+        # SQLite handles must not cross fork(); preforked workers reopen the file
+        ref = weakref.ref(self)
+
+        def _reopen_in_child() -> None:
+            store = ref()
+            if store is not None:
+                store._open()
+
+        os.register_at_fork(after_in_child=_reopen_in_child)
+
+    def _open(self) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+
+    def add(self, state: str) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM oauth_states WHERE issued < ?", (now - self.ttl,))
+            cur = self._db.execute("INSERT OR REPLACE INTO oauth_states (state, issued) VALUES (?, ?)", (state, now))
+            self._db.execute("DELETE FROM oauth_states WHERE id <= ?", (cur.lastrowid - self.max_entries,))
+
+    def consume(self, state: str) -> bool:
+        """Remove *state*; True if it was pending and unexpired."""
+        with self._lock, self._db:
+            cur = self._db.execute(
+                "DELETE FROM oauth_states WHERE state = ? AND issued >= ?", (state, time.time() - self.ttl)
+            )
+            return cur.rowcount == 1
+
+    def clear(self) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM oauth_states")
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COUNT(*) FROM oauth_states WHERE issued >= ?", (time.time() - self.ttl,)
+            ).fetchone()
+        return row[0]
+
+
+def make_state_store() -> MemoryStateStore | SQLiteStateStore:
+    if OAUTH_STATE_PATH:
+        return SQLiteStateStore(OAUTH_STATE_PATH)
+    return MemoryStateStore()
@@ -0,0 +1,218 @@
+"""session_store.py – server-side Flask sessions.
+
+The session cookie carries only a random session ID; the session data (OAuth
+tokens, activity timestamp) stays on the server.  A session expires once it
+has not been written for ``INACTIVITY_TIMEOUT_SECONDS`` – every authenticated
+request updates ``last_activity``, so this matches the inactivity logout.
+
+Sessions are kept in process memory by default.  With ``SESSION_STORE_PATH``
+set they live in a SQLite file shared by every worker process.
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from backend.security import INACTIVITY_TIMEOUT_SECONDS
+
+# SQLite file shared by worker processes; empty keeps sessions in process memory
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", "")
+# Hard cap on stored sessions; the least recently written are dropped beyond it
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+# Expired rows are deleted at most this often per process
+SWEEP_INTERVAL_SECONDS = 60
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Session dict that remembers its ID and whether it changed."""
+
+    def __init__(self, initial: Dict[str, Any] | None = None, sid: str | None = None) -> None:
+        def on_update(self: "ServerSession") -> None:
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.modified = False
+        self.replaced_sid: str | None = None  # Set by regenerate(); deleted on save
+
+    def regenerate(self) -> None:
+        """Move the data to a new session ID on the next save and drop the old one.
+
+        Called when the session gains privileges (login), so an ID planted in
+        the browser beforehand never becomes an authenticated session.
+        """
+        if self.sid is not None:
+            self.replaced_sid = self.sid
+        self.sid = None
+        self.modified = True
+
+
+class MemorySessionBackend:
+    """In-process backend; entries are ordered by last write, which is also expiry order."""
+
+    def __init__(self, max_entries: int = SESSION_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sid: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(sid)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+
+    def set(self, sid: str, data: str, expires_at: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._entries[sid] = (expires_at, data)
+            self._entries.move_to_end(sid)
+            while self._entries:
+                oldest = next(iter(self._entries.values()))
+                if oldest[0] > now and len(self._entries) <= self.max_entries:
+                    break
+                self._entries.popitem(last=False)
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._entries.pop(sid, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteSessionBackend:
+    """Backend shared between worker processes through a single SQLite file."""
+
+    def __init__(self, path: str, max_entries: int = SESSION_MAX_ENTRIES) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._next_sweep = 0.0
+        self._open()
+        with self._db:
+            # INSERT OR REPLACE gives every write a new, higher rowid, so the
+            # size cap drops the least recently written sessions with a range delete
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " id INTEGER PRIMARY KEY, sid TEXT NOT NULL UNIQUE, expires_at REAL NOT NULL, data TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)")
+        # Sessions hold OAuth tokens; keep the file private
+        try:
+            os.chmod(path, 0o600)
+        except OSError:
+            pass
+
+        # SQLite handles must not cross fork(); preforked workers reopen the file
+        ref = weakref.ref(self)
+
+        def _reopen_in_child() -> None:
+            backend = ref()
+            if backend is not None:
+                backend._open()
+
+        os.register_at_fork(after_in_child=_reopen_in_child)
+
+    def _open(self) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+
+    def get(self, sid: str) -> str | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM sessions WHERE sid = ? AND expires_at > ?", (sid, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid: str, data: str, expires_at: float) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            cur = self._db.execute(
+                "INSERT OR REPLACE INTO sessions (sid, expires_at, data) VALUES (?, ?, ?)", (sid, expires_at, data)
+            )
+            self._db.execute("DELETE FROM sessions WHERE id <= ?", (cur.lastrowid - self.max_entries,))
+            if now >= self._next_sweep:
+                self._next_sweep = now + SWEEP_INTERVAL_SECONDS
+                self._db.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    def delete(self, sid: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._db.execute("SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)).fetchone()
+        return row[0]
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface storing session data in *backend*, keyed by the cookie's ID."""
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, backend: MemorySessionBackend | SQLiteSessionBackend,
+                 ttl: float = INACTIVITY_TIMEOUT_SECONDS) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    def open_session(self, app: Any, request: Any) -> ServerSession:
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            raw = self.backend.get(sid)
+            if raw is not None:
+                try:
+                    return ServerSession(self.serializer.loads(raw), sid)
+                except ValueError:
+                    pass
+        # Unknown or expired IDs are never reused; a new one is issued on first write
+        return ServerSession()
+
+    def save_session(self, app: Any, session: ServerSession, response: Any) -> None:
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if session.replaced_sid is not None:
+            self.backend.delete(session.replaced_sid)
+            session.replaced_sid = None
+
+        if not session:
+            if session.modified and session.sid:
+                self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+            return
+
+        if not self.should_set_cookie(app, session):
+            return
+
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(32)
+        self.backend.set(session.sid, self.serializer.dumps(dict(session)), time.time() + self.ttl)
+        response.set_cookie(name, session.sid, expires=self.get_expiration_time(app, session),
+                            httponly=httponly, domain=domain, path=path, secure=secure, samesite=samesite)
+
+
+def make_session_backend() -> MemorySessionBackend | SQLiteSessionBackend:
+    if SESSION_STORE_PATH:
+        return SQLiteSessionBackend(SESSION_STORE_PATH)
+    return MemorySessionBackend()
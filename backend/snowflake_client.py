@@ -7,15 +7,165 @@ implement connection pooling and stored-procedure execution helpers.
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Sequence, Tuple
+import logging
+import os
+import threading
 import time
 import re
 
-try:
+from backend import deadline, metrics
+from backend.key_hygiene import KeyHygiene
+
+if TYPE_CHECKING:  # Annotations only; the connector is imported lazily by _connector()
+    import snowflake.connector
+
+logger = logging.getLogger(__name__)
+
+
+def _connector() -> Any:
+    """Import ``snowflake.connector`` on first use.
+
+    The connector (with boto3, pyOpenSSL and friends) takes longer to import
+    than the rest of the app, so it is only loaded when a connection opens.
+    """
     import snowflake.connector  # type: ignore
-except ImportError:  # pragma: no cover
-    # Snowflake connector not yet installed in all dev environments.
-    snowflake = None  # type: ignore
+
+    return snowflake.connector
+
+
+# Seconds before cached SHOW results (role grants etc.) are considered stale
+CACHE_TTL_SECONDS = int(os.getenv("SF_CACHE_TTL_SECONDS", "300"))
+
+# Maximum number of extra connections used for concurrent metadata queries
+POOL_SIZE = int(os.getenv("SF_POOL_SIZE", "4"))
+
+# With a shared store, how long other workers wait for the one loading an entry
+CACHE_LEASE_SECONDS = int(os.getenv("SF_CACHE_LEASE_SECONDS", "30"))
+
+# With a shared store, how often a cache hit checks it for other workers' writes and invalidations
+SHARED_CHECK_SECONDS = float(os.getenv("SF_SHARED_CHECK_SECONDS", "1"))
+
+# Container-level privileges each grant-permission type is expected to leave on
+# the target role, as previewed by :py:meth:`SnowflakeClient.plan_grant`.  The
+# UPLAND_MAINTENANCE.SECURITY.sp_*_perms procedures also grant object-level and
+# future privileges, which the plan does not model, so it is advisory only.
+GRANT_PLAN_PRIVILEGES: Dict[str, Dict[str, List[str]]] = {
+    "read": {
+        "DATABASE": ["USAGE"],
+        "SCHEMA": ["USAGE"],
+    },
+    "readwrite": {
+        "DATABASE": ["USAGE"],
+        "SCHEMA": ["USAGE", "CREATE TABLE", "CREATE VIEW"],
+    },
+}
+
+_IDENTIFIER_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_$]*$')
+_BASE64_RE = re.compile(r'^[A-Za-z0-9+/=]*$')
+
+
+class _InstrumentedCursor:
+    """Cursor proxy that records round-trip counts and latency per client method."""
+
+    def __init__(self, cursor: Any, method: str) -> None:
+        self._cursor = cursor
+        self._method = method
+
+    def _timed(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            metrics.SF_QUERY_ERRORS.inc(method=self._method)
+            raise
+        finally:
+            metrics.SF_QUERIES.inc(method=self._method)
+            metrics.SF_QUERY_DURATION.observe(time.perf_counter() - start, method=self._method)
+
+    def execute(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        """Execute *command* within the time left to the current request.
+
+        The connector cancels the statement on the server when its
+        ``timeout`` fires; a cancelled deadline (client gone) aborts it at
+        once.  Either way the caller gets :py:class:`~backend.deadline.DeadlineExceeded`.
+        """
+        active = deadline.current()
+        if active is None:
+            return self._timed(self._cursor.execute, command, *args, **kwargs)
+        kwargs["timeout"] = active.statement_timeout()
+        with active.running(lambda: _abort(self._cursor, command)):
+            try:
+                return self._timed(self._cursor.execute, command, *args, **kwargs)
+            except Exception as e:
+                if not active.expired:
+                    raise
+                reason = "disconnect" if active.reason else "deadline"
+                metrics.SF_QUERIES_CANCELLED.inc(method=self._method, reason=reason)
+                raise active.error() from e
+
+    def callproc(self, procname: str, args: Sequence[Any] = ()) -> Sequence[Any]:
+        # What the connector's callproc runs, but through execute() so the deadline applies
+        marker = "%s" if self._cursor.connection.is_pyformat else "?"
+        markers = ", ".join([marker] * len(args))
+        self.execute(f"CALL {procname}({markers})", args)
+        return args
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
+class _Flight:
+    """One in-flight call whose result concurrent identical calls share."""
+
+    def __init__(self, generation: int) -> None:
+        self.done = threading.Event()
+        self.generation = generation
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+# Connector major versions whose private cancel call (see _abort) has been checked
+ABORT_CONNECTOR_MAJORS = (3, 4)
+
+
+@lru_cache(maxsize=None)
+def _abort_supported() -> bool:
+    """True when the installed connector is a release :py:func:`_abort` was checked against."""
+    try:
+        version = _connector().__version__
+    except ImportError:
+        return False
+    if int(str(version).split(".")[0]) in ABORT_CONNECTOR_MAJORS:
+        return True
+    logger.warning("snowflake-connector-python %s is untested; statements are left to their timeout "
+                   "instead of being aborted when a client disconnects", version)
+    return False
+
+
+def _abort(cursor: Any, command: str) -> None:
+    """Cancel the statement *cursor* is executing on the server.
+
+    Sends the abort request the connector itself sends when an ``execute``
+    timeout fires; the connector has no public call for a synchronous query,
+    so this relies on ``connection._cancel_query`` and ``cursor._request_id``
+    and is only done for the connector versions in ``ABORT_CONNECTOR_MAJORS``.
+    """
+    if not _abort_supported():
+        return
+    conn = getattr(cursor, "connection", None)
+    request_id = getattr(cursor, "_request_id", None)
+    if conn is None or request_id is None or not hasattr(conn, "_cancel_query"):
+        return
+    conn._cancel_query(command, request_id)
+
+
+def _normalize_object_name(name: str) -> str:
+    """Upper-case an object name and drop identifier quotes for comparisons."""
+    return (name or "").replace('"', "").upper()
 
 
 class SnowflakeClient:
@@ -29,6 +179,27 @@ class SnowflakeClient:
         self._warehouse: str | None = None
         self._users_cache: Dict[str, Dict[str, Any]] = {}  # Cache for user data by username
         self._cache_timestamp: float | None = None  # When cache was last updated
+        self._key_hygiene: KeyHygiene | None = None  # Counts over the cached users listing
+        self._cache: Dict[str, Tuple[float, Any]] = {}  # Generic TTL cache: key -> (stored_at, value)
+        self._cache_lock = threading.RLock()
+        self._store: Any = None  # Optional persistent backing store (see backend.cache_store)
+        self._shared = False  # True when the store is shared with other worker processes
+        self._local_only: set[str] = set()  # Entries too large for the store
+        self._written_at: Dict[str, float] = {}  # Store row version each shared entry was adopted from
+        self._shared_checked: Dict[str, float] = {}  # Monotonic time each entry was last checked against the store
+        self._restored_keys: set[str] = set()  # Entries loaded from the store, not yet refreshed
+        self._refreshing: set[str] = set()
+        self._conn_params: Dict[str, Any] | None = None  # Kept so pooled connections can be opened
+        self._pool_idle: List[Tuple[Any, int, str | None]] = []  # (connection, generation, warehouse in use)
+        self._pool_in_use = 0
+        self._pool_generation = 0  # Bumped by connect() and close(); older connections are not reused
+        self._connect_lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self._pool_slots = threading.BoundedSemaphore(POOL_SIZE)
+        self._flights: Dict[str, _Flight] = {}  # Loads and queries currently running, by key
+        self._flight_generation = 0  # Bumped by prefix invalidations; older flights are not joined
+        self._flight_counts = {"executions": 0, "collapsed": 0}
+        self._flight_lock = threading.Lock()
 
     def _validate_identifier(self, identifier: str, identifier_type: str = "identifier") -> None:
         """Validate Snowflake identifiers to prevent SQL injection.
@@ -51,7 +222,7 @@ class SnowflakeClient:
             return  # Quoted identifiers are accepted as-is after quote validation
         
         # Unquoted identifiers must match Snowflake naming rules
-        if not re.match(r'^[A-Za-z_][A-Za-z0-9_$]*$', identifier):
+        if not _IDENTIFIER_RE.match(identifier):
             raise ValueError(f"Invalid {identifier_type}: must contain only letters, numbers, underscore, and dollar sign, and start with letter or underscore")
         
         # Additional length check (Snowflake max identifier length is 255)
@@ -67,23 +238,38 @@ class SnowflakeClient:
         Parameters mirror ``snowflake.connector.connect``.  In later phases we'll
         inject the PAT via ``authenticator="OAUTH"`` and pass the token.
         """
-        if snowflake is None:
-            raise RuntimeError("snowflake-connector-python not installed.")
-        if self._conn is not None:
-            return  # Already connected
-        self._conn = snowflake.connector.connect(
-            account=account,
-            user=user,
-            authenticator="oauth",
-            token=pat,
-            warehouse=warehouse,
-            role=role,
-        )
-        self._warehouse = warehouse
+        try:
+            _connector()
+        except ImportError:  # pragma: no cover
+            # Snowflake connector not yet installed in all dev environments.
+            raise RuntimeError("snowflake-connector-python not installed.") from None
+        # Locked so a background warmup and a request cannot both open the session
+        with self._connect_lock:
+            if self._conn is not None:
+                return  # Already connected
+            with self._pool_lock:
+                self._pool_generation += 1
+            self._conn_params = {
+                "account": account,
+                "user": user,
+                "authenticator": "oauth",
+                "token": pat,
+                "warehouse": warehouse,
+                "role": role,
+            }
+            self._conn = self._open_connection()
+            self._warehouse = warehouse
+
+    def _open_connection(self) -> "snowflake.connector.SnowflakeConnection":
+        """Open a new connection using the parameters captured by :py:meth:`connect`."""
+        if self._conn_params is None:
+            raise RuntimeError("Snowflake connection not initialised")
+        conn = _connector().connect(**self._conn_params)
 
         # Explicitly activate warehouse to avoid 000606 errors
+        warehouse = self._conn_params.get("warehouse")
         if warehouse:
-            cur = self._conn.cursor()
+            cur = self._cursor("_open_connection", conn)
             try:
                 # Validate warehouse name to prevent SQL injection
                 self._validate_identifier(warehouse, "warehouse")
@@ -93,14 +279,343 @@ class SnowflakeClient:
                 pass
             finally:
                 cur.close()
+        return conn
+
+    def _cursor(self, method: str, conn: Any = None) -> _InstrumentedCursor:
+        """Open a cursor whose round trips are recorded under *method* (the calling method's name)."""
+        return _InstrumentedCursor((conn or self._conn).cursor(), method)
+
+    def _singleflight(self, key: str, fn: Callable[[], Any], label: str) -> Any:
+        """Run *fn* once for concurrent calls with the same *key* and share the outcome.
+
+        Callers arriving while a call for *key* runs wait for it and get its
+        result, or its exception, instead of running the query again.  Calls
+        started before an :py:meth:`invalidate_cache` covering them are not
+        joined, so callers following a change never get data read before it.  A waiter
+        whose leader ran out of time retries with its own deadline.
+        """
+        active = deadline.current()
+        while True:
+            with self._flight_lock:
+                flight = self._flights.get(key)
+                leader = flight is None or flight.generation != self._flight_generation
+                if leader:
+                    flight = self._flights[key] = _Flight(self._flight_generation)
+                    self._flight_counts["executions"] += 1
+                else:
+                    self._flight_counts["collapsed"] += 1
+            if leader:
+                break
+
+            metrics.SF_QUERIES_COLLAPSED.inc(query=label)
+            # Waiters give up at their own deadline; the leader's query keeps running
+            if not flight.done.wait(timeout=active.remaining() if active else None):
+                raise active.error()
+            if flight.error is None:
+                return flight.value
+            # The leader's request timed out or went away; ours may still have time
+            if not isinstance(flight.error, deadline.DeadlineExceeded) or (active and active.expired):
+                raise flight.error
+
+        try:
+            flight.value = fn()
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flight_lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def _forget_flights(self, *keys: str) -> None:
+        """Let later calls for *keys* run afresh instead of joining the ones already running."""
+        with self._flight_lock:
+            for key in keys:
+                self._flights.pop(key, None)
+
+    def singleflight_stats(self) -> Dict[str, int]:
+        """Calls that ran, calls that shared another's result, and calls running now."""
+        with self._flight_lock:
+            return dict(self._flight_counts, in_flight=len(self._flights))
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Current pooled-connection counts, exported as gauges."""
+        with self._pool_lock:
+            idle = len(self._pool_idle)
+        return {"idle": idle, "in_use": self._pool_in_use}
+
+    @contextmanager
+    def _pooled_connection(self) -> Iterator["snowflake.connector.SnowflakeConnection"]:
+        """Borrow a pooled connection for one query.
+
+        At most ``POOL_SIZE`` connections are handed out at once; callers block
+        until a slot frees up.  Connections are opened lazily and kept open for
+        reuse until :py:meth:`close`; one borrowed across a ``close()`` or a
+        reconnect is closed when it comes back instead of being pooled.  Each
+        is switched to the warehouse chosen with :py:meth:`set_warehouse`.
+        """
+        if self._conn is None:
+            raise RuntimeError("Snowflake connection not initialised")
+        with self._pool_slots:
+            with self._pool_lock:
+                if self._pool_idle:
+                    conn, generation, in_use = self._pool_idle.pop()
+                else:
+                    conn, generation, in_use = None, self._pool_generation, None
+                self._pool_in_use += 1
+            try:
+                if conn is None:
+                    conn = self._open_connection()
+                    in_use = (self._conn_params or {}).get("warehouse")
+                warehouse = self._warehouse
+                if warehouse and warehouse != in_use:
+                    cur = self._cursor("_pooled_connection", conn)
+                    try:
+                        cur.execute(f"USE WAREHOUSE {warehouse}")  # Validated by set_warehouse
+                        in_use = warehouse
+                    except Exception:
+                        # Ignore errors such as warehouse not found, as _ensure_wh does
+                        pass
+                    finally:
+                        cur.close()
+                yield conn
+            finally:
+                with self._pool_lock:
+                    self._pool_in_use -= 1
+                    stale = generation != self._pool_generation
+                    if conn is not None and not stale and not conn.is_closed():
+                        self._pool_idle.append((conn, generation, in_use))
+                        conn = None
+                if conn is not None and stale:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
 
     def close(self) -> None:
         if self._conn is not None:
             self._conn.close()
             self._conn = None
-        # Clear cache when connection is closed
+        with self._pool_lock:
+            idle, self._pool_idle = self._pool_idle, []
+            self._pool_generation += 1
+        for conn, _, _ in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._conn_params = None
+        # Clear cache when connection is closed (the persistent store is kept)
         self._users_cache = {}
         self._cache_timestamp = None
+        with self._cache_lock:
+            self._cache = {}
+            self._restored_keys = set()
+            self._local_only = set()
+            self._written_at = {}
+            self._shared_checked = {}
+
+    # ------------------------------------------------------------------
+    # TTL cache helpers
+    # ------------------------------------------------------------------
+    def _cached(self, key: str, loader: Callable[[], Any], ttl: float = CACHE_TTL_SECONDS) -> Any:
+        """Return the cached value for *key*, calling *loader* when missing or stale.
+
+        Stale entries restored from the persistent store are still served while
+        a background refresh replaces them, once a connection is available.
+        """
+        name = metrics.cache_name(key)
+        entry = self._shared_entry(key) if self._shared else self._cache.get(key)
+        if entry is not None:
+            if (time.time() - entry[0]) < ttl:
+                metrics.CACHE_HITS.inc(cache=name)
+                return entry[1]
+            if key in self._restored_keys and self._conn is not None:
+                metrics.CACHE_HITS.inc(cache=name)
+                self._refresh_in_background(key, loader)
+                return entry[1]
+            metrics.CACHE_EVICTIONS.inc(cache=name, reason="expired")
+        metrics.CACHE_MISSES.inc(cache=name)
+        if self._shared:
+            return self._singleflight(f"cache:{key}", lambda: self._load_shared(key, loader, ttl), name)
+        return self._singleflight(f"cache:{key}", lambda: self._load_local(key, loader), name)
+
+    def _load_local(self, key: str, loader: Callable[[], Any]) -> Any:
+        value = loader()
+        self._set_cached(key, value)
+        return value
+
+    def _set_cached(self, key: str, value: Any) -> None:
+        stored_at = time.time()
+        self._adopt(key, stored_at, value)
+        if self._store is not None:
+            try:
+                if not self._store.put(key, value, stored_at=stored_at):
+                    self._local_only.add(key)
+            except Exception as e:
+                self._local_only.add(key)
+                logger.warning("Could not persist cache entry %s: %s", key, e)
+
+    def _adopt(self, key: str, stored_at: float, value: Any, written_at: float | None = None) -> None:
+        with self._cache_lock:
+            self._cache[key] = (stored_at, value)
+            self._written_at[key] = written_at or stored_at
+            self._restored_keys.discard(key)
+            self._local_only.discard(key)
+        if key == "users":
+            self._users_cache = {user['name']: user for user in value}
+            self._cache_timestamp = stored_at
+            with self._cache_lock:
+                self._key_hygiene = KeyHygiene(value)
+
+    def _shared_entry(self, key: str) -> Tuple[float, Any] | None:
+        """The entry for *key*, reconciled with the store shared by other workers.
+
+        Another worker may have written a newer value or invalidated the entry.
+        A held entry is checked at most every ``SHARED_CHECK_SECONDS`` so hits
+        do not query the store each time.
+        """
+        entry = self._cache.get(key)
+        if key in self._local_only:
+            return entry
+        now = time.monotonic()
+        if entry is not None and now - self._shared_checked.get(key, -SHARED_CHECK_SECONDS) < SHARED_CHECK_SECONDS:
+            return entry
+        self._shared_checked[key] = now
+        try:
+            written_at = self._store.written_at(key)
+            if written_at is None:
+                if entry is not None:
+                    self._drop_local(key, reason="invalidated")
+                return None
+            if entry is None or written_at > self._written_at.get(key, 0.0):
+                fetched = self._store.get(key)
+                if fetched is not None:
+                    self._adopt(key, *fetched, written_at=written_at)
+                    return fetched
+        except Exception as e:
+            logger.warning("Shared cache lookup for %s failed: %s", key, e)
+        return entry
+
+    def _load_shared(self, key: str, loader: Callable[[], Any], ttl: float) -> Any:
+        """Run *loader* in one worker process while the others wait for its result.
+
+        The worker holding the store lease loads and publishes the entry; the
+        rest poll the store and only load themselves if the lease runs out.
+        """
+        lease_until = time.time() + CACHE_LEASE_SECONDS
+        leased = False
+        while True:
+            try:
+                leased = self._store.try_lease(key, CACHE_LEASE_SECONDS)
+            except Exception as e:
+                logger.warning("Shared cache lease for %s failed: %s", key, e)
+                break
+            if leased or time.time() >= lease_until:
+                break
+            time.sleep(0.05)
+            fetched = self._store.get(key)
+            if fetched is not None and (time.time() - fetched[0]) < ttl:
+                self._adopt(key, *fetched)
+                return fetched[1]
+        try:
+            if leased:
+                # Another worker may have published it between our miss and the lease
+                fetched = self._store.get(key)
+                if fetched is not None and (time.time() - fetched[0]) < ttl:
+                    self._adopt(key, *fetched)
+                    return fetched[1]
+            value = loader()
+            self._set_cached(key, value)
+            return value
+        finally:
+            if leased:
+                self._store.release_lease(key)
+
+    def _drop_local(self, key: str, reason: str) -> None:
+        with self._cache_lock:
+            if self._cache.pop(key, None) is None:
+                return
+            self._restored_keys.discard(key)
+            self._local_only.discard(key)
+        if key == "users":
+            self._users_cache = {}
+            self._cache_timestamp = None
+            self._key_hygiene = None
+        metrics.CACHE_EVICTIONS.inc(cache=metrics.cache_name(key), reason=reason)
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Any]) -> None:
+        with self._cache_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _run() -> None:
+            try:
+                self._set_cached(key, loader())
+            except Exception as e:
+                logger.warning("Background refresh of %s failed: %s", key, e)
+            finally:
+                with self._cache_lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_run, name=f"sf-refresh-{key}", daemon=True).start()
+
+    def invalidate_cache(self, prefix: str = "", exact: bool = False) -> None:
+        """Drop cached entries whose key starts with *prefix* (all entries by default).
+
+        With *exact*, only the entry named *prefix* is dropped, and only a
+        running load of that entry stops being joined; other entries and
+        queries are left alone.
+        """
+        if exact:
+            self._forget_flights(f"cache:{prefix}")
+            self._drop_local(prefix, reason="invalidated")
+        else:
+            with self._flight_lock:
+                self._flight_generation += 1
+            with self._cache_lock:
+                keys = [k for k in self._cache if k.startswith(prefix)]
+            for key in keys:
+                self._drop_local(key, reason="invalidated")
+        if self._store is not None:
+            self._store.delete(prefix, exact=exact)
+
+    def attach_store(self, store: Any, shared: bool = False) -> int:
+        """Back the caches with a persistent *store* and load its valid entries.
+
+        With *shared*, the store is also consulted on every lookup so worker
+        processes see each other's loads and invalidations.  Returns the number
+        of entries restored.
+        """
+        self._store = store
+        self._shared = shared
+        entries = store.load_valid()
+        for key, (stored_at, value) in entries.items():
+            self._adopt(key, stored_at, value)
+        with self._cache_lock:
+            self._restored_keys.update(entries)
+        return len(entries)
+
+    def _reset_after_fork(self) -> None:
+        """Forget connections and locks inherited from a preloading parent process.
+
+        The parent's sockets and lock states are not valid in a forked worker;
+        the child opens its own session on first use.  Cached data is kept.
+        """
+        self._conn = None
+        self._conn_params = None
+        self._pool_idle = []
+        self._pool_in_use = 0
+        self._refreshing = set()
+        self._cache_lock = threading.RLock()
+        self._connect_lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self._pool_slots = threading.BoundedSemaphore(POOL_SIZE)
+        self._flights = {}
+        self._flight_lock = threading.Lock()
 
     # ------------------------------------------------------------------
     # Stored-procedure execution – placeholders for now
@@ -114,29 +629,30 @@ class SnowflakeClient:
         if self._conn is None:
             raise RuntimeError("Snowflake connection not initialised")
         self._ensure_wh()
-        cur = self._conn.cursor()
+        cur = self._cursor("call_stored_procedure")
         try:
-            # Debug: Show current context
-            cur.execute("SELECT CURRENT_ROLE(), CURRENT_USER(), CURRENT_WAREHOUSE()")
-            context = cur.fetchone()
-            print(f"Current context - Role: {context[0]}, User: {context[1]}, Warehouse: {context[2]}")
+            # Context lookup costs a round trip, so only run it when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                cur.execute("SELECT CURRENT_ROLE(), CURRENT_USER(), CURRENT_WAREHOUSE()")
+                context = cur.fetchone()
+                logger.debug("Current context - Role: %s, User: %s, Warehouse: %s", *context)
             
-            print(f"Calling stored procedure: {proc_name} with args: {args}")
+            # Arguments are not logged: some procedures take passwords or keys
+            logger.info("Calling stored procedure %s (%d args)", proc_name, len(args))
             result = cur.callproc(proc_name, args)
-            print(f"Stored procedure result: {result}")
             
             # Try to fetch any result set from the stored procedure
             try:
                 rows = cur.fetchall()
                 if rows:
-                    print(f"Stored procedure returned {len(rows)} rows: {rows}")
+                    logger.debug("Stored procedure %s returned %d rows", proc_name, len(rows))
                     return {"success": True, "result": result, "rows": rows}
             except Exception as e:
-                print(f"No result set to fetch (this is normal): {e}")
+                logger.debug("No result set to fetch from %s (this is normal): %s", proc_name, e)
             
             return {"success": True, "result": result}
         except Exception as e:
-            print(f"Error calling stored procedure {proc_name}: {e}")
+            logger.error("Error calling stored procedure %s: %s", proc_name, e)
             raise
         finally:
             cur.close()
@@ -147,46 +663,80 @@ class SnowflakeClient:
     def list_databases(self) -> List[str]:
         if self._conn is None:
             raise RuntimeError("Snowflake connection not initialised")
-        self._ensure_wh()
-        cur = self._conn.cursor()
-        try:
-            cur.execute("SHOW DATABASES")
-            return [row[1] for row in cur.fetchall()]
-        finally:
-            cur.close()
+
+        def _load() -> List[str]:
+            self._ensure_wh()
+            cur = self._cursor("list_databases")
+            try:
+                cur.execute("SHOW DATABASES")
+                return [row[1] for row in cur.fetchall()]
+            finally:
+                cur.close()
+
+        return self._cached("databases", _load)
 
     def list_schemas(self, db: str) -> List[str]:
         if self._conn is None:
             raise RuntimeError("Snowflake connection not initialised")
-        self._ensure_wh()
         
         # Validate database name to prevent SQL injection
         self._validate_identifier(db, "database")
         
-        cur = self._conn.cursor()
-        try:
-            cur.execute(f"SHOW SCHEMAS IN DATABASE {db}")  # SHOW statements require identifier, not parameter
-            return [row[1] for row in cur.fetchall()]
-        finally:
-            cur.close()
+        sql = f"SHOW SCHEMAS IN DATABASE {db}"  # SHOW statements require identifier, not parameter
+
+        def _load() -> List[str]:
+            # Pooled so the schema tree loader can run several of these at once
+            with self._pooled_connection() as conn:
+                cur = self._cursor("list_schemas", conn)
+                try:
+                    cur.execute(sql)
+                    return [row[1] for row in cur.fetchall()]
+                finally:
+                    cur.close()
+
+        return self._singleflight(f"sql:{sql.upper()}", _load, "list_schemas")
+
+    def list_schema_tree(self, refresh: bool = False) -> Dict[str, List[str]]:
+        """Return ``{database: [schemas]}`` for every visible database.
+
+        ``SHOW SCHEMAS`` runs for all databases in parallel (capped at
+        ``POOL_SIZE``) and the whole tree is cached for ``CACHE_TTL_SECONDS``.
+        Databases whose schemas cannot be listed map to an empty list.
+        """
+        if refresh:
+            self.invalidate_cache("schema_tree")
+        return self._cached("schema_tree", self._load_schema_tree)
+
+    def _load_schema_tree(self) -> Dict[str, List[str]]:
+        databases = self.list_databases()
+        if not databases:
+            return {}
+
+        def _schemas_for(db: str) -> List[str]:
+            try:
+                return self.list_schemas(db)
+            except deadline.DeadlineExceeded:
+                raise  # A partial tree must not be cached
+            except Exception as e:
+                logger.warning("Could not list schemas in %s: %s", db, e)
+                return []
+
+        with ThreadPoolExecutor(max_workers=min(POOL_SIZE, len(databases))) as executor:
+            return dict(zip(databases, executor.map(deadline.propagate(_schemas_for), databases)))
 
     def list_roles(self) -> List[str]:
-        if self._conn is None:
-            raise RuntimeError("Snowflake connection not initialised")
-        self._ensure_wh()
-        cur = self._conn.cursor()
-        try:
-            cur.execute("SHOW ROLES")
-            return [row[1] for row in cur.fetchall()]
-        finally:
-            cur.close()
+        # Derived from the detailed listing so both share one cached SHOW ROLES
+        return [role['name'] for role in self.list_roles_detailed()]
 
     def list_roles_detailed(self) -> List[Dict[str, Any]]:
         """List all roles with their detailed information."""
         if self._conn is None:
             raise RuntimeError("Snowflake connection not initialised")
+        return self._cached("roles_detailed", self._load_roles_detailed)
+
+    def _load_roles_detailed(self) -> List[Dict[str, Any]]:
         self._ensure_wh()
-        cur = self._conn.cursor()
+        cur = self._cursor("_load_roles_detailed")
         try:
             cur.execute("SHOW ROLES")
             columns = [desc[0] for desc in cur.description]
@@ -213,69 +763,185 @@ class SnowflakeClient:
         """Get privileges granted to a specific role."""
         if self._conn is None:
             raise RuntimeError("Snowflake connection not initialised")
-        self._ensure_wh()
         
         # Validate role name to prevent SQL injection
         self._validate_identifier(role_name, "role")
         
-        cur = self._conn.cursor()
+        sql = f"SHOW GRANTS TO ROLE {role_name}"  # SHOW statements require identifier, not parameter
+
+        def _load() -> List[Dict[str, Any]]:
+            # Pooled so get_role_details can run this and SHOW GRANTS OF ROLE at once
+            with self._pooled_connection() as conn:
+                cur = self._cursor("get_role_privileges", conn)
+                try:
+                    cur.execute(sql)
+                    columns = [desc[0] for desc in cur.description]
+                    privileges = []
+                    for row in cur.fetchall():
+                        priv_dict = dict(zip(columns, row))
+                        privileges.append({
+                            'created_on': priv_dict.get('created_on', ''),
+                            'privilege': priv_dict.get('privilege', ''),
+                            'granted_on': priv_dict.get('granted_on', ''),
+                            'name': priv_dict.get('name', ''),
+                            'granted_to': priv_dict.get('granted_to', ''),
+                            'grantee_name': priv_dict.get('grantee_name', ''),
+                            'grant_option': priv_dict.get('grant_option', False),
+                            'granted_by': priv_dict.get('granted_by', '')
+                        })
+                    return privileges
+                finally:
+                    cur.close()
+
+        return self._singleflight(f"sql:{sql.upper()}", _load, "get_role_privileges")
+
+    def get_role_privileges_cached(self, role_name: str) -> List[Dict[str, Any]]:
+        """Return ``SHOW GRANTS TO ROLE`` rows, served from the TTL cache when fresh."""
+        return self._cached(
+            f"role_privileges:{role_name.upper()}",
+            lambda: self.get_role_privileges(role_name),
+        )
+
+    def plan_grant(self, perm_type: str, db: str, schema: str | None, role: str) -> Dict[str, Any]:
+        """Diff a grant/revoke request against the role's current privileges.
+
+        ``perm_type`` uses the ``/grant_permissions`` naming, e.g.
+        ``read_grant_schema`` or ``readwrite_revoke_database``.  The result lists
+        the privileges that would change and those already in the requested
+        state; ``noop`` is True when none of them would change.
+
+        Only the container-level privileges in ``GRANT_PLAN_PRIVILEGES`` are
+        compared, so ``noop`` does not prove the procedure would change
+        nothing.  The role's grants are read fresh, not from the cache.
+        """
         try:
-            cur.execute(f"SHOW GRANTS TO ROLE {role_name}")  # SHOW statements require identifier, not parameter
-            columns = [desc[0] for desc in cur.description]
-            privileges = []
-            for row in cur.fetchall():
-                priv_dict = dict(zip(columns, row))
-                privileges.append({
-                    'created_on': priv_dict.get('created_on', ''),
-                    'privilege': priv_dict.get('privilege', ''),
-                    'granted_on': priv_dict.get('granted_on', ''),
-                    'name': priv_dict.get('name', ''),
-                    'granted_to': priv_dict.get('granted_to', ''),
-                    'grantee_name': priv_dict.get('grantee_name', ''),
-                    'grant_option': priv_dict.get('grant_option', False),
-                    'granted_by': priv_dict.get('granted_by', '')
-                })
-            return privileges
-        finally:
-            cur.close()
+            level, action, scope = perm_type.split("_")
+        except (AttributeError, ValueError):
+            raise ValueError(f"Unknown permission type: {perm_type}")
+        if level not in GRANT_PLAN_PRIVILEGES or action not in ("grant", "revoke") or scope not in ("schema", "database"):
+            raise ValueError(f"Unknown permission type: {perm_type}")
+
+        self._validate_identifier(db, "database")
+        self._validate_identifier(role, "role")
+        if scope == "schema":
+            if not schema:
+                raise ValueError("schema is required for schema-level permissions")
+            self._validate_identifier(schema, "schema")
+            schemas = [schema]
+        else:
+            schemas = [s for s in self.list_schemas(db) if s.upper() != "INFORMATION_SCHEMA"]
+
+        wanted_privs = GRANT_PLAN_PRIVILEGES[level]
+        targets: List[Tuple[str, str, str]] = [
+            (priv, "DATABASE", _normalize_object_name(db)) for priv in wanted_privs["DATABASE"]
+        ]
+        for sc in schemas:
+            name = _normalize_object_name(f"{db}.{sc}")
+            targets.extend((priv, "SCHEMA", name) for priv in wanted_privs["SCHEMA"])
+
+        held = {
+            (p.get("privilege", "").upper(), p.get("granted_on", "").upper(), _normalize_object_name(p.get("name", "")))
+            for p in self.get_role_privileges(role)
+        }
+
+        changes: List[Dict[str, str]] = []
+        satisfied: List[Dict[str, str]] = []
+        for priv, obj_type, name in targets:
+            entry = {"privilege": priv, "granted_on": obj_type, "name": name}
+            already = (priv, obj_type, name) in held
+            # A grant is satisfied when held; a revoke when already absent
+            if already == (action == "grant"):
+                satisfied.append(entry)
+            else:
+                changes.append(entry)
+
+        return {
+            "perm_type": perm_type,
+            "action": action,
+            "role": role.upper(),
+            "changes": changes,
+            "satisfied": satisfied,
+            "noop": not changes,
+        }
 
     def get_role_grants(self, role_name: str) -> List[Dict[str, Any]]:
         """Get users and roles that have been granted a specific role."""
         if self._conn is None:
             raise RuntimeError("Snowflake connection not initialised")
-        self._ensure_wh()
         
         # Validate role name to prevent SQL injection
         self._validate_identifier(role_name, "role")
         
-        cur = self._conn.cursor()
-        try:
-            cur.execute(f"SHOW GRANTS OF ROLE {role_name}")  # SHOW statements require identifier, not parameter
-            columns = [desc[0] for desc in cur.description]
-            grants = []
-            for row in cur.fetchall():
-                grant_dict = dict(zip(columns, row))
-                grants.append({
-                    'created_on': grant_dict.get('created_on', ''),
-                    'role': grant_dict.get('role', ''),
-                    'granted_to': grant_dict.get('granted_to', ''),
-                    'grantee_name': grant_dict.get('grantee_name', ''),
-                    'granted_by': grant_dict.get('granted_by', '')
-                })
-            return grants
-        finally:
-            cur.close()
+        sql = f"SHOW GRANTS OF ROLE {role_name}"  # SHOW statements require identifier, not parameter
+
+        def _load() -> List[Dict[str, Any]]:
+            with self._pooled_connection() as conn:
+                cur = self._cursor("get_role_grants", conn)
+                try:
+                    cur.execute(sql)
+                    columns = [desc[0] for desc in cur.description]
+                    grants = []
+                    for row in cur.fetchall():
+                        grant_dict = dict(zip(columns, row))
+                        grants.append({
+                            'created_on': grant_dict.get('created_on', ''),
+                            'role': grant_dict.get('role', ''),
+                            'granted_to': grant_dict.get('granted_to', ''),
+                            'grantee_name': grant_dict.get('grantee_name', ''),
+                            'granted_by': grant_dict.get('granted_by', '')
+                        })
+                    return grants
+                finally:
+                    cur.close()
+
+        return self._singleflight(f"sql:{sql.upper()}", _load, "get_role_grants")
+
+    def get_role_details(self, role_name: str, refresh: bool = False) -> Dict[str, Any]:
+        """Privileges held by *role_name* and the users/roles it is granted to, in one payload.
+
+        Both SHOW statements run at the same time on pooled connections.  The
+        privileges come from the ``role_privileges`` cache entry (while
+        :py:meth:`plan_grant` always reads them fresh); the combined result is
+        cached per role for ``CACHE_TTL_SECONDS``.  ``refresh`` drops both
+        entries first.
+        """
+        self._validate_identifier(role_name, "role")
+        key = f"role_details:{role_name.upper()}"
+        if refresh:
+            self.invalidate_role(role_name)
+        return self._cached(key, lambda: self._load_role_details(role_name))
+
+    def _load_role_details(self, role_name: str) -> Dict[str, Any]:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            privileges = executor.submit(deadline.propagate(self.get_role_privileges_cached), role_name)
+            grants = executor.submit(deadline.propagate(self.get_role_grants), role_name)
+            return {"role": role_name.upper(), "privileges": privileges.result(), "grants": grants.result()}
+
+    def invalidate_role(self, role_name: str) -> None:
+        """Drop the cached privileges and details of *role_name*, e.g. after a grant.
+
+        Only this role's entries go; roles sharing its name as a prefix keep theirs.
+        """
+        role = role_name.upper()
+        # SHOW statements already running for the role may predate the change
+        self._forget_flights(f"sql:SHOW GRANTS TO ROLE {role}", f"sql:SHOW GRANTS OF ROLE {role}")
+        self.invalidate_cache(f"role_privileges:{role}", exact=True)
+        self.invalidate_cache(f"role_details:{role}", exact=True)
 
     def list_warehouses(self) -> List[str]:
         if self._conn is None:
             raise RuntimeError("Snowflake connection not initialised")
-        self._ensure_wh()
-        cur = self._conn.cursor()
-        try:
-            cur.execute("SHOW WAREHOUSES")
-            return [row[0] for row in cur.fetchall()]
-        finally:
-            cur.close()
+
+        def _load() -> List[str]:
+            self._ensure_wh()
+            cur = self._cursor("list_warehouses")
+            try:
+                cur.execute("SHOW WAREHOUSES")
+                return [row[0] for row in cur.fetchall()]
+            finally:
+                cur.close()
+
+        return self._cached("warehouses", _load)
 
     def set_warehouse(self, warehouse: str) -> None:
         """Set the active warehouse for this session."""
@@ -286,7 +952,7 @@ class SnowflakeClient:
         self._validate_identifier(warehouse, "warehouse")
         
         self._warehouse = warehouse
-        cur = self._conn.cursor()
+        cur = self._cursor("set_warehouse")
         try:
             cur.execute(f"USE WAREHOUSE {warehouse}")  # USE statements require identifier, not parameter
         except Exception as e:
@@ -300,12 +966,12 @@ class SnowflakeClient:
         if self._conn is None:
             raise RuntimeError("Snowflake connection not initialised")
         self._ensure_wh()
-        cur = self._conn.cursor()
+        cur = self._cursor("list_stored_procedures")
         try:
             cur.execute(f"SHOW PROCEDURES IN SCHEMA {schema_name}")
             return [row[1] for row in cur.fetchall()]  # Procedure name is usually in column 1
         except Exception as e:
-            print(f"Error listing procedures in {schema_name}: {e}")
+            logger.error("Error listing procedures in %s: %s", schema_name, e)
             return []
         finally:
             cur.close()
@@ -315,7 +981,7 @@ class SnowflakeClient:
         if self._conn is None:
             raise RuntimeError("Snowflake connection not initialised")
         self._ensure_wh()
-        cur = self._conn.cursor()
+        cur = self._cursor("list_users")
         try:
             cur.execute("SHOW USERS")
             columns = [desc[0] for desc in cur.description]
@@ -352,7 +1018,7 @@ class SnowflakeClient:
     # internal helper
     def _ensure_wh(self):
         if self._warehouse and self._conn is not None:
-            cur = self._conn.cursor()
+            cur = self._cursor("_ensure_wh")
             try:
                 # Warehouse name was already validated when set
                 cur.execute(f"USE WAREHOUSE {self._warehouse}")  # USE statements require identifier, not parameter
@@ -367,100 +1033,89 @@ class SnowflakeClient:
         # Validate username to prevent SQL injection
         self._validate_identifier(username, "username")
         
+        # Pick up user listings reloaded or cleared by other worker processes
+        if self._shared:
+            self._shared_entry("users")
+        
         # Check if we have cached data for this user
         if username in self._users_cache:
-            print(f"Retrieved user details for {username} from cache")
+            logger.debug("Retrieved user details for %s from cache", username)
             return self._users_cache[username]
         
         # If not in cache, query the view for this specific user
-        print(f"User {username} not in cache, querying view directly")
+        logger.debug("User %s not in cache, querying view directly", username)
         if self._conn is None:
             raise RuntimeError("Snowflake connection not initialised")
         
-        cur = self._conn.cursor()
-        try:
-            # Query the view for this specific user using parameterized query
-            cur.execute("SELECT * FROM UPLAND_MAINTENANCE.SECURITY.V_USER_KEY_MANAGEMENT WHERE USERNAME = %s", (username,))
-            columns = [desc[0] for desc in cur.description]
-            row = cur.fetchone()
-            
-            if not row:
-                raise Exception(f"User {username} not found in view")
-            
-            user_dict = dict(zip(columns, row))
+        def _load() -> Dict[str, Any]:
+            cur = self._cursor("get_user_details")
+            try:
+                # Query the view for this specific user using parameterized query
+                cur.execute("SELECT * FROM UPLAND_MAINTENANCE.SECURITY.V_USER_KEY_MANAGEMENT WHERE USERNAME = %s", (username,))
+                columns = [desc[0] for desc in cur.description]
+                row = cur.fetchone()
             
-            # Calculate MFA status: positive value for HAS_MFA or EXT_AUTHN_DUO
-            has_mfa_value = user_dict.get('HAS_MFA')
-            ext_authn_duo_value = user_dict.get('EXT_AUTHN_DUO')
+                if not row:
+                    raise Exception(f"User {username} not found in view")
             
-            # Check for positive values (any truthy value or positive number)
-            has_mfa = False
-            if has_mfa_value:
-                if isinstance(has_mfa_value, (int, float)) and has_mfa_value > 0:
-                    has_mfa = True
-                elif isinstance(has_mfa_value, str) and has_mfa_value.lower() in ('true', '1', 'yes', 'y'):
-                    has_mfa = True
-                elif isinstance(has_mfa_value, bool) and has_mfa_value:
-                    has_mfa = True
+                user_dict = dict(zip(columns, row))
             
-            if not has_mfa and ext_authn_duo_value:
-                if isinstance(ext_authn_duo_value, (int, float)) and ext_authn_duo_value > 0:
-                    has_mfa = True
-                elif isinstance(ext_authn_duo_value, str) and ext_authn_duo_value.lower() in ('true', '1', 'yes', 'y'):
-                    has_mfa = True
-                elif isinstance(ext_authn_duo_value, bool) and ext_authn_duo_value:
-                    has_mfa = True
+                # Calculate MFA status: positive value for HAS_MFA or EXT_AUTHN_DUO
+                has_mfa = self._derive_has_mfa(user_dict.get('HAS_MFA'), user_dict.get('EXT_AUTHN_DUO'))
             
-            # Convert to the expected format
-            user_details = {
-                'user_id': user_dict.get('USER_ID', ''),
-                'name': user_dict.get('USERNAME', username),
-                'login_name': user_dict.get('LOGIN_NAME', ''),
-                'display_name': user_dict.get('DISPLAY_NAME', ''),
-                'first_name': user_dict.get('FIRST_NAME', ''),
-                'last_name': user_dict.get('LAST_NAME', ''),
-                'email': user_dict.get('EMAIL', ''),
-                'disabled': self._convert_snowflake_boolean(user_dict.get('DISABLED')),
-                'must_change_password': self._convert_snowflake_boolean(user_dict.get('MUST_CHANGE_PASSWORD')),
-                'snowflake_lock': self._convert_snowflake_boolean(user_dict.get('SNOWFLAKE_LOCK')),
-                'default_warehouse': user_dict.get('DEFAULT_WAREHOUSE', ''),
-                'default_namespace': user_dict.get('DEFAULT_NAMESPACE', ''),
-                'default_role': user_dict.get('DEFAULT_ROLE', ''),
-                'default_secondary_role': user_dict.get('DEFAULT_SECONDARY_ROLE', ''),
-                'created_on': user_dict.get('CREATED_ON', ''),
-                'deleted_on': user_dict.get('DELETED_ON', ''),
-                'last_success_login': user_dict.get('LAST_SUCCESS_LOGIN', ''),
-                'expires_at': user_dict.get('EXPIRES_AT', ''),
-                'locked_until_time': user_dict.get('LOCKED_UNTIL_TIME', ''),
-                'password_last_set_time': user_dict.get('PASSWORD_LAST_SET_TIME', ''),
-                'bypass_mfa_until': user_dict.get('BYPASS_MFA_UNTIL', ''),
-                'has_password': self._convert_snowflake_boolean(user_dict.get('HAS_PASSWORD')),
-                'has_mfa': has_mfa,
-                'ext_authn_duo': user_dict.get('EXT_AUTHN_DUO', ''),
-                'ext_authn_uid': user_dict.get('EXT_AUTHN_UID', ''),
-                'has_rsa_public_key': self._convert_snowflake_boolean(user_dict.get('HAS_RSA_PUBLIC_KEY')),
-                'comment': user_dict.get('COMMENT', ''),
-                'owner': user_dict.get('OWNER', ''),
-                'type': user_dict.get('TYPE', ''),
-                'database_name': user_dict.get('DATABASE_NAME', ''),
-                'database_id': user_dict.get('DATABASE_ID', ''),
-                'schema_name': user_dict.get('SCHEMA_NAME', ''),
-                'schema_id': user_dict.get('SCHEMA_ID', ''),
-                # Note: View-only data, no fingerprints or key content available
-                'rsa_public_key': None,
-                'rsa_public_key_2': None,
-                'rsa_public_key_fingerprint': '',
-                'rsa_public_key_2_fingerprint': '',
-                'view_only': True  # Flag to indicate this is view-only data
-            }
+                # Convert to the expected format
+                user_details = {
+                    'user_id': user_dict.get('USER_ID', ''),
+                    'name': user_dict.get('USERNAME', username),
+                    'login_name': user_dict.get('LOGIN_NAME', ''),
+                    'display_name': user_dict.get('DISPLAY_NAME', ''),
+                    'first_name': user_dict.get('FIRST_NAME', ''),
+                    'last_name': user_dict.get('LAST_NAME', ''),
+                    'email': user_dict.get('EMAIL', ''),
+                    'disabled': self._convert_snowflake_boolean(user_dict.get('DISABLED')),
+                    'must_change_password': self._convert_snowflake_boolean(user_dict.get('MUST_CHANGE_PASSWORD')),
+                    'snowflake_lock': self._convert_snowflake_boolean(user_dict.get('SNOWFLAKE_LOCK')),
+                    'default_warehouse': user_dict.get('DEFAULT_WAREHOUSE', ''),
+                    'default_namespace': user_dict.get('DEFAULT_NAMESPACE', ''),
+                    'default_role': user_dict.get('DEFAULT_ROLE', ''),
+                    'default_secondary_role': user_dict.get('DEFAULT_SECONDARY_ROLE', ''),
+                    'created_on': user_dict.get('CREATED_ON', ''),
+                    'deleted_on': user_dict.get('DELETED_ON', ''),
+                    'last_success_login': user_dict.get('LAST_SUCCESS_LOGIN', ''),
+                    'expires_at': user_dict.get('EXPIRES_AT', ''),
+                    'locked_until_time': user_dict.get('LOCKED_UNTIL_TIME', ''),
+                    'password_last_set_time': user_dict.get('PASSWORD_LAST_SET_TIME', ''),
+                    'bypass_mfa_until': user_dict.get('BYPASS_MFA_UNTIL', ''),
+                    'has_password': self._convert_snowflake_boolean(user_dict.get('HAS_PASSWORD')),
+                    'has_mfa': has_mfa,
+                    'ext_authn_duo': user_dict.get('EXT_AUTHN_DUO', ''),
+                    'ext_authn_uid': user_dict.get('EXT_AUTHN_UID', ''),
+                    'has_rsa_public_key': self._convert_snowflake_boolean(user_dict.get('HAS_RSA_PUBLIC_KEY')),
+                    'comment': user_dict.get('COMMENT', ''),
+                    'owner': user_dict.get('OWNER', ''),
+                    'type': user_dict.get('TYPE', ''),
+                    'database_name': user_dict.get('DATABASE_NAME', ''),
+                    'database_id': user_dict.get('DATABASE_ID', ''),
+                    'schema_name': user_dict.get('SCHEMA_NAME', ''),
+                    'schema_id': user_dict.get('SCHEMA_ID', ''),
+                    # Note: View-only data, no fingerprints or key content available
+                    'rsa_public_key': None,
+                    'rsa_public_key_2': None,
+                    'rsa_public_key_fingerprint': '',
+                    'rsa_public_key_2_fingerprint': '',
+                    'view_only': True  # Flag to indicate this is view-only data
+                }
             
-            # Cache this user for future lookups
-            self._users_cache[username] = user_details
+                # Cache this user for future lookups
+                self._users_cache[username] = user_details
             
-            print(f"Retrieved and cached user details from view for {username}")
-            return user_details
-        finally:
-            cur.close()
+                logger.debug("Retrieved and cached user details from view for %s", username)
+                return user_details
+            finally:
+                cur.close()
+
+        # Keyed by user, so detail panels opened together share one view query
+        return self._singleflight(f"sql:V_USER_KEY_MANAGEMENT:{username}", _load, "get_user_details")
 
     def set_user_public_key(self, username: str, public_key: str, key_number: int = 1) -> Dict[str, Any]:
         """Set RSA public key for a user. key_number can be 1 or 2."""
@@ -474,19 +1129,9 @@ class SnowflakeClient:
         if key_number not in [1, 2]:
             raise ValueError("key_number must be 1 or 2")
         
-        # Extract just the key content (remove header/footer and join lines)
-        lines = public_key.strip().split('\n')
-        if len(lines) > 2 and lines[0].startswith('-----BEGIN') and lines[-1].startswith('-----END'):
-            key_content = ''.join(lines[1:-1])
-        else:
-            # Assume it's already just the key content
-            key_content = public_key.replace('\n', '')
-        
-        # Validate key content contains only base64 characters
-        if not re.match(r'^[A-Za-z0-9+/=]*$', key_content):
-            raise ValueError("Invalid public key format: contains non-base64 characters")
+        key_content = self._extract_key_content(public_key)
         
-        cur = self._conn.cursor()
+        cur = self._cursor("set_user_public_key")
         try:
             if key_number == 1:
                 cur.execute("ALTER USER %s SET RSA_PUBLIC_KEY=%s", (username, key_content))
@@ -521,7 +1166,7 @@ class SnowflakeClient:
         if key_number not in [1, 2]:
             raise ValueError("key_number must be 1 or 2")
         
-        cur = self._conn.cursor()
+        cur = self._cursor("unset_user_public_key")
         try:
             if key_number == 1:
                 cur.execute("ALTER USER %s UNSET RSA_PUBLIC_KEY", (username,))
@@ -552,17 +1197,7 @@ class SnowflakeClient:
         # Validate username to prevent SQL injection
         self._validate_identifier(username, "username")
         
-        # Extract just the key content (remove header/footer and join lines)
-        lines = public_key.strip().split('\n')
-        if len(lines) > 2 and lines[0].startswith('-----BEGIN') and lines[-1].startswith('-----END'):
-            key_content = ''.join(lines[1:-1])
-        else:
-            # Assume it's already just the key content
-            key_content = public_key.replace('\n', '')
-        
-        # Validate key content contains only base64 characters
-        if not re.match(r'^[A-Za-z0-9+/=]*$', key_content):
-            raise ValueError("Invalid public key format: contains non-base64 characters")
+        key_content = self._extract_key_content(public_key)
         
         # Validate new_type if provided
         if new_type and new_type.upper() not in ['PERSON', 'SERVICE', 'LEGACY_SERVICE', 'NULL']:
@@ -594,14 +1229,14 @@ class SnowflakeClient:
                 }
             }
         except Exception as stored_proc_error:
-            print(f"Stored procedure failed, falling back to direct ALTER USER: {stored_proc_error}")
+            logger.warning("Stored procedure failed, falling back to direct ALTER USER: %s", stored_proc_error)
             
             # Fallback: use direct ALTER USER commands
             if self._conn is None:
                 raise RuntimeError("Snowflake connection not initialised")
             self._ensure_wh()
             
-            cur = self._conn.cursor()
+            cur = self._cursor("update_user_rsa_key")
             actions_performed = {
                 'rsa_key_set': False,
                 'password_unset': False,
@@ -629,7 +1264,7 @@ class SnowflakeClient:
                 
                 # Execute ALTER USER command
                 alter_sql = f'ALTER USER "{username}" SET ' + ', '.join(set_clauses)
-                print(f"Executing fallback ALTER USER: {alter_sql}")
+                logger.info("Executing fallback ALTER USER for %s", username)
                 cur.execute(alter_sql)
                 
                 # Track successful actions
@@ -683,7 +1318,7 @@ class SnowflakeClient:
                 user['has_rsa_public_key'] = user['has_rsa_public_key_1'] or user['has_rsa_public_key_2']
             except Exception as e:
                 # If we can't get details, use conservative defaults
-                print(f"Warning: Could not get key details for user {user['name']}: {e}")
+                logger.warning("Could not get key details for user %s: %s", user['name'], e)
                 user['rsa_public_key_fingerprint'] = ''
                 user['rsa_public_key_2_fingerprint'] = ''
                 user['has_rsa_public_key_1'] = False
@@ -692,6 +1327,35 @@ class SnowflakeClient:
         
         return users
 
+    @staticmethod
+    def _extract_key_content(public_key: str) -> str:
+        """Strip the PEM header/footer and line breaks from *public_key*.
+
+        Raises ValueError if what remains is not base64.
+        """
+        lines = public_key.strip().split('\n')
+        if len(lines) > 2 and lines[0].startswith('-----BEGIN') and lines[-1].startswith('-----END'):
+            key_content = ''.join(lines[1:-1])
+        else:
+            # Assume it's already just the key content
+            key_content = public_key.replace('\n', '')
+        
+        # Validate key content contains only base64 characters
+        if not _BASE64_RE.match(key_content):
+            raise ValueError("Invalid public key format: contains non-base64 characters")
+        return key_content
+
+    def _derive_has_mfa(self, has_mfa_value: Any, ext_authn_duo_value: Any) -> bool:
+        """True when HAS_MFA or EXT_AUTHN_DUO holds a positive value."""
+        for value in (has_mfa_value, ext_authn_duo_value):
+            if not value:
+                continue
+            if isinstance(value, (int, float)) and value > 0:
+                return True
+            if isinstance(value, str) and value.lower() in ('true', '1', 'yes', 'y'):
+                return True
+        return False
+
     def _convert_snowflake_boolean(self, value) -> bool:
         """Convert Snowflake boolean values to proper Python boolean.
         
@@ -714,84 +1378,54 @@ class SnowflakeClient:
         if self._conn is None:
             raise RuntimeError("Snowflake connection not initialised")
         
-        cur = self._conn.cursor()
+        cur = self._cursor("list_users_from_view")
         try:
-            print("Starting list_users_from_view method...")
-            
-            # Check current context
-            print("Checking current context...")
-            try:
+            # Context lookup costs a round trip, so only run it when debugging
+            if logger.isEnabledFor(logging.DEBUG):
                 cur.execute("SELECT CURRENT_DATABASE(), CURRENT_SCHEMA(), CURRENT_ROLE(), CURRENT_USER()")
                 context = cur.fetchone()
-                print(f"Current context - Database: {context[0]}, Schema: {context[1]}, Role: {context[2]}, User: {context[3]}")
-            except Exception as context_error:
-                print(f"Failed to get current context: {context_error}")
-                raise
+                logger.debug("Current context - Database: %s, Schema: %s, Role: %s, User: %s", *context)
             
             # Find an available warehouse
-            print("Finding available warehouses...")
             try:
                 cur.execute("SHOW WAREHOUSES")
                 warehouses = [row[0] for row in cur.fetchall()]
-                print(f"Available warehouses: {warehouses}")
                 
                 if warehouses:
                     warehouse_to_use = warehouses[0]  # Use the first available warehouse
-                    print(f"Using warehouse: {warehouse_to_use}")
                     # Validate warehouse name to prevent SQL injection
                     self._validate_identifier(warehouse_to_use, "warehouse")
                     cur.execute(f"USE WAREHOUSE {warehouse_to_use}")  # USE statements require identifier, not parameter
-                    print(f"Successfully set warehouse to {warehouse_to_use}")
+                    logger.debug("Using warehouse %s for view query", warehouse_to_use)
                 else:
-                    print("No warehouses available - trying without warehouse")
+                    logger.warning("No warehouses available - trying without warehouse")
             except Exception as wh_error:
-                print(f"Failed to set warehouse: {wh_error} - trying without warehouse")
+                logger.warning("Failed to set warehouse: %s - trying without warehouse", wh_error)
             
             # Now try the view query with explicit database.schema.view reference
-            print("Attempting to query V_USER_KEY_MANAGEMENT view...")
             try:
                 cur.execute("SELECT * FROM UPLAND_MAINTENANCE.SECURITY.V_USER_KEY_MANAGEMENT")
-                print(f"View query successful! Retrieved {cur.rowcount} rows")
             except Exception as view_error:
-                print(f"Failed to query view: {view_error}")
+                logger.error("Failed to query V_USER_KEY_MANAGEMENT: %s", view_error)
                 raise
             
             columns = [desc[0] for desc in cur.description]
             users = []
+            debug_rows = logger.isEnabledFor(logging.DEBUG)
             
             for row in cur.fetchall():
                 user_dict = dict(zip(columns, row))
                 
-                # Debug logging for first few users to see raw values
-                if len(users) < 3:  # Log first 3 users
-                    print(f"Debug - Raw Snowflake data for user {user_dict.get('USERNAME', 'unknown')}:")
-                    print(f"  DISABLED: {user_dict.get('DISABLED')} (type: {type(user_dict.get('DISABLED'))})")
-                    print(f"  MUST_CHANGE_PASSWORD: {user_dict.get('MUST_CHANGE_PASSWORD')} (type: {type(user_dict.get('MUST_CHANGE_PASSWORD'))})")
-                    print(f"  SNOWFLAKE_LOCK: {user_dict.get('SNOWFLAKE_LOCK')} (type: {type(user_dict.get('SNOWFLAKE_LOCK'))})")
-                    print(f"  HAS_MFA: {user_dict.get('HAS_MFA')} (type: {type(user_dict.get('HAS_MFA'))})")
-                    print(f"  EXT_AUTHN_DUO: {user_dict.get('EXT_AUTHN_DUO')} (type: {type(user_dict.get('EXT_AUTHN_DUO'))})")
+                # Raw values for the first few users help diagnose boolean conversion
+                if debug_rows and len(users) < 3:
+                    logger.debug(
+                        "Raw view row for %s: DISABLED=%r MUST_CHANGE_PASSWORD=%r SNOWFLAKE_LOCK=%r HAS_MFA=%r EXT_AUTHN_DUO=%r",
+                        user_dict.get('USERNAME', 'unknown'), user_dict.get('DISABLED'), user_dict.get('MUST_CHANGE_PASSWORD'),
+                        user_dict.get('SNOWFLAKE_LOCK'), user_dict.get('HAS_MFA'), user_dict.get('EXT_AUTHN_DUO'),
+                    )
                 
                 # Calculate MFA status: positive value for HAS_MFA or EXT_AUTHN_DUO
-                has_mfa_value = user_dict.get('HAS_MFA')
-                ext_authn_duo_value = user_dict.get('EXT_AUTHN_DUO')
-                
-                # Check for positive values (any truthy value or positive number)
-                has_mfa = False
-                if has_mfa_value:
-                    if isinstance(has_mfa_value, (int, float)) and has_mfa_value > 0:
-                        has_mfa = True
-                    elif isinstance(has_mfa_value, str) and has_mfa_value.lower() in ('true', '1', 'yes', 'y'):
-                        has_mfa = True
-                    elif isinstance(has_mfa_value, bool) and has_mfa_value:
-                        has_mfa = True
-                
-                if not has_mfa and ext_authn_duo_value:
-                    if isinstance(ext_authn_duo_value, (int, float)) and ext_authn_duo_value > 0:
-                        has_mfa = True
-                    elif isinstance(ext_authn_duo_value, str) and ext_authn_duo_value.lower() in ('true', '1', 'yes', 'y'):
-                        has_mfa = True
-                    elif isinstance(ext_authn_duo_value, bool) and ext_authn_duo_value:
-                        has_mfa = True
+                has_mfa = self._derive_has_mfa(user_dict.get('HAS_MFA'), user_dict.get('EXT_AUTHN_DUO'))
                 
                 users.append({
                     'user_id': user_dict.get('USER_ID', ''),
@@ -834,16 +1468,24 @@ class SnowflakeClient:
                     'rsa_public_key_2_fingerprint': ''
                 })
             
-            print(f"Successfully loaded {len(users)} users from view")
+            logger.info("Loaded %d users from V_USER_KEY_MANAGEMENT", len(users))
             return users
         finally:
             cur.close()
 
-    def list_users_with_keys_optimized(self) -> List[Dict[str, Any]]:
-        """Optimized method that calls the view only once and caches all user data."""
+    def list_users_with_keys_optimized(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Optimized method that calls the view only once and caches all user data.
+
+        A full listing younger than ``CACHE_TTL_SECONDS`` is served from the
+        cache unless *refresh* is set.
+        """
+        if refresh:
+            self.invalidate_cache("users")
+        return self._cached("users", self._load_users_with_keys)
+
+    def _load_users_with_keys(self) -> List[Dict[str, Any]]:
         # Get all users from the view in a single call
         users = self.list_users_from_view()
-        print(f"Single view call loaded {len(users)} users - no additional queries needed")
         
         # Cache all user data by username for efficient individual lookups
         self._users_cache = {}
@@ -851,19 +1493,75 @@ class SnowflakeClient:
             self._users_cache[user['name']] = user
         self._cache_timestamp = time.time()
         
-        print(f"Cached {len(self._users_cache)} users for efficient individual lookups")
+        logger.debug("Cached %d users for individual lookups", len(self._users_cache))
         
         # All data is now available from the view, no need for individual user calls
         # The view provides all the information we need for the key management interface
         
         return users
 
+    def patch_cached_user(self, username: str, changes: Dict[str, Any]) -> bool:
+        """Apply *changes* to *username*'s row in the cached users listing.
+
+        Called after a mutation whose effect on the row is known, so the
+        listing and :py:meth:`key_hygiene` stay current without reloading
+        every user.  The patched listing keeps the age of the original read,
+        so it still expires ``CACHE_TTL_SECONDS`` after Snowflake was queried;
+        a shared store gets it as a rewritten row so other workers adopt it.
+        Returns False when no listing is cached; if the listing lacks the user
+        it is dropped instead.
+        """
+        with self._cache_lock:
+            entry = self._cache.get("users")
+            hygiene = self._key_hygiene
+            if entry is None or hygiene is None:
+                return False
+            name = username if username in hygiene else username.upper()
+            row = hygiene.patch(name, changes)
+            if row is not None:
+                # A new list of rows: the old one may be held by callers (or the
+                # broker's encoded-response cache), and the entry keeps its age
+                users = [row if user['name'] == name else user for user in entry[1]]
+                written_at = time.time()
+                self._cache["users"] = (entry[0], users)
+                self._written_at["users"] = written_at
+                self._users_cache[name] = row
+        if row is None:
+            # A listing without the user is out of date anyway
+            self.clear_users_cache()
+            return False
+        if self._store is not None and "users" not in self._local_only:
+            try:
+                self._store.put("users", users, stored_at=entry[0], written_at=written_at)
+            except Exception as e:
+                logger.warning("Could not persist patched users listing: %s", e)
+        return True
+
+    def key_hygiene(self) -> Dict[str, Any]:
+        """Counts of users by key, password and MFA status (see ``backend.key_hygiene``).
+
+        Served from counts maintained alongside the cached users listing; the
+        listing is only loaded when it is missing or stale.
+        """
+        users = self.list_users_with_keys_optimized()
+        with self._cache_lock:
+            hygiene = self._key_hygiene
+            if hygiene is None:  # dropped by a concurrent invalidation
+                hygiene = KeyHygiene(users)
+            return hygiene.snapshot()
+
     def clear_users_cache(self) -> None:
         """Clear the cached user data to force a fresh load from the view."""
         self._users_cache = {}
         self._cache_timestamp = None
-        print("User cache cleared")
+        self.invalidate_cache("users")
+        logger.debug("User cache cleared")
 
 
 # Module-level singleton for convenience
-client = SnowflakeClient() 
\ No newline at end of file
+client = SnowflakeClient()
+os.register_at_fork(after_in_child=client._reset_after_fork)
+
+metrics.POOL_CONNECTIONS.set_function(lambda: client.pool_stats()["idle"], state="idle")
+metrics.POOL_CONNECTIONS.set_function(lambda: client.pool_stats()["in_use"], state="in_use")
+metrics.POOL_CONNECTIONS.set_function(lambda: int(client._conn is not None), state="primary") 
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""warmup.py – background cache warmup after OAuth login.
+
+Right after the OAuth callback we open the Snowflake connection and preload
+the datasets every tab needs first, so the initial tab render is served from
+the :py:class:`~backend.snowflake_client.SnowflakeClient` caches.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Set WARMUP_ON_LOGIN=false to disable the post-login warmup
+WARMUP_ON_LOGIN = os.getenv("WARMUP_ON_LOGIN", "true").lower() in ("1", "true", "yes")
+
+
+def default_steps(client: Any) -> List[Tuple[str, Callable[[], Any]]]:
+    """Datasets preloaded after login, in the order the UI usually needs them."""
+    return [
+        ("users", client.list_users_with_keys_optimized),
+        ("roles", client.list_roles_detailed),
+        ("warehouses", client.list_warehouses),
+        ("databases", client.list_schema_tree),
+    ]
+
+
+class Warmup:
+    """Runs the warmup steps on a daemon thread and records their progress."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._state: Dict[str, Any] = {"status": "idle", "steps": {}}
+
+    def start(self, connect: Callable[[], None], steps: List[Tuple[str, Callable[[], Any]]]) -> bool:
+        """Start a warmup unless one is already running.  Returns True if started."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._state = {
+                "status": "running",
+                "started_at": time.time(),
+                "finished_at": None,
+                "steps": {"connect": "pending", **{name: "pending" for name, _ in steps}},
+            }
+            self._thread = threading.Thread(target=self._run, args=(connect, steps), name="sf-warmup", daemon=True)
+            self._thread.start()
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        """Snapshot of the current warmup progress, safe to serialise as JSON."""
+        with self._lock:
+            return {**self._state, "steps": dict(self._state["steps"])}
+
+    def _set_step(self, name: str, value: str) -> None:
+        with self._lock:
+            self._state["steps"][name] = value
+
+    def _run(self, connect: Callable[[], None], steps: List[Tuple[str, Callable[[], Any]]]) -> None:
+        status = "done"
+        try:
+            self._set_step("connect", "running")
+            connect()
+            self._set_step("connect", "done")
+        except Exception as e:
+            logger.warning("Warmup could not connect to Snowflake: %s", e)
+            self._set_step("connect", "error")
+            status = "error"
+            steps = []
+
+        for name, load in steps:
+            self._set_step(name, "running")
+            try:
+                load()
+                self._set_step(name, "done")
+            except Exception as e:
+                # A failed dataset just loads on demand later; keep warming the rest
+                logger.warning("Warmup step %s failed: %s", name, e)
+                self._set_step(name, "error")
+                status = "partial"
+
+        with self._lock:
+            self._state["status"] = status
+            self._state["finished_at"] = time.time()
+
+
+# Module-level singleton for convenience
+warmup = Warmup()
@@ -0,0 +1,190 @@
+"""Microbenchmarks for the key-management hot paths.
+
+Covers RSA key pair generation, ``list_users_from_view`` row conversion against
+a fake cursor (see ``fake_snowflake.py``), the boolean/MFA normalisation, the
+``jsonify`` of the ``/keys/users`` payload and the PEM header stripping used by
+``set_user_public_key``.  Each case reports the median of several repeats.
+
+Results can be saved as a baseline and later runs compared against it; any
+case slower than the baseline by more than ``--threshold`` is flagged and the
+script exits non-zero.
+
+    python benchmarks/bench_hot_paths.py --save benchmarks/baseline_hot_paths.json
+    python benchmarks/bench_hot_paths.py --compare benchmarks/baseline_hot_paths.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Keep per-call INFO logging out of the timings
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import app as flask_app  # noqa: E402
+from backend.snowflake_client import SnowflakeClient  # noqa: E402
+from fake_snowflake import FakeConnection, user_rows  # noqa: E402
+
+ROW_COUNTS = (1_000, 10_000, 100_000)
+
+Case = Tuple[str, Callable[[], object], int]
+
+
+def _median_seconds(fn: Callable[[], object], repeat: int) -> float:
+    fn()  # warm up caches and lazy imports outside the measurement
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def keygen_cases(upload_dir: str) -> List[Case]:
+    flask_app.app.config["UPLOAD_FOLDER"] = upload_dir
+
+    def _generate(encrypted: bool) -> Callable[[], object]:
+        def run() -> object:
+            result = flask_app.generate_key_pair("BENCH_USER", encrypted=encrypted, passphrase="bench-passphrase")
+            if not result["success"]:
+                raise RuntimeError(result["messages"])
+            return result
+        return run
+
+    return [
+        ("generate_key_pair[unencrypted]", _generate(False), 5),
+        ("generate_key_pair[encrypted]", _generate(True), 5),
+    ]
+
+
+def row_conversion_cases(row_counts: Tuple[int, ...]) -> List[Case]:
+    cases = []
+    for count in row_counts:
+        client = SnowflakeClient()
+        client._conn = FakeConnection(users=count)
+        cases.append((f"list_users_from_view[{count}]", client.list_users_from_view, 3 if count >= 100_000 else 7))
+    return cases
+
+
+def normalisation_cases() -> List[Case]:
+    client = SnowflakeClient()
+    rows = user_rows(10_000)
+    # DISABLED..SNOWFLAKE_LOCK, HAS_PASSWORD, HAS_RSA_PUBLIC_KEY as the row mapper sees them
+    booleans = [v for r in rows for v in (r[7], r[8], r[9], r[21], r[25])]
+    mfa_pairs = [(r[22], r[23]) for r in rows]
+
+    def convert_booleans() -> object:
+        convert = client._convert_snowflake_boolean
+        return [convert(v) for v in booleans]
+
+    def derive_mfa() -> object:
+        derive = client._derive_has_mfa
+        return [derive(a, b) for a, b in mfa_pairs]
+
+    return [
+        (f"_convert_snowflake_boolean[{len(booleans)}]", convert_booleans, 7),
+        (f"_derive_has_mfa[{len(mfa_pairs)}]", derive_mfa, 7),
+    ]
+
+
+def jsonify_cases(row_counts: Tuple[int, ...]) -> List[Case]:
+    cases = []
+    for count in row_counts:
+        client = SnowflakeClient()
+        client._conn = FakeConnection(users=count)
+        users = client.list_users_from_view()
+
+        def run(users=users) -> object:
+            with flask_app.app.app_context():
+                return flask_app.jsonify({"success": True, "data": users}).get_data()
+
+        cases.append((f"jsonify_users[{count}]", run, 3 if count >= 100_000 else 7))
+    return cases
+
+
+def key_stripping_cases() -> List[Case]:
+    body = base64.b64encode(os.urandom(294)).decode()
+    pem = "-----BEGIN PUBLIC KEY-----\n" + "\n".join(body[i:i + 64] for i in range(0, len(body), 64)) + "\n-----END PUBLIC KEY-----\n"
+    keys = [pem] * 10_000
+
+    def run() -> object:
+        extract = SnowflakeClient._extract_key_content
+        return [extract(k) for k in keys]
+
+    return [(f"_extract_key_content[{len(keys)}]", run, 7)]
+
+
+def run_cases(cases: List[Case]) -> Dict[str, float]:
+    results = {}
+    for name, fn, repeat in cases:
+        results[name] = _median_seconds(fn, repeat)
+        print(f"{name:<40} {results[name] * 1e3:>12.3f} ms", flush=True)
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    print(f"\n{'case':<40} {'baseline ms':>12} {'now ms':>12} {'ratio':>8}")
+    regressions = []
+    for name, elapsed in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<40} {'-':>12} {elapsed * 1e3:>12.3f} {'new':>8}")
+            continue
+        ratio = elapsed / before
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:<40} {before * 1e3:>12.3f} {elapsed * 1e3:>12.3f} {ratio:>7.2f}x{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    parser.add_argument("--max-rows", type=int, default=max(ROW_COUNTS), help="skip row counts above this")
+    parser.add_argument("--skip-keygen", action="store_true", help="skip the openssl key generation cases")
+    args = parser.parse_args()
+
+    row_counts = tuple(c for c in ROW_COUNTS if c <= args.max_rows)
+    with tempfile.TemporaryDirectory() as upload_dir:
+        cases: List[Case] = [] if args.skip_keygen else keygen_cases(upload_dir)
+        cases += row_conversion_cases(row_counts)
+        cases += normalisation_cases()
+        cases += jsonify_cases(row_counts)
+        cases += key_stripping_cases()
+        results = run_cases(cases)
+
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results,
+            }, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than {args.threshold:.2f}x baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Cold import time of the app, as seen by a gunicorn master or a test run.
+
+Each repeat imports the target module in a fresh interpreter with
+``python -X importtime`` and records the cumulative time of the target and of
+its slowest direct imports; the median over repeats is reported.  The
+modules listed in ``DEFERRED`` are imported lazily on first use and must not
+show up at all – if one does, the script says which import pulled it in and
+exits non-zero.
+
+Results can be saved as a baseline and later runs compared against it, like
+``bench_hot_paths.py``:
+
+    python benchmarks/bench_import_time.py --save benchmarks/baseline_import_time.json
+    python benchmarks/bench_import_time.py --compare benchmarks/baseline_import_time.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy dependencies that only specific routes need
+DEFERRED = ("snowflake.connector", "requests")
+# Slowest direct imports of the target listed in the output
+TOP_IMPORTS = 8
+
+
+def _parse(stderr: str) -> List[Tuple[int, str, int]]:
+    """(depth, module, cumulative microseconds) for each ``-X importtime`` line, in output order."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        entries.append((depth, name.strip(), int(cumulative)))
+    return entries
+
+
+def import_once(module: str) -> Tuple[Dict[str, float], List[str]]:
+    """Import *module* in a new interpreter.
+
+    Returns timings in seconds and, for each deferred dependency that was
+    loaded anyway, a note naming the direct import of *module* that loaded it.
+    """
+    env = dict(os.environ, LOG_LEVEL="WARNING", PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=False,
+    )
+    entries = _parse(proc.stderr)
+    if proc.returncode != 0 or not entries:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    # Output is post-order: a module's imports are printed before it, one level deeper
+    timings: Dict[str, float] = {}
+    loaded: List[str] = []
+    direct: List[Tuple[int, str]] = []
+    deferred_here: List[str] = []
+    for depth, name, cumulative in entries:
+        if depth == 0:
+            if name == module:
+                timings[module] = cumulative / 1e6
+                for micros, child in sorted(direct, reverse=True)[:TOP_IMPORTS]:
+                    timings[f"{module} > {child}"] = micros / 1e6
+            direct = []
+            continue
+        if name in DEFERRED:
+            deferred_here.append(name)
+        if depth == 1:
+            direct.append((cumulative, name))
+            loaded += [f"{dep} (via {name})" for dep in deferred_here]
+            deferred_here = []
+    return timings, loaded
+
+
+def run(module: str, repeat: int) -> Tuple[Dict[str, float], List[str]]:
+    samples: Dict[str, List[float]] = {}
+    loaded: List[str] = []
+    import_once(module)  # warm the filesystem cache outside the measurement
+    for _ in range(repeat):
+        timings, loaded = import_once(module)
+        for name, seconds in timings.items():
+            samples.setdefault(name, []).append(seconds)
+    results = {name: statistics.median(values) for name, values in samples.items()}
+    for name, seconds in sorted(results.items(), key=lambda item: (item[0] != module, -item[1])):
+        print(f"{name:<48} {seconds * 1e3:>10.1f} ms", flush=True)
+    return results, loaded
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    print(f"\n{'import':<48} {'baseline ms':>12} {'now ms':>10} {'ratio':>8}")
+    regressions = []
+    for name, elapsed in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<48} {'-':>12} {elapsed * 1e3:>10.1f} {'new':>8}")
+            continue
+        ratio = elapsed / before
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:<48} {before * 1e3:>12.1f} {elapsed * 1e3:>10.1f} {ratio:>7.2f}x{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app", help="module to import")
+    parser.add_argument("--repeat", type=int, default=7, help="fresh interpreters to time")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    results, loaded = run(args.module, args.repeat)
+    failed = False
+    if loaded:
+        print(f"\nimport {args.module} loaded deferred dependencies: {', '.join(sorted(set(loaded)))}")
+        failed = True
+
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "module": args.module,
+                "results": {args.module: results[args.module]},
+            }, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)["results"]
+        regressions = compare({args.module: results[args.module]}, baseline, args.threshold)
+        if regressions:
+            print(f"\nimport {args.module} is slower than {args.threshold:.2f}x baseline")
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Request-thread cost of logging: old synchronous print() vs the queued pipeline.
+
+Runs a simulated hot path (the per-call messages of ``call_stored_procedure``)
+N times and reports the mean per-call overhead on the calling thread, in two
+scenarios:
+
+* request path – what one call cost before and after the change: the four
+  ``print()`` lines with the argument and full result dumps, against one INFO
+  record through the queue plus the DEBUG records the default level filters.
+* equal work – every variant writes the same three messages at an enabled
+  level, comparing the output paths alone.
+
+Output goes to a temporary file flushed per line, which is what a terminal or
+a process supervisor pipe costs in practice.
+
+    python benchmarks/bench_logging.py --iterations 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.log_setup import LOG_FORMAT, _DroppingQueueHandler  # noqa: E402
+
+PROC = "sp_grant_read_perms"
+ARGS = ["DB1", "PUBLIC", "DEV"]
+RESULT = [("Granted read on DB1.PUBLIC to DEV",)] * 20
+
+
+def _print_request(n: int) -> None:
+    # The prints call_stored_procedure made per call before the change
+    for _ in range(n):
+        print("Current context - Role: SYSADMIN, User: ADMIN, Warehouse: WH", flush=True)
+        print(f"Calling stored procedure: {PROC} with args: {ARGS}", flush=True)
+        print(f"Stored procedure result: {ARGS}", flush=True)
+        print(f"Stored procedure returned {len(RESULT)} rows: {RESULT}", flush=True)
+
+
+def _log_request(log: logging.Logger, n: int) -> None:
+    # The records it emits now; at the default INFO level only the second is written
+    for _ in range(n):
+        log.debug("Current context - Role: %s, User: %s, Warehouse: %s", "SYSADMIN", "ADMIN", "WH")
+        log.info("Calling stored procedure %s (%d args)", PROC, len(ARGS))
+        log.debug("Stored procedure %s returned %d rows", PROC, len(RESULT))
+
+
+def _print_equal(n: int) -> None:
+    for _ in range(n):
+        print("Current context - Role: SYSADMIN, User: ADMIN, Warehouse: WH", flush=True)
+        print(f"Calling stored procedure: {PROC} with args: {ARGS}", flush=True)
+        print(f"Stored procedure result: {RESULT}", flush=True)
+
+
+def _log_equal(log: logging.Logger, n: int) -> None:
+    for _ in range(n):
+        log.info("Current context - Role: %s, User: %s, Warehouse: %s", "SYSADMIN", "ADMIN", "WH")
+        log.info("Calling stored procedure: %s with args: %s", PROC, ARGS)
+        log.info("Stored procedure result: %s", RESULT)
+
+
+def _logger(handler: logging.Handler) -> logging.Logger:
+    log = logging.getLogger("bench")
+    log.handlers = [handler]
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    return log
+
+
+def bench_print(path: Callable[[int], None], n: int, sink) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sink):
+        path(n)
+    return time.perf_counter() - start
+
+
+def bench_sync_logging(path: Callable[[logging.Logger, int], None], n: int, sink) -> float:
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log = _logger(handler)
+    start = time.perf_counter()
+    path(log, n)
+    return time.perf_counter() - start
+
+
+def bench_queued_logging(path: Callable[[logging.Logger, int], None], n: int, sink) -> float:
+    target = logging.StreamHandler(sink)
+    target.setFormatter(logging.Formatter(LOG_FORMAT))
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(q, target)
+    log = _logger(_DroppingQueueHandler(q, max_size=n * 3 + 1))
+    listener.start()
+    start = time.perf_counter()
+    path(log, n)
+    elapsed = time.perf_counter() - start
+    listener.stop()  # drain outside the timed section: that work is off the request thread
+    return elapsed
+
+
+def _report(title: str, results: Dict[str, float], iterations: int) -> None:
+    baseline = next(iter(results.values()))
+    print(f"\n{title}")
+    print(f"{'variant':<24} {'us/call':>10} {'vs before':>10}")
+    for name, elapsed in results.items():
+        per_call = elapsed / iterations * 1e6
+        print(f"{name:<24} {per_call:>10.2f} {baseline / elapsed:>9.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    scenarios = {
+        "Request path (before vs after the change)": {
+            "print (before)": lambda n, sink: bench_print(_print_request, n, sink),
+            "queued logging (after)": lambda n, sink: bench_queued_logging(_log_request, n, sink),
+        },
+        "Equal work (three lines written per call)": {
+            "print": lambda n, sink: bench_print(_print_equal, n, sink),
+            "sync logging": lambda n, sink: bench_sync_logging(_log_equal, n, sink),
+            "queued logging": lambda n, sink: bench_queued_logging(_log_equal, n, sink),
+        },
+    }
+    for title, variants in scenarios.items():
+        results = {}
+        for name, fn in variants.items():
+            with tempfile.TemporaryFile("w") as sink:
+                results[name] = fn(args.iterations, sink)
+        _report(title, results, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
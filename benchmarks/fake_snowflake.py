@@ -0,0 +1,158 @@
+"""In-process stand-in for ``snowflake.connector`` used by the benchmarks.
+
+:py:class:`FakeConnection` answers the statements ``SnowflakeClient`` issues
+(SHOW DATABASES/SCHEMAS/ROLES/WAREHOUSES/GRANTS, the V_USER_KEY_MANAGEMENT
+view, ALTER USER and stored-procedure calls) with synthetic rows, optionally
+sleeping *latency* seconds per round trip to imitate a warehouse.  Use
+:py:func:`connect` wherever ``snowflake.connector.connect`` is expected.
+"""
+
+from __future__ import annotations
+
+import datetime
+import time
+from typing import Any, List, Sequence, Tuple
+
+USER_VIEW_COLUMNS: Tuple[str, ...] = (
+    "USER_ID", "USERNAME", "LOGIN_NAME", "DISPLAY_NAME", "FIRST_NAME", "LAST_NAME", "EMAIL",
+    "DISABLED", "MUST_CHANGE_PASSWORD", "SNOWFLAKE_LOCK", "DEFAULT_WAREHOUSE", "DEFAULT_NAMESPACE",
+    "DEFAULT_ROLE", "DEFAULT_SECONDARY_ROLE", "CREATED_ON", "DELETED_ON", "LAST_SUCCESS_LOGIN",
+    "EXPIRES_AT", "LOCKED_UNTIL_TIME", "PASSWORD_LAST_SET_TIME", "BYPASS_MFA_UNTIL", "HAS_PASSWORD",
+    "HAS_MFA", "EXT_AUTHN_DUO", "EXT_AUTHN_UID", "HAS_RSA_PUBLIC_KEY", "COMMENT", "OWNER", "TYPE",
+    "DATABASE_NAME", "DATABASE_ID", "SCHEMA_NAME", "SCHEMA_ID",
+)
+ROLE_COLUMNS = ("created_on", "name", "is_default", "is_current", "is_inherited", "assigned_to_users",
+                "granted_to_roles", "granted_roles", "owner", "comment")
+GRANTS_TO_COLUMNS = ("created_on", "privilege", "granted_on", "name", "granted_to", "grantee_name",
+                     "grant_option", "granted_by")
+GRANTS_OF_COLUMNS = ("created_on", "role", "granted_to", "grantee_name", "granted_by")
+
+_EPOCH = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+# The view returns booleans in every shape the client has to normalise
+_BOOL_SHAPES: Tuple[Any, ...] = ("true", "false", True, False, None, "TRUE", "0", 1)
+
+
+def user_rows(count: int) -> List[Tuple[Any, ...]]:
+    """Synthetic V_USER_KEY_MANAGEMENT rows with a realistic mix of value types."""
+    rows = []
+    for i in range(count):
+        b = _BOOL_SHAPES
+        created = _EPOCH + datetime.timedelta(minutes=i)
+        rows.append((
+            i, f"USER_{i:06d}", f"user_{i:06d}@example.com", f"User {i}", "User", f"{i:06d}",
+            f"user_{i:06d}@example.com", b[i % 8], b[(i + 1) % 8], b[(i + 2) % 8], "COMPUTE_WH",
+            "ANALYTICS.PUBLIC", "PUBLIC", "ALL", created, None, created, None, None, created, None,
+            b[(i + 3) % 8], i % 3, "true" if i % 5 == 0 else None, None, b[(i + 4) % 8], "",
+            "USERADMIN", "PERSON" if i % 4 else "SERVICE", "UPLAND_MAINTENANCE", 1, "SECURITY", 1,
+        ))
+    return rows
+
+
+class FakeCursor:
+    """DB-API cursor over canned result sets keyed on the statement text."""
+
+    def __init__(self, connection: "FakeConnection") -> None:
+        self.connection = connection
+        self.description: List[Tuple[str, ...]] | None = None
+        self._rows: Sequence[Tuple[Any, ...]] = ()
+
+    def _result(self, columns: Sequence[str], rows: Sequence[Tuple[Any, ...]]) -> None:
+        self.description = [(c,) for c in columns]
+        self._rows = rows
+
+    def execute(self, sql: str, params: Any = None, timeout: int | None = None) -> "FakeCursor":
+        conn = self.connection
+        conn.round_trip()
+        stmt = sql.strip().upper()
+        if stmt.startswith("SELECT * FROM UPLAND_MAINTENANCE.SECURITY.V_USER_KEY_MANAGEMENT"):
+            rows = conn.users
+            if params:
+                rows = [r for r in rows if r[1] == str(params[0]).upper()]
+            self._result(USER_VIEW_COLUMNS, rows)
+        elif stmt.startswith("SHOW WAREHOUSES"):
+            self._result(("name",), [(w,) for w in conn.warehouses])
+        elif stmt.startswith("SHOW DATABASES"):
+            self._result(("created_on", "name"), [(_EPOCH, d) for d in conn.databases])
+        elif stmt.startswith("SHOW SCHEMAS IN DATABASE"):
+            self._result(("created_on", "name"), [(_EPOCH, s) for s in conn.schemas])
+        elif stmt.startswith("SHOW ROLES"):
+            self._result(ROLE_COLUMNS, [
+                (_EPOCH, r, "N", "N", "N", i % 7, i % 3, i % 5, "SECURITYADMIN", "") for i, r in enumerate(conn.roles)
+            ])
+        elif stmt.startswith("SHOW GRANTS TO ROLE"):
+            role = stmt.rsplit(" ", 1)[-1]
+            self._result(GRANTS_TO_COLUMNS, [
+                (_EPOCH, "USAGE", "DATABASE", d, "ROLE", role, "false", "SECURITYADMIN") for d in conn.databases
+            ])
+        elif stmt.startswith("SHOW GRANTS OF ROLE"):
+            role = stmt.rsplit(" ", 1)[-1]
+            self._result(GRANTS_OF_COLUMNS, [
+                (_EPOCH, role, "USER", r[1], "SECURITYADMIN") for r in conn.users[: conn.grants_per_role]
+            ])
+        elif stmt.startswith("CALL "):
+            name = sql.strip()[len("CALL "):].split("(", 1)[0]
+            self._result(("result",), [(f"{name} completed",)])
+        elif stmt.startswith("SELECT CURRENT_"):
+            self._result(("a", "b", "c", "d"), [("UPLAND_MAINTENANCE", "SECURITY", "SECURITYADMIN", "ADMIN")])
+        else:
+            # USE WAREHOUSE, ALTER USER, ... succeed without a result set
+            self._result(("status",), [("Statement executed successfully.",)])
+        return self
+
+    def fetchall(self) -> List[Tuple[Any, ...]]:
+        return list(self._rows)
+
+    def fetchone(self) -> Tuple[Any, ...] | None:
+        return self._rows[0] if self._rows else None
+
+    def close(self) -> None:
+        pass
+
+
+class FakeConnection:
+    """Connection whose cursors serve synthetic metadata.
+
+    *latency* is slept on every round trip; the counts size the SHOW results.
+    """
+
+    # The connector's default paramstyle; the client's callproc picks its markers from it
+    is_pyformat = True
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        users: int = 100,
+        roles: int = 50,
+        databases: int = 10,
+        schemas: int = 5,
+        warehouses: int = 2,
+        grants_per_role: int = 20,
+    ) -> None:
+        self.latency = latency
+        self.users = user_rows(users)
+        self.roles = [f"ROLE_{i:04d}" for i in range(roles)]
+        self.databases = [f"DB_{i:03d}" for i in range(databases)]
+        self.schemas = ["INFORMATION_SCHEMA", "PUBLIC"] + [f"SCHEMA_{i:03d}" for i in range(max(0, schemas - 2))]
+        self.warehouses = [f"WH_{i:02d}" for i in range(max(1, warehouses))]
+        self.grants_per_role = grants_per_role
+        self.round_trips = 0
+
+    def round_trip(self) -> None:
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def is_closed(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+def connect(**options: Any) -> FakeConnection:
+    """Drop-in for ``snowflake.connector.connect``; extra connector options are ignored."""
+    sizing = {k: options[k] for k in ("latency", "users", "roles", "databases", "schemas", "warehouses", "grants_per_role") if k in options}
+    return FakeConnection(**sizing)
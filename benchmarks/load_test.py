@@ -0,0 +1,250 @@
+"""Concurrent load test of the Flask app against a simulated Snowflake backend.
+
+Starts the app on a local threaded WSGI server with ``snowflake.connector``
+replaced by ``fake_snowflake.connect`` (configurable per-round-trip latency and
+row counts), creates an authenticated session, then drives a weighted mix
+of ``/keys/users``, ``/roles/*``, ``/grant_permissions`` and
+``/keys/generate-and-rotate`` from closed-loop workers.  The concurrency is
+stepped up level by level; each level reports throughput, latency percentiles
+and error rate, and the saturation point is the first level where adding
+workers no longer buys meaningful throughput (or the p99 exceeds ``--slo-ms``).
+
+    python benchmarks/load_test.py --levels 1,2,4,8,16 --duration 10 --latency-ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import requests  # noqa: E402
+
+import fake_snowflake  # noqa: E402
+
+# (name, weight, method, path template, JSON body template)
+Scenario = Tuple[str, int, str, str, Dict[str, Any] | None]
+
+SCENARIOS: List[Scenario] = [
+    ("keys_users", 40, "GET", "/keys/users", None),
+    ("roles_detailed", 15, "GET", "/roles/detailed", None),
+    ("role_privileges", 15, "GET", "/roles/{role}/privileges", None),
+    ("role_grants", 10, "GET", "/roles/{role}/grants", None),
+    ("grant_permissions", 15, "POST", "/grant_permissions", {
+        "perm_type": "read_grant_schema", "db": "{db}", "schema": "PUBLIC", "role": "{role}", "warehouse": "WH_00",
+    }),
+    ("generate_and_rotate", 5, "POST", "/keys/generate-and-rotate", {
+        "username": "{user}", "passphrase": "load-test-passphrase", "set_in_snowflake": True,
+    }),
+]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def start_app(args: argparse.Namespace) -> Tuple[str, str, Callable[[], None]]:
+    """Import the app wired to the fake connector and serve it on a free port.
+
+    Returns the base URL, a session cookie header and a shutdown callback.
+    """
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["WARMUP_ON_LOGIN"] = "false"
+    if args.cache_ttl is not None:
+        os.environ["SF_CACHE_TTL_SECONDS"] = str(args.cache_ttl)
+
+    import app as flask_app
+    import snowflake.connector
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    snowflake.connector.connect = functools.partial(
+        fake_snowflake.connect,
+        latency=args.latency_ms / 1000.0,
+        users=args.users,
+        roles=args.roles,
+        databases=args.databases,
+        schemas=args.schemas,
+    )
+    upload_dir = tempfile.mkdtemp(prefix="load_test_keys_")
+    flask_app.app.config["UPLOAD_FOLDER"] = upload_dir
+
+    cookie_name = flask_app.app.config["SESSION_COOKIE_NAME"]
+    session_client = flask_app.app.test_client()
+    with session_client.session_transaction() as sess:
+        sess.update({
+            "oauth_token": "load-test-token",
+            "oauth_exp": time.time() + 86400,
+            "last_activity": time.time(),
+        })
+    cookie_header = f"{cookie_name}={session_client.get_cookie(cookie_name).value}"
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args: Any, **kwargs: Any) -> None:
+            pass  # one access-log line per request would dominate the measurement
+
+    server = make_server("127.0.0.1", 0, flask_app.app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, name="load-test-server", daemon=True)
+    thread.start()
+
+    def shutdown() -> None:
+        server.shutdown()
+        flask_app.sfc.client.close()
+
+    return f"http://127.0.0.1:{server.server_port}", cookie_header, shutdown
+
+
+def _render(template: Any, rng: random.Random, args: argparse.Namespace) -> Any:
+    if template is None:
+        return None
+    values = {
+        "role": f"ROLE_{rng.randrange(args.roles):04d}",
+        "db": f"DB_{rng.randrange(args.databases):03d}",
+        "user": f"USER_{rng.randrange(args.users):06d}",
+    }
+    if isinstance(template, str):
+        return template.format(**values)
+    return {k: _render(v, rng, args) if isinstance(v, str) else v for k, v in template.items()}
+
+
+def run_level(base_url: str, cookie: str, workers: int, args: argparse.Namespace) -> Dict[str, Any]:
+    scenarios = [s for s in SCENARIOS if s[0] in args.scenarios]
+    weights = [s[1] for s in scenarios]
+    latencies: Dict[str, List[float]] = {s[0]: [] for s in scenarios}
+    errors: Counter = Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def worker(index: int) -> None:
+        rng = random.Random(args.seed * 1000 + index)
+        http = requests.Session()
+        http.headers["Cookie"] = cookie
+        local: List[Tuple[str, float, bool]] = []
+        while time.perf_counter() < deadline:
+            name, _, method, path, body = rng.choices(scenarios, weights)[0]
+            start = time.perf_counter()
+            try:
+                resp = http.request(method, base_url + _render(path, rng, args), json=_render(body, rng, args), timeout=60)
+                ok = resp.status_code < 400 and resp.json().get("success", True) is not False
+            except (requests.RequestException, ValueError):
+                ok = False
+            local.append((name, time.perf_counter() - start, ok))
+        with lock:
+            for name, elapsed, ok in local:
+                latencies[name].append(elapsed)
+                if not ok:
+                    errors[name] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    all_latencies = sorted(v for values in latencies.values() for v in values)
+    total = len(all_latencies)
+    per_route = {}
+    for name, values in latencies.items():
+        values.sort()
+        per_route[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "p50_ms": _percentile(values, 50) * 1e3,
+            "p99_ms": _percentile(values, 99) * 1e3,
+        }
+    return {
+        "workers": workers,
+        "requests": total,
+        "errors": sum(errors.values()),
+        "throughput_rps": total / wall if wall else 0.0,
+        "mean_ms": statistics.fmean(all_latencies) * 1e3 if all_latencies else 0.0,
+        "p50_ms": _percentile(all_latencies, 50) * 1e3,
+        "p90_ms": _percentile(all_latencies, 90) * 1e3,
+        "p99_ms": _percentile(all_latencies, 99) * 1e3,
+        "max_ms": all_latencies[-1] * 1e3 if all_latencies else 0.0,
+        "routes": per_route,
+    }
+
+
+def find_saturation(levels: List[Dict[str, Any]], min_gain: float, slo_ms: float) -> Dict[str, Any] | None:
+    """First level whose throughput gain over the previous level is below *min_gain*
+    or whose p99 breaches *slo_ms*; None if every level still scaled."""
+    for prev, cur in zip(levels, levels[1:]):
+        gain = cur["throughput_rps"] / prev["throughput_rps"] - 1 if prev["throughput_rps"] else 0.0
+        if gain < min_gain:
+            return {"workers": cur["workers"], "reason": f"throughput gain {gain:.0%} < {min_gain:.0%}",
+                    "peak_rps": max(prev["throughput_rps"], cur["throughput_rps"])}
+        if slo_ms and cur["p99_ms"] > slo_ms:
+            return {"workers": cur["workers"], "reason": f"p99 {cur['p99_ms']:.0f}ms > SLO {slo_ms:.0f}ms",
+                    "peak_rps": cur["throughput_rps"]}
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="comma-separated concurrent worker counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="simulated Snowflake round-trip latency")
+    parser.add_argument("--users", type=int, default=2000, help="rows in the simulated user view")
+    parser.add_argument("--roles", type=int, default=200)
+    parser.add_argument("--databases", type=int, default=20)
+    parser.add_argument("--schemas", type=int, default=10, help="schemas per database")
+    parser.add_argument("--cache-ttl", type=int, default=None, help="override SF_CACHE_TTL_SECONDS (0 disables caching)")
+    parser.add_argument("--scenarios", default=",".join(s[0] for s in SCENARIOS),
+                        help="comma-separated subset of: " + ", ".join(s[0] for s in SCENARIOS))
+    parser.add_argument("--min-gain", type=float, default=0.10, help="throughput gain below which a level counts as saturated")
+    parser.add_argument("--slo-ms", type=float, default=0.0, help="p99 latency that marks saturation (0 disables)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="PATH", help="also write the full report as JSON")
+    args = parser.parse_args()
+    args.scenarios = {s.strip() for s in args.scenarios.split(",") if s.strip()}
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+
+    base_url, cookie, shutdown = start_app(args)
+    results = []
+    try:
+        print(f"{'workers':>7} {'req':>7} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for workers in levels:
+            level = run_level(base_url, cookie, workers, args)
+            results.append(level)
+            print(f"{workers:>7} {level['requests']:>7} {level['errors']:>5} {level['throughput_rps']:>9.1f} "
+                  f"{level['p50_ms']:>9.1f} {level['p90_ms']:>9.1f} {level['p99_ms']:>9.1f} {level['max_ms']:>9.1f}", flush=True)
+    finally:
+        shutdown()
+
+    print(f"\nPer-route latency at {results[-1]['workers']} workers:")
+    for name, route in results[-1]["routes"].items():
+        print(f"  {name:<22} {route['requests']:>6} req {route['errors']:>4} err  p50 {route['p50_ms']:>8.1f} ms  p99 {route['p99_ms']:>8.1f} ms")
+
+    saturation = find_saturation(results, args.min_gain, args.slo_ms)
+    if saturation:
+        print(f"\nSaturated at {saturation['workers']} workers ({saturation['reason']}); peak {saturation['peak_rps']:.1f} req/s")
+    else:
+        print("\nNo saturation within the tested levels")
+
+    if args.json:
+        config = {k: v for k, v in vars(args).items() if k != "json"}
+        config["scenarios"] = sorted(args.scenarios)
+        with open(args.json, "w") as fh:
+            json.dump({"config": config, "levels": results, "saturation": saturation}, fh, indent=2)
+            fh.write("\n")
+
+
+if __name__ == "__main__":
+    main()
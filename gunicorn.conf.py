@@ -0,0 +1,47 @@
+"""Gunicorn settings for the multi-worker production mode.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is imported once in the master (``preload_app``) and forked into the
+workers.  Snowflake metadata (including the user listing) stays in each
+worker's memory unless the operator opts in to a cache file with
+``SF_PERSIST_CACHE_PATH`` and ``SF_SHARED_CACHE=true``, or sets
+``SF_BROKER_SOCKET`` to route all Snowflake work through ``backend/broker.py``.
+Pending logins, sessions and change events are shared through files in a
+private temporary directory that is removed when the server stops.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.getenv("GUNICORN_BIND", "127.0.0.1:5001")
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(4, multiprocessing.cpu_count()))))
+# Routes mostly wait on Snowflake and openssl, so each worker also runs threads
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+# Key generation and cold metadata queries can take several seconds
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+preload_app = True
+
+_cache_dir = None
+_need_dir = not os.getenv("OAUTH_STATE_PATH") or not os.getenv("SESSION_STORE_PATH") or not os.getenv("CHANGE_FEED_PATH")
+if _need_dir:
+    _cache_dir = tempfile.mkdtemp(prefix="snowflake-admin-")  # created 0700
+# Pending logins are shared so the OAuth callback can reach any worker
+if not os.getenv("OAUTH_STATE_PATH"):
+    os.environ["OAUTH_STATE_PATH"] = os.path.join(_cache_dir, "oauth_states.db")
+# Sessions too, so any worker can serve any logged-in browser
+if not os.getenv("SESSION_STORE_PATH"):
+    os.environ["SESSION_STORE_PATH"] = os.path.join(_cache_dir, "sessions.db")
+# And change events, so a tab streaming from one worker hears about changes made through another
+if not os.getenv("CHANGE_FEED_PATH"):
+    os.environ["CHANGE_FEED_PATH"] = os.path.join(_cache_dir, "changes.db")
+
+
+def on_exit(server):
+    if _cache_dir:
+        shutil.rmtree(_cache_dir, ignore_errors=True)
@@ -0,0 +1,76 @@
+// Shared cache for API GETs: in-flight deduplication, stale-while-revalidate and ETags.
+//
+// Concurrent gets for the same URL share one request.  A cached response is
+// returned as is while fresh; once older than `maxAge` it is still returned
+// immediately, but revalidated in the background with If-None-Match, and
+// `onUpdate` callbacks run if the data changed.  Entries older than
+// `staleAge` are refetched before returning.  Mutations call invalidate().
+
+(function () {
+    'use strict';
+
+    function createApiCache(transport, { maxAge = 30000, staleAge = 600000 } = {}) {
+        // transport(url, headers) -> {notModified: true} | {data, etag}
+        const entries = new Map();     // url -> {data, etag, fetchedAt}
+        const inflight = new Map();    // url -> Promise of data
+        const listeners = new Map();   // url -> Set of onUpdate callbacks
+        let generation = 0;            // bumped by invalidate() so late responses are not cached
+
+        function revalidate(url) {
+            if (inflight.has(url)) return inflight.get(url);
+            const entry = entries.get(url);
+            const headers = entry && entry.etag ? { 'If-None-Match': entry.etag } : {};
+            const started = generation;
+            const promise = transport(url, headers).then(result => {
+                if (result.notModified && entry) {
+                    entry.fetchedAt = Date.now();
+                    return entry.data;
+                }
+                if (started === generation) {
+                    entries.set(url, { data: result.data, etag: result.etag, fetchedAt: Date.now() });
+                }
+                if (entry) {
+                    (listeners.get(url) || []).forEach(cb => cb(result.data));
+                }
+                return result.data;
+            }).finally(() => {
+                if (inflight.get(url) === promise) inflight.delete(url);
+            });
+            inflight.set(url, promise);
+            return promise;
+        }
+
+        function get(url, { onUpdate } = {}) {
+            if (onUpdate) {
+                if (!listeners.has(url)) listeners.set(url, new Set());
+                listeners.get(url).add(onUpdate);
+            }
+            const entry = entries.get(url);
+            const age = entry ? Date.now() - entry.fetchedAt : Infinity;
+            if (age < maxAge) return Promise.resolve(entry.data);
+            if (age < staleAge) {
+                // Serve the stale copy now; errors while revalidating keep it
+                revalidate(url).catch(() => {});
+                return Promise.resolve(entry.data);
+            }
+            return revalidate(url);
+        }
+
+        // Drop cached entries whose URL starts with any of `prefixes` (all entries if omitted)
+        function invalidate(...prefixes) {
+            generation++;
+            const matches = url => !prefixes.length || prefixes.some(prefix => url.startsWith(prefix));
+            for (const url of [...entries.keys()]) {
+                if (matches(url)) entries.delete(url);
+            }
+            // Requests already in flight may predate the mutation; the next get starts a new one
+            for (const url of [...inflight.keys()]) {
+                if (matches(url)) inflight.delete(url);
+            }
+        }
+
+        return { get, invalidate };
+    }
+
+    window.createApiCache = createApiCache;
+})();
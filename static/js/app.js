@@ -0,0 +1,2160 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.getElementById('keyPairForm');
+    const encryptedCheckbox = document.getElementById('encrypted');
+    const passphraseGroup = document.getElementById('passphraseGroup');
+    const togglePassphrase = document.getElementById('togglePassphrase');
+    const passphraseInput = document.getElementById('passphrase');
+    const resultArea = document.getElementById('resultArea');
+    const messagesDiv = document.getElementById('messages');
+    const snowflakeCommand = document.getElementById('snowflakeCommand');
+    const fileList = document.getElementById('fileList');
+    const copyCommand = document.getElementById('copyCommand');
+    const toast = new bootstrap.Toast(document.querySelector('.toast'));
+    const confirmPassphraseGroup = document.getElementById('confirmPassphraseGroup');
+    const confirmPassphraseInput = document.getElementById('confirmPassphrase');
+    const toggleConfirmPassphrase = document.getElementById('toggleConfirmPassphrase');
+    const authDot = document.getElementById('authDot');
+    const authText = document.getElementById('authText');
+    const loginBtn = document.getElementById('loginBtn');
+    const logoutBtn = document.getElementById('logoutBtn');
+    const tabOverlay = document.getElementById('tabOverlay');
+
+    let isAuthenticated = false; // will be updated by checkAuthStatus
+
+    // Toggle passphrase visibility
+    togglePassphrase.addEventListener('click', function() {
+        const type = passphraseInput.type === 'password' ? 'text' : 'password';
+        passphraseInput.type = type;
+        this.querySelector('i').classList.toggle('bi-eye');
+        this.querySelector('i').classList.toggle('bi-eye-slash');
+    });
+    
+    // Toggle confirm passphrase visibility
+    toggleConfirmPassphrase.addEventListener('click', function() {
+        const type = confirmPassphraseInput.type === 'password' ? 'text' : 'password';
+        confirmPassphraseInput.type = type;
+        this.querySelector('i').classList.toggle('bi-eye');
+        this.querySelector('i').classList.toggle('bi-eye-slash');
+    });
+    
+    // Toggle passphrase field visibility
+    encryptedCheckbox.addEventListener('change', function() {
+        const isChecked = this.checked;
+        passphraseGroup.style.display = isChecked ? 'block' : 'none';
+        confirmPassphraseGroup.style.display = isChecked ? 'block' : 'none';
+        if (!isChecked) {
+            passphraseInput.value = '';
+            confirmPassphraseInput.value = '';
+        }
+    });
+    
+    // Handle form submission
+    form.addEventListener('submit', async function(e) {
+        e.preventDefault();
+        
+        console.log('Form submitted!');
+        console.log('Encrypted checkbox:', encryptedCheckbox.checked);
+        console.log('Create processed checkbox:', document.getElementById('createProcessed').checked);
+        console.log('Username:', document.getElementById('username').value);
+        
+        // Reset validation states
+        passphraseInput.classList.remove('is-invalid');
+        confirmPassphraseInput.classList.remove('is-invalid');
+        document.getElementById('passphraseError').textContent = '';
+        document.getElementById('confirmPassphraseError').textContent = '';
+
+        // Validate passphrases if encryption is enabled
+        if (encryptedCheckbox.checked) {
+            let isValid = true;
+            
+            if (!passphraseInput.value) {
+                passphraseInput.classList.add('is-invalid');
+                document.getElementById('passphraseError').textContent = 'Passphrase is required';
+                isValid = false;
+            }
+            
+            if (!confirmPassphraseInput.value) {
+                confirmPassphraseInput.classList.add('is-invalid');
+                document.getElementById('confirmPassphraseError').textContent = 'Please confirm your passphrase';
+                isValid = false;
+            }
+            
+            if (passphraseInput.value !== confirmPassphraseInput.value) {
+                passphraseInput.classList.add('is-invalid');
+                confirmPassphraseInput.classList.add('is-invalid');
+                document.getElementById('passphraseError').textContent = 'Passphrases do not match';
+                document.getElementById('confirmPassphraseError').textContent = 'Passphrases do not match';
+                isValid = false;
+            }
+            
+            if (!isValid) {
+                console.log('Validation failed, returning early');
+                return;
+            }
+        }
+        
+        const formData = {
+            username: document.getElementById('username').value,
+            encrypted: encryptedCheckbox.checked,
+            passphrase: encryptedCheckbox.checked ? passphraseInput.value : null,
+            create_processed: document.getElementById('createProcessed').checked
+        };
+        
+        console.log('Sending form data:', formData);
+        
+        try {
+            console.log('Making fetch request to /generate');
+            const response = await fetch('/generate', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify(formData)
+            });
+            
+            console.log('Response received:', response);
+            const data = await response.json();
+            console.log('Response data:', data);
+            
+            if (response.ok) {
+                // Display results
+                console.log('Response was successful, displaying results');
+                resultArea.style.display = 'block';
+                let msgHTML = data.messages.join('<br>');
+                if (formData.encrypted && formData.passphrase) {
+                    msgHTML += `<br><i class="bi bi-exclamation-triangle-fill text-danger me-1"></i><strong>Passphrase:</strong> ${formData.passphrase} <span class="text-muted">(store safely)</span>`;
+                }
+                messagesDiv.innerHTML = msgHTML;
+                snowflakeCommand.value = data.snowflake_command || '';
+                
+                // Display file list with download links
+                fileList.innerHTML = '';
+                for (const [type, filename] of Object.entries(data.files)) {
+                    const li = document.createElement('li');
+                    li.className = 'list-group-item d-flex justify-content-between align-items-center';
+                    
+                    const span = document.createElement('span');
+                    span.textContent = `${type}: ${filename}`;
+                    
+                    const downloadBtn = document.createElement('a');
+                    downloadBtn.href = `/download/${formData.username}/${filename}`;
+                    downloadBtn.className = 'download-btn';
+                    downloadBtn.innerHTML = '<i class="bi bi-download"></i> Download';
+                    
+                    li.appendChild(span);
+                    li.appendChild(downloadBtn);
+                    fileList.appendChild(li);
+                }
+                
+                showToast('Key pair generated successfully!', 'success');
+            } else {
+                console.log('Response was not ok, showing error');
+                showToast(data.error || 'An error occurred', 'error');
+            }
+        } catch (error) {
+            console.log('Exception caught:', error);
+            showToast('An error occurred while generating the key pair', 'error');
+        }
+    });
+    
+    // Copy command to clipboard
+    copyCommand.addEventListener('click', function() {
+        snowflakeCommand.select();
+        document.execCommand('copy');
+        showToast('Command copied to clipboard!', 'success');
+    });
+    
+    // Show toast message
+    function showToast(message, type) {
+        const toastEl = document.querySelector('.toast');
+        toastEl.querySelector('.toast-body').textContent = message;
+        toastEl.classList.remove('bg-success', 'bg-danger', 'bg-pumpkin');
+        toastEl.classList.add(type === 'success' ? 'bg-pumpkin' : 'bg-danger');
+        toast.show();
+    }
+
+    /* -------------------------------
+       Process Keys Tab Logic
+    ------------------------------- */
+    const processKeyBtn = document.getElementById('processKeyBtn');
+    const rawKeyInput = document.getElementById('rawKeyInput');
+    const removeBreaksCbx = document.getElementById('removeBreaks');
+    const base64EncodeCbx = document.getElementById('base64Encode');
+    const processResults = document.getElementById('processResults');
+    const processedKeyGroup = document.getElementById('processedKeyGroup');
+    const processedKeyOutput = document.getElementById('processedKeyOutput');
+    const base64KeyGroup = document.getElementById('base64KeyGroup');
+    const base64KeyOutput = document.getElementById('base64KeyOutput');
+
+    if (processKeyBtn) {
+        processKeyBtn.addEventListener('click', async function () {
+            const rawKey = rawKeyInput.value.trim();
+            if (!rawKey) {
+                showToast('Please paste a private key first', 'error');
+                return;
+            }
+
+            const requestPayload = {
+                key: rawKey,
+                remove_line_breaks: removeBreaksCbx.checked,
+                base64_encoding: base64EncodeCbx.checked
+            };
+
+            if (!requestPayload.remove_line_breaks && !requestPayload.base64_encoding) {
+                showToast('Select at least one processing option', 'error');
+                return;
+            }
+
+            try {
+                const response = await fetch('/process_key', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify(requestPayload)
+                });
+
+                const data = await response.json();
+
+                if (response.ok && data.success) {
+                    processResults.style.display = 'block';
+
+                    // Handle Remove Breaks
+                    if (requestPayload.remove_line_breaks && data.processed_key) {
+                        processedKeyGroup.style.display = 'block';
+                        processedKeyOutput.value = data.processed_key;
+                    } else {
+                        processedKeyGroup.style.display = 'none';
+                    }
+
+                    // Handle Base64 Encoding
+                    if (requestPayload.base64_encoding && data.base64_encoded) {
+                        base64KeyGroup.style.display = 'block';
+                        base64KeyOutput.value = data.base64_encoded;
+                    } else {
+                        base64KeyGroup.style.display = 'none';
+                    }
+
+                    showToast('Key processed successfully!', 'success');
+                } else {
+                    showToast(data.error || 'An error occurred while processing', 'error');
+                }
+            } catch (err) {
+                showToast('An error occurred while processing', 'error');
+            }
+        });
+    }
+
+    // Generic copy buttons inside Process Keys
+    document.querySelectorAll('[data-copy-target]').forEach(btn => {
+        btn.addEventListener('click', function () {
+            const targetId = this.getAttribute('data-copy-target');
+            const targetEl = document.getElementById(targetId);
+            if (targetEl) {
+                targetEl.select();
+                document.execCommand('copy');
+                showToast('Copied to clipboard!', 'success');
+            }
+        });
+    });
+
+    /* ----------------- Inactivity Timer ----------------- */
+    let lastActivity = Date.now();
+    const INACTIVITY_LIMIT = 15 * 60 * 1000; // 15 minutes
+    let inactivityInterval = null;
+
+    function startInactivityTimer() {
+        if (inactivityInterval) return; // already running
+        lastActivity = Date.now();
+        inactivityInterval = setInterval(() => {
+            if (!isAuthenticated) return; // just in case
+            if (Date.now() - lastActivity > INACTIVITY_LIMIT) {
+                showToast('Session expired due to inactivity', 'error');
+                // Trigger backend logout
+                fetch('/auth/logout', { method: 'POST' }).finally(() => {
+                    apiCache.invalidate();
+                    isAuthenticated = false;
+                    updateAuthUI();
+                });
+            }
+        }, 60 * 1000);
+    }
+
+    function stopInactivityTimer() {
+        if (inactivityInterval) {
+            clearInterval(inactivityInterval);
+            inactivityInterval = null;
+        }
+    }
+
+    ['click', 'keydown', 'mousemove', 'touchstart'].forEach(evt => {
+        document.addEventListener(evt, () => {
+            lastActivity = Date.now();
+        }, { passive: true });
+    });
+
+    /* -------- Grant Permissions Tab Logic -------- */
+    async function parseApiResponse(res) {
+        if (res.status === 401) {
+            isAuthenticated = false;
+            updateAuthUI();
+            throw new Error('Not authenticated');
+        }
+        const ct = res.headers.get('content-type') || '';
+        if (ct.includes('application/json')) {
+            const data = await res.json();
+            // Check for success property or assume error if not present and error property exists
+            if (data.success === false || (data.success === undefined && data.error)) {
+                throw new Error(data.error || 'Request failed');
+            }
+            // Return full response for endpoints that don't use data wrapper
+            if (data.data !== undefined) {
+                return data.data;
+            } else {
+                return data;
+            }
+        }
+        // fallback text
+        const txt = await res.text();
+        throw new Error(txt.slice(0, 120) || 'Unexpected response');
+    }
+
+    // GETs share one cache (static/js/api-cache.js): identical concurrent requests are
+    // merged and repeat visits are answered from memory while revalidating by ETag
+    const apiCache = createApiCache(async (url, headers) => {
+        const res = await fetch(url, { headers });
+        if (res.status === 304) return { notModified: true };
+        return { data: await parseApiResponse(res), etag: res.headers.get('ETag') };
+    });
+
+    // Cached GETs each mutation makes stale; unknown mutations drop everything
+    const MUTATION_INVALIDATES = [
+        [/^\/(users|keys)\//, ['/keys/users', '/keys/hygiene', '/users']],
+        [/^\/grant_permissions/, ['/roles/']],
+    ];
+
+    function invalidateAfterMutation(url) {
+        const rule = MUTATION_INVALIDATES.find(([pattern]) => pattern.test(url));
+        if (rule) {
+            apiCache.invalidate(...rule[1]);
+        } else {
+            apiCache.invalidate();
+        }
+    }
+
+    function fetchWithAuth(url, options = {}) {
+        const method = (options.method || 'GET').toUpperCase();
+        if (method === 'GET') {
+            return apiCache.get(url, options);
+        }
+        invalidateAfterMutation(url);
+        return fetch(url, options).then(parseApiResponse).finally(() => invalidateAfterMutation(url));
+    }
+
+    // Changes made in other tabs or by other admins arrive over /events/stream
+    // (backend/change_feed.py) and are patched into the data this tab already holds
+    let changesEventSource = null;
+
+    function startChangeStream() {
+        if (changesEventSource || !window.EventSource) return;
+        changesEventSource = new EventSource('/events/stream');
+        changesEventSource.onmessage = event => applyChange(JSON.parse(event.data));
+    }
+
+    function stopChangeStream() {
+        if (changesEventSource) {
+            changesEventSource.close();
+            changesEventSource = null;
+        }
+    }
+
+    function applyChange(change) {
+        if (change.kind === 'user') {
+            apiCache.invalidate(`/keys/users/${encodeURIComponent(change.name)}/`, '/keys/hygiene', '/users');
+            const user = allUsers.find(u => u.name === change.name);
+            if (user && change.changes && Object.keys(change.changes).length) {
+                // The row objects are shared with the cached listing, so it is patched too
+                Object.assign(user, change.changes);
+                tableWorker.load('users', allUsers);
+                applyUserFilters();
+            }
+        } else if (change.kind === 'role_grants') {
+            apiCache.invalidate(`/roles/${encodeURIComponent(change.role)}/`);
+            const roleModal = document.getElementById('roleDetailsModal');
+            const openRole = document.getElementById('detailRoleName').textContent;
+            if (roleModal.classList.contains('show') && openRole.toUpperCase() === String(change.role).toUpperCase()) {
+                loadRoleDetails(openRole);
+            }
+        } else if (change.kind === 'users' || change.kind === 'resync') {
+            // Too broad to patch (or events were missed): reload what this tab shows
+            if (change.kind === 'users') {
+                apiCache.invalidate('/keys/users', '/keys/hygiene', '/users');
+            } else {
+                apiCache.invalidate();
+                if (rolesData.length) loadRolesData();
+            }
+            if (allUsers.length) loadUsers();
+        }
+    }
+
+    const gpDbSel = document.getElementById('gpDatabase');
+    const gpSchemaSel = document.getElementById('gpSchema');
+    const gpRoleSel = document.getElementById('gpRole');
+    const gpWarehouseSel = document.getElementById('gpWarehouse');
+    const grantBtn = document.querySelector('#grantForm button[type="submit"]');
+
+    function setGrantLoading(isLoading) {
+        if (!grantBtn) return;
+        if (isLoading) {
+            grantBtn.disabled = true;
+            grantBtn.innerHTML = '<span class="spinner-border spinner-border-sm" role="status" aria-hidden="true"></span> Loading...';
+        } else {
+            grantBtn.innerHTML = '<i class="bi bi-check2-circle"></i> Grant';
+            updateGrantState();
+        }
+    }
+
+    function updateGrantState() {
+        if (!grantBtn) return;
+        const ready = gpDbSel.value && gpSchemaSel.value && gpRoleSel.value && gpWarehouseSel.value;
+        grantBtn.disabled = !ready;
+    }
+
+    // database -> schemas, loaded once via /schemas/tree
+    let schemaTree = null;
+
+    async function loadDatabases() {
+        gpDbSel.disabled = true;
+        setGrantLoading(true);
+        fetchWithAuth('/schemas/tree').then(tree => {
+            schemaTree = tree;
+            const list = Object.keys(tree);
+            gpDbSel.innerHTML = list.map(db => `<option value="${db}">${db}</option>`).join('');
+            // Default to DEV_UPLAND_BRONZE_DB if available
+            if (list.includes('DEV_UPLAND_BRONZE_DB')) {
+                gpDbSel.value = 'DEV_UPLAND_BRONZE_DB';
+            }
+            gpDbSel.disabled = false;
+            loadSchemas();
+        }).catch(err => showToast(err.message, 'error'))
+          .finally(() => setGrantLoading(false));
+    }
+
+    async function loadSchemas() {
+        const db = gpDbSel.value;
+        gpSchemaSel.disabled = true;
+        setGrantLoading(true);
+        const cached = schemaTree && schemaTree[db];
+        const request = cached ? Promise.resolve(cached) : fetchWithAuth(`/schemas?db=${db}`);
+        request.then(list => {
+            gpSchemaSel.innerHTML = list.map(sc => `<option value="${sc}">${sc}</option>`).join('');
+            gpSchemaSel.disabled = false;
+            updateGrantState();
+        }).catch(err => showToast(err.message, 'error'))
+          .finally(() => setGrantLoading(false));
+    }
+
+    async function loadRoles() {
+        gpRoleSel.disabled = true;
+        setGrantLoading(true);
+        fetchWithAuth('/roles').then(list => {
+            gpRoleSel.innerHTML = list.map(r => `<option value="${r}">${r}</option>`).join('');
+            gpRoleSel.disabled = false;
+            updateGrantState();
+        }).catch(err => showToast(err.message, 'error'))
+          .finally(() => setGrantLoading(false));
+    }
+
+    async function loadWarehouses() {
+        gpWarehouseSel.disabled = true;
+        setGrantLoading(true);
+        fetchWithAuth('/warehouses').then(list => {
+            gpWarehouseSel.innerHTML = list.map(wh => `<option value="${wh}">${wh}</option>`).join('');
+            // Default to UPLAND_ENGINEERING_WH if available
+            if (list.includes('UPLAND_ENGINEERING_WH')) {
+                gpWarehouseSel.value = 'UPLAND_ENGINEERING_WH';
+            }
+            gpWarehouseSel.disabled = false;
+            updateGrantState();
+        }).catch(err => showToast(err.message, 'error'))
+          .finally(() => setGrantLoading(false));
+    }
+
+    // init when tab first shown
+    document.getElementById('grant-tab').addEventListener('shown.bs.tab', () => {
+        if (!gpDbSel.options.length) {
+            loadDatabases();
+            loadRoles();
+            loadWarehouses();
+        }
+    });
+
+    gpDbSel.addEventListener('change', () => { loadSchemas(); updateGrantState(); });
+    gpSchemaSel.addEventListener('change', updateGrantState);
+    gpRoleSel.addEventListener('change', updateGrantState);
+    gpWarehouseSel.addEventListener('change', updateGrantState);
+
+    document.getElementById('grantForm').addEventListener('submit', e => {
+        e.preventDefault();
+        const payload = {
+            db: gpDbSel.value,
+            schema: gpSchemaSel.value,
+            role: gpRoleSel.value,
+            warehouse: gpWarehouseSel.value,
+            perm_type: document.querySelector('input[name="permType"]:checked').value
+        };
+        (async () => {
+            try {
+                const res = await fetch('/grant_permissions', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify(payload)
+                });
+                const data = await res.json();
+                invalidateAfterMutation('/grant_permissions');
+                if (data.success) {
+                    showToast('Permissions granted!', 'success');
+                } else {
+                    showToast(data.error || 'Grant failed', 'error');
+                }
+            } catch (err) {
+                showToast('Grant failed', 'error');
+            }
+        })();
+    });
+
+    async function checkAuthStatus() {
+        console.log('Checking auth status...');
+        try {
+            const res = await fetch('/auth/status');
+            const data = await res.json();
+            console.log('Auth status response:', data);
+            isAuthenticated = data.authenticated;
+            updateAuthUI();
+        } catch (e) {
+            console.error('Error checking auth status:', e);
+            isAuthenticated = false;
+            updateAuthUI();
+        }
+    }
+
+    async function preloadTabData() {
+        console.log('Pre-loading tab data after authentication...');
+        
+        try {
+            // Pre-load User Management data
+            console.log('Pre-loading User Management data...');
+            if (typeof loadUsers === 'function') {
+                loadUsers();
+            } else {
+                // If loadUsers function not available yet, pre-load the data silently
+                fetchWithAuth('/keys/users').then(data => {
+                    allUsers = data;
+                    console.log('✓ User Management data pre-loaded:', allUsers.length, 'users');
+                }).catch(err => {
+                    console.log('⚠ Failed to pre-load User Management data:', err.message);
+                });
+            }
+            
+            // Pre-load Role Management data
+            console.log('Pre-loading Role Management data...');
+            if (typeof loadRolesData === 'function') {
+                loadRolesData();
+            } else {
+                // If loadRolesData function not available yet, pre-load the data silently
+                fetchWithAuth('/roles/detailed').then(response => {
+                    rolesData = response.data || response;
+                    console.log('✓ Role Management data pre-loaded:', rolesData.length, 'roles');
+                }).catch(err => {
+                    console.log('⚠ Failed to pre-load Role Management data:', err.message);
+                });
+            }
+            
+            console.log('✓ Tab data pre-loading initiated');
+        } catch (error) {
+            console.log('⚠ Error during tab data pre-loading:', error);
+        }
+    }
+
+    function updateAuthUI() {
+        console.log('Updating auth UI, isAuthenticated:', isAuthenticated);
+        if (isAuthenticated) {
+            authDot.classList.remove('gray', 'red');
+            authDot.classList.add('green');
+            authText.textContent = 'Connected';
+            loginBtn.style.display = 'none';
+            logoutBtn.style.display = '';
+            tabOverlay.style.display = 'none';
+
+            // fetch identity info
+            fetch('/auth/userinfo').then(r => r.json()).then(info => {
+                if (!info.success) return;
+                document.getElementById('userLabel').textContent = `Signed in as ${info.user} (${info.role})`;
+
+                const grantTabLink = document.getElementById('grant-tab');
+                if (!info.can_grant && grantTabLink) {
+                    grantTabLink.classList.add('disabled');
+                    grantTabLink.setAttribute('title', 'Insufficient privileges');
+                    grantTabLink.addEventListener('click', e => e.preventDefault());
+                    if (activePane?.id === 'grant') {
+                        document.getElementById('generate-tab').click();
+                    }
+                }
+            }).catch(()=>{});
+
+            // Pre-load data for User Management and Role Management tabs
+            // Small delay to ensure all functions are defined
+            setTimeout(preloadTabData, 100);
+
+            startInactivityTimer();
+            startChangeStream();
+        } else {
+            authDot.classList.remove('green', 'red');
+            authDot.classList.add('gray');
+            authText.textContent = 'Not connected';
+            loginBtn.style.display = '';
+            logoutBtn.style.display = 'none';
+            // determine active tab; if core tabs, keep enabled
+            const activePane = document.querySelector('.tab-pane.show.active');
+            const activeId = activePane ? activePane.id : '';
+            if (activeId === 'generate' || activeId === 'process') {
+                tabOverlay.style.display = 'none';
+            } else {
+                tabOverlay.style.display = '';
+            }
+
+            stopInactivityTimer();
+            stopChangeStream();
+        }
+    }
+
+    // Poll status on load and every 60s
+    checkAuthStatus();
+    setInterval(checkAuthStatus, 60000);
+
+    // Ensure login button is properly initialized
+    if (loginBtn) {
+        console.log('Login button found, attaching click handler');
+        loginBtn.addEventListener('click', async (e) => {
+            console.log('Login button clicked');
+            e.preventDefault();
+            try {
+                console.log('Attempting to navigate to /login');
+                window.location.href = '/login';
+            } catch (error) {
+                console.error('Error during login:', error);
+                showToast('Error during login: ' + error.message, 'error');
+            }
+        });
+    } else {
+        console.error('Login button not found in DOM');
+    }
+
+    if (logoutBtn) {
+        logoutBtn.addEventListener('click', async () => {
+            try {
+                const res = await fetch('/auth/logout', { method: 'POST' });
+                if (res.ok) {
+                    // reset UI and reload page to clear session state
+                    isAuthenticated = false;
+                    updateAuthUI();
+                    window.location.href = '/';
+                } else {
+                    showToast('Logout failed', 'error');
+                }
+            } catch (e) {
+                showToast('Logout failed', 'error');
+            }
+        });
+    }
+
+    // Users tab functionality
+    let allUsers = [];
+    // Only the rows near the visible part of the table are in the DOM
+    const usersTable = new VirtualTable(
+        document.getElementById('usersTableContainer'),
+        document.getElementById('usersTableBody'),
+        { colspan: 5, renderRow: renderUserRow }
+    );
+    
+    // Sorting functions for Users table
+    let usersSortField = 'name';
+    let usersSortDirection = 'asc';
+    
+    // Users data will be pre-loaded on login, manual refresh available via refresh button
+
+    // Initialize default sorting for Users table (already initialized above)
+
+    // Search and filter functionality
+    document.getElementById('userSearch').addEventListener('input', applyUserFilters);
+    document.getElementById('userStatusFilter').addEventListener('change', applyUserFilters);
+    document.getElementById('userKeyFilter').addEventListener('change', applyUserFilters);
+    document.getElementById('userAuthFilter').addEventListener('change', applyUserFilters);
+    document.getElementById('refreshUsers').addEventListener('click', () => {
+        apiCache.invalidate('/keys/users');
+        loadUsers();
+    });
+
+    // Modal functionality
+    const unlockUserModal = new bootstrap.Modal(document.getElementById('unlockUserModal'));
+    const resetPasswordModal = new bootstrap.Modal(document.getElementById('resetPasswordModal'));
+    const unsetPasswordModal = new bootstrap.Modal(document.getElementById('unsetPasswordModal'));
+    const userDetailsModal = new bootstrap.Modal(document.getElementById('userDetailsModal'));
+
+    // Toggle password visibility
+    document.getElementById('toggleNewPassword').addEventListener('click', function() {
+        const input = document.getElementById('newPassword');
+        const type = input.type === 'password' ? 'text' : 'password';
+        input.type = type;
+        this.querySelector('i').classList.toggle('bi-eye');
+        this.querySelector('i').classList.toggle('bi-eye-slash');
+    });
+
+    document.getElementById('toggleConfirmNewPassword').addEventListener('click', function() {
+        const input = document.getElementById('confirmNewPassword');
+        const type = input.type === 'password' ? 'text' : 'password';
+        input.type = type;
+        this.querySelector('i').classList.toggle('bi-eye');
+        this.querySelector('i').classList.toggle('bi-eye-slash');
+    });
+
+    // Unlock user confirmation
+    document.getElementById('confirmUnlockUser').addEventListener('click', async function() {
+        const username = document.getElementById('unlockUsername').textContent;
+        try {
+            const response = await fetchWithAuth(`/users/${encodeURIComponent(username)}/unlock`, {
+                method: 'POST'
+            });
+            const data = await response.json();
+            
+            if (data.success) {
+                showToast(data.message, 'success');
+                unlockUserModal.hide();
+                loadUsers(); // Refresh the table
+            } else {
+                showToast(data.error || 'Failed to unlock user', 'error');
+            }
+        } catch (error) {
+            showToast('Error unlocking user: ' + error.message, 'error');
+        }
+    });
+
+    // Unset password confirmation
+    document.getElementById('confirmUnsetPassword').addEventListener('click', async function() {
+        const username = document.getElementById('unsetUsername').textContent;
+        try {
+            const response = await fetchWithAuth(`/users/${encodeURIComponent(username)}/unset_password`, {
+                method: 'POST'
+            });
+            const data = await response.json();
+            
+            if (data.success) {
+                showToast(data.message, 'success');
+                unsetPasswordModal.hide();
+                loadUsers(); // Refresh the table
+            } else {
+                showToast(data.error || 'Failed to unset password', 'error');
+            }
+        } catch (error) {
+            showToast('Error unsetting password: ' + error.message, 'error');
+        }
+    });
+
+    // Reset password confirmation
+    document.getElementById('confirmResetPassword').addEventListener('click', async function() {
+        const username = document.getElementById('resetUsername').textContent;
+        const newPassword = document.getElementById('newPassword').value;
+        const confirmPassword = document.getElementById('confirmNewPassword').value;
+        
+        // Clear previous errors
+        document.getElementById('newPassword').classList.remove('is-invalid');
+        document.getElementById('confirmNewPassword').classList.remove('is-invalid');
+        document.getElementById('passwordMismatchError').textContent = '';
+        
+        if (!newPassword) {
+            document.getElementById('newPassword').classList.add('is-invalid');
+            return;
+        }
+        
+        if (newPassword !== confirmPassword) {
+            document.getElementById('confirmNewPassword').classList.add('is-invalid');
+            document.getElementById('passwordMismatchError').textContent = 'Passwords do not match';
+            return;
+        }
+        
+        try {
+            const response = await fetchWithAuth(`/users/${encodeURIComponent(username)}/reset_password`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ new_password: newPassword })
+            });
+            const data = await response.json();
+            
+            if (data.success) {
+                showToast(data.message, 'success');
+                resetPasswordModal.hide();
+                // Clear form
+                document.getElementById('newPassword').value = '';
+                document.getElementById('confirmNewPassword').value = '';
+                loadUsers(); // Refresh the table
+            } else {
+                showToast(data.error || 'Failed to reset password', 'error');
+            }
+        } catch (error) {
+            showToast('Error resetting password: ' + error.message, 'error');
+        }
+    });
+
+    async function loadUsers() {
+        usersTable.showMessage('<tr><td colspan="5" class="text-center"><div class="spinner-border text-primary" role="status"><span class="visually-hidden">Loading...</span></div></td></tr>');
+        
+        try {
+            // Use the optimized endpoint that provides all data (from keys management)
+            const response = await fetchWithAuth('/keys/users', { onUpdate: showUsers });
+            await showUsers(response);
+        } catch (error) {
+            usersTable.showMessage(`<tr><td colspan="5" class="text-center text-danger">Error loading users: ${error.message}</td></tr>`);
+        }
+    }
+
+    // Also called with fresh data when a cached listing is revalidated in the background
+    async function showUsers(response) {
+        allUsers = response.data || response;
+        tableWorker.load('users', allUsers);
+        
+        // Apply default sorting and filtering
+        await applyUserFilters();
+    }
+
+    async function applyUserFilters() {
+        // Filtering and sorting run in the table worker (static/js/table-worker.js)
+        const filters = {
+            search: document.getElementById('userSearch').value,
+            status: document.getElementById('userStatusFilter').value,
+            keys: document.getElementById('userKeyFilter').value,
+            auth: document.getElementById('userAuthFilter').value,
+        };
+        const sort = usersSortField ? { field: usersSortField, direction: usersSortDirection } : null;
+        const indices = await tableWorker.query('users', filters, sort);
+        if (!indices) return;  // superseded by a newer filter change
+        
+        displayUsers(Array.from(indices, i => allUsers[i]));
+        
+        // Update sort indicators if we have a default sort
+        if (usersSortField) {
+            const sortIcon = document.getElementById(`sort-users-${usersSortField}`);
+            if (sortIcon) {
+                document.querySelectorAll('[id^="sort-users-"]').forEach(icon => {
+                    icon.className = 'bi bi-arrow-down-up';
+                });
+                sortIcon.className = usersSortDirection === 'asc' ? 'bi bi-arrow-up' : 'bi bi-arrow-down';
+            }
+        }
+    }
+
+    // Legacy function alias for compatibility
+    function filterUsers() {
+        applyUserFilters();
+    }
+
+    function displayUsers(users) {
+        if (users.length === 0) {
+            usersTable.showMessage('<tr><td colspan="5" class="text-center">No users found</td></tr>');
+            return;
+        }
+        usersTable.setRows(users);
+    }
+
+    function renderUserRow(user) {
+        const status = getUserStatus(user);
+        const displayName = user.display_name || `${user.first_name || ''} ${user.last_name || ''}`.trim() || '-';
+        const dropdownId = `userDropdown_${user.name.replace(/[^a-zA-Z0-9]/g, '_')}`;
+        
+        // RSA Key status
+        const rsaKeyStatus = user.has_rsa_public_key ? 
+            '<span class="badge bg-success"><i class="bi bi-key"></i> Configured</span>' : 
+            '<span class="badge bg-secondary">Not Set</span>';
+        
+        return `
+            <tr>
+                <td><small><strong>${user.name}</strong></small></td>
+                <td><small>${displayName}</small></td>
+                <td><small>${status}</small></td>
+                <td>${rsaKeyStatus}</td>
+                <td>
+                    <div class="d-flex align-items-center gap-1">
+                        <button class="btn btn-brand btn-sm" onclick="showUserDetailsModal('${user.name}')" style="white-space: nowrap;">
+                            <i class="bi bi-info-circle me-1"></i>Details
+                        </button>
+                        <select class="form-select form-select-sm" id="${dropdownId}">
+                            <option value="">Actions</option>
+                            ${user.snowflake_lock ? '<option value="unlock">Unlock User</option>' : ''}
+                            <option value="reset">Reset Password</option>
+                            <option value="unset">Unset Password</option>
+                            <option value="set_key">Set/Rotate Key</option>
+                            ${user.has_rsa_public_key ? '<option value="remove_key">Remove Key</option>' : ''}
+                        </select>
+                        <button class="btn btn-brand btn-sm" onclick="executeUserAction('${user.name}', '${dropdownId}')">
+                            Go
+                        </button>
+                    </div>
+                </td>
+            </tr>
+        `;
+    }
+
+    function getUserStatus(user) {
+        if (user.disabled) {
+            return '<span class="badge bg-danger">Disabled</span>';
+        } else if (user.snowflake_lock) {
+            return '<span class="badge bg-warning">Locked</span>';
+        } else if (user.must_change_password) {
+            return '<span class="badge bg-info">Must Change Password</span>';
+        } else {
+            return '<span class="badge bg-success">Active</span>';
+        }
+    }
+
+    // Global functions for modal triggers
+    window.showUnlockModal = function(username) {
+        document.getElementById('unlockUsername').textContent = username;
+        unlockUserModal.show();
+    };
+
+    window.showResetPasswordModal = function(username) {
+        document.getElementById('resetUsername').textContent = username;
+        document.getElementById('newPassword').value = '';
+        document.getElementById('confirmNewPassword').value = '';
+        document.getElementById('newPassword').classList.remove('is-invalid');
+        document.getElementById('confirmNewPassword').classList.remove('is-invalid');
+        document.getElementById('passwordMismatchError').textContent = '';
+        resetPasswordModal.show();
+    };
+
+    window.showUnsetPasswordModal = function(username) {
+        document.getElementById('unsetUsername').textContent = username;
+        unsetPasswordModal.show();
+    };
+
+    window.showUserDetailsModal = function(username) {
+        // Find the user in allUsers array
+        const user = allUsers.find(u => u.name === username);
+        if (user) {
+            document.getElementById('detailUsername').textContent = user.name || '';
+            document.getElementById('detailLoginName').textContent = user.login_name || '';
+            document.getElementById('detailDisplayName').textContent = user.display_name || '';
+            document.getElementById('detailFirstName').textContent = user.first_name || '';
+            document.getElementById('detailLastName').textContent = user.last_name || '';
+            document.getElementById('detailEmail').textContent = user.email || '';
+            document.getElementById('detailStatus').innerHTML = getUserStatus(user);
+            document.getElementById('detailCreatedOn').textContent = user.created_on || '';
+            document.getElementById('detailLastLogin').textContent = user.last_success_login || 'Never';
+            document.getElementById('detailDefaultRole').textContent = user.default_role || '';
+            document.getElementById('detailDefaultWarehouse').textContent = user.default_warehouse || '';
+            document.getElementById('detailDaysToExpiry').textContent = user.days_to_expiry || 'N/A';
+            
+            // Security indicators
+            const publicKeyEl = document.getElementById('detailPublicKey');
+            const ssoEl = document.getElementById('detailSSO');
+            const mfaEl = document.getElementById('detailMFA');
+            
+            // Public Key indicator
+            if (user.has_rsa_public_key) {
+                publicKeyEl.innerHTML = '<span class="badge bg-success text-white"><i class="bi bi-check-circle me-1"></i>Configured</span>';
+            } else {
+                publicKeyEl.innerHTML = '<span class="badge bg-secondary"><i class="bi bi-x-circle me-1"></i>Not Set</span>';
+            }
+            
+            // SSO indicator (inferred from lack of password)
+            if (!user.has_password) {
+                ssoEl.innerHTML = '<span class="badge bg-success text-white"><i class="bi bi-check-circle me-1"></i>Enabled</span>';
+            } else {
+                ssoEl.innerHTML = '<span class="badge bg-secondary"><i class="bi bi-x-circle me-1"></i>Not Used</span>';
+            }
+            
+            // MFA indicator
+            if (user.has_mfa) {
+                mfaEl.innerHTML = '<span class="badge bg-success text-white"><i class="bi bi-shield-check me-1"></i>Enrolled</span>';
+            } else {
+                mfaEl.innerHTML = '<span class="badge bg-secondary"><i class="bi bi-shield-exclamation me-1"></i>Not Enrolled</span>';
+            }
+        }
+        userDetailsModal.show();
+    };
+
+    // Execute user action from dropdown
+    window.executeUserAction = function(username, dropdownId) {
+        const dropdown = document.getElementById(dropdownId);
+        const action = dropdown.value;
+        
+        if (!action) {
+            showToast('Please select an action first', 'warning');
+            return;
+        }
+        
+        // User management actions
+        if (action === 'unlock') {
+            showUnlockModal(username);
+        } else if (action === 'reset') {
+            showResetPasswordModal(username);
+        } else if (action === 'unset') {
+            showUnsetPasswordModal(username);
+        } 
+        // Key management actions
+        else if (action === 'set_key') {
+            showSetKeyModal(username);
+        } else if (action === 'remove_key') {
+            const user = allUsers.find(u => u.name === username);
+            if (user && user.has_rsa_public_key) {
+                removeKeyForUser(username, 1); // Default to key 1
+            } else {
+                showToast('User has no keys to remove', 'warning');
+            }
+        }
+        
+        // Reset dropdown
+        dropdown.value = '';
+    };
+
+    // Key management modal functions (simplified for unified interface)
+    window.showSetKeyModal = function(username) {
+        const user = allUsers.find(u => u.name === username);
+        if (!user) {
+            showToast('User not found', 'error');
+            return;
+        }
+        
+        // Set the username and reset all form values
+        document.getElementById('rotateKeyUsername').textContent = username;
+        document.getElementById('rotateKeyPassphrase').value = '';
+        document.getElementById('setInSnowflake').checked = true;
+        document.getElementById('unsetPassword').checked = false;
+        document.getElementById('changeUserType').checked = false;
+        document.getElementById('userType').value = 'NULL';
+        document.getElementById('userTypeGroup').style.display = 'none';
+        
+        const rotateKeyModal = new bootstrap.Modal(document.getElementById('rotateKeyModal'));
+        rotateKeyModal.show();
+    };
+
+    window.removeKeyForUser = async function(username, keySlot) {
+        if (!confirm(`Are you sure you want to remove the RSA key for ${username}?`)) {
+            return;
+        }
+        
+        try {
+            const response = await fetchWithAuth(`/keys/users/${encodeURIComponent(username)}/unset`, {
+                method: 'POST'
+            });
+            const data = await response.json();
+            
+            if (data.success) {
+                showToast(`RSA key removed for ${username}`, 'success');
+                loadUsers(); // Refresh the table
+            } else {
+                showToast(data.error || 'Failed to remove RSA key', 'error');
+            }
+        } catch (error) {
+            showToast('Error removing RSA key: ' + error.message, 'error');
+        }
+    };
+
+
+    /* -------- Role Management Tab Logic -------- */
+    let rolesData = [];
+    
+    // Sorting functions for Roles table
+    let rolesSortField = 'name';
+    let rolesSortDirection = 'asc';
+
+    const roleSearch = document.getElementById('roleSearch');
+    const roleTypeFilter = document.getElementById('roleTypeFilter');
+    const refreshRolesBtn = document.getElementById('refreshRoles');
+    const rolesTable = new VirtualTable(
+        document.getElementById('rolesTableContainer'),
+        document.getElementById('rolesTableBody'),
+        { colspan: 4, renderRow: renderRoleRow }
+    );
+
+    async function loadRolesData() {
+        try {
+            rolesTable.showMessage('<tr><td colspan="4" class="text-center"><div class="spinner-border text-primary" role="status"></div></td></tr>');
+            await showRoles(await fetchWithAuth('/roles/detailed', { onUpdate: showRoles }));
+        } catch (err) {
+            showToast('Failed to load roles: ' + err.message, 'error');
+            rolesTable.showMessage('<tr><td colspan="4" class="text-center text-muted">Failed to load roles</td></tr>');
+        }
+    }
+
+    // Also called with fresh data when a cached listing is revalidated in the background
+    async function showRoles(data) {
+        rolesData = data;
+        tableWorker.load('roles', rolesData);
+        
+        // Apply default sorting and filtering
+        await applyRolesFilters();
+    }
+
+    async function applyRolesFilters() {
+        const filters = { search: roleSearch.value, type: roleTypeFilter.value };
+        const sort = rolesSortField ? { field: rolesSortField, direction: rolesSortDirection } : null;
+        const indices = await tableWorker.query('roles', filters, sort);
+        if (!indices) return;  // superseded by a newer filter change
+
+        if (indices.length === 0) {
+            rolesTable.showMessage('<tr><td colspan="4" class="text-center text-muted">No roles found</td></tr>');
+        } else {
+            rolesTable.setRows(Array.from(indices, i => rolesData[i]));
+        }
+        
+        // Update sort indicators if we have a default sort
+        if (rolesSortField) {
+            const sortIcon = document.getElementById(`sort-roles-${rolesSortField}`);
+            if (sortIcon) {
+                document.querySelectorAll('[id^="sort-roles-"]').forEach(icon => {
+                    icon.className = 'bi bi-arrow-down-up';
+                });
+                sortIcon.className = rolesSortDirection === 'asc' ? 'bi bi-arrow-up' : 'bi bi-arrow-down';
+            }
+        }
+    }
+
+    function renderRoleRow(role) {
+        const roleType = ['ACCOUNTADMIN', 'SECURITYADMIN', 'SYSADMIN', 'PUBLIC', 'USERADMIN', 'ORGADMIN'].includes(role.name) ? 'System' : 'Custom';
+        const typeClass = roleType === 'System' ? 'badge bg-primary' : 'badge bg-secondary';
+        const statusBadges = [];
+        
+        if (role.is_current) statusBadges.push('<span class="badge bg-success me-1">Current</span>');
+        if (role.is_inherited) statusBadges.push('<span class="badge bg-primary me-1">Inherited</span>');
+        if (role.is_default) statusBadges.push('<span class="badge bg-warning me-1">Default</span>');
+
+        return `
+            <tr>
+                <td>
+                    <small><strong>${role.name}</strong></small>
+                    ${statusBadges.length > 0 ? '<br>' + statusBadges.join('') : ''}
+                </td>
+                <td class="text-center"><small>${role.assigned_to_users || 0}</small></td>
+                <td><small>${role.created_on ? new Date(role.created_on).toLocaleDateString() : '-'}</small></td>
+                <td>
+                    <button class="btn btn-brand btn-sm" onclick="showRoleDetails('${role.name}')">
+                        <i class="bi bi-info-circle"></i> Details
+                    </button>
+                </td>
+            </tr>
+        `;
+    }
+
+    async function showRoleDetails(roleName) {
+        const modal = new bootstrap.Modal(document.getElementById('roleDetailsModal'));
+        const role = rolesData.find(r => r.name === roleName);
+        
+        if (!role) {
+            showToast('Role not found', 'error');
+            return;
+        }
+
+        // Populate basic role info
+        document.getElementById('detailRoleName').textContent = role.name;
+        document.getElementById('detailRoleOwner').textContent = role.owner || 'N/A';
+        document.getElementById('detailRoleCreated').textContent = role.created_on ? new Date(role.created_on).toLocaleString() : 'N/A';
+        document.getElementById('detailRoleUsersAssigned').textContent = role.assigned_to_users || 0;
+        document.getElementById('detailRoleGrantedToRoles').textContent = role.granted_to_roles || 0;
+        document.getElementById('detailRoleGrantedRoles').textContent = role.granted_roles || 0;
+        document.getElementById('detailRoleComment').textContent = role.comment || 'No comment';
+
+        // Show modal
+        modal.show();
+
+        // Load privileges and grants
+        loadRoleDetails(roleName);
+    }
+
+    function loadRoleDetails(roleName) {
+        // One request for both tables; the server runs the two SHOW GRANTS at the same time
+        const details = fetchWithAuth(`/roles/${encodeURIComponent(roleName)}/details`);
+        loadRolePrivileges(details.then(d => d.privileges));
+        loadRoleGrants(details.then(d => d.grants));
+    }
+
+    const rolePrivilegesTable = new VirtualTable(
+        document.getElementById('rolePrivilegesTable'),
+        document.getElementById('rolePrivilegesBody'),
+        { colspan: 5, renderRow: renderPrivilegeRow }
+    );
+    const roleGrantsTable = new VirtualTable(
+        document.getElementById('roleGrantsTable'),
+        document.getElementById('roleGrantsBody'),
+        { colspan: 4, renderRow: renderGrantRow }
+    );
+
+    async function loadRolePrivileges(request) {
+        const loadingEl = document.getElementById('rolePrivilegesLoading');
+        const tableEl = document.getElementById('rolePrivilegesTable');
+        const emptyEl = document.getElementById('rolePrivilegesEmpty');
+
+        loadingEl.style.display = 'block';
+        tableEl.style.display = 'none';
+        emptyEl.style.display = 'none';
+
+        try {
+            const privileges = await request;
+            
+            // Store all privileges for filtering
+            window.currentRolePrivileges = privileges;
+            tableWorker.load('privileges', privileges);
+            
+            // Load databases and privileges for filtering
+            await loadPrivilegeDatabases();
+            loadPrivilegeTypes();
+            
+            // Apply current filters and display
+            await applyPrivilegeFilters();
+        } catch (err) {
+            console.error('Error loading role privileges:', err);
+            loadingEl.style.display = 'none';
+            emptyEl.style.display = 'block';
+            emptyEl.innerHTML = '<p class="text-danger text-center">Failed to load privileges</p>';
+        }
+    }
+
+    function loadPrivilegeTypes() {
+        const privilegeSelect = document.getElementById('privilegeTypeFilter');
+        if (!window.currentRolePrivileges) return;
+        
+        // Get unique privilege types
+        const privilegeTypes = [...new Set(window.currentRolePrivileges.map(priv => priv.privilege))].sort();
+        
+        privilegeSelect.innerHTML = '<option value="">All Privileges</option>' + 
+            privilegeTypes.map(privilege => `<option value="${privilege}">${privilege}</option>`).join('');
+    }
+
+    async function applyPrivilegeFilters() {
+        const loadingEl = document.getElementById('rolePrivilegesLoading');
+        const tableEl = document.getElementById('rolePrivilegesTable');
+        const emptyEl = document.getElementById('rolePrivilegesEmpty');
+
+        if (!window.currentRolePrivileges) {
+            return;
+        }
+
+        const filters = {
+            db: document.getElementById('privilegeDbFilter').value,
+            schema: document.getElementById('privilegeSchemaFilter').value,
+            privilege: document.getElementById('privilegeTypeFilter').value,
+        };
+        const privileges = window.currentRolePrivileges;
+        const indices = await tableWorker.query('privileges', filters);
+        if (!indices || privileges !== window.currentRolePrivileges) return;  // superseded
+
+        if (indices.length === 0) {
+            loadingEl.style.display = 'none';
+            tableEl.style.display = 'none';
+            emptyEl.style.display = 'block';
+            return;
+        }
+
+        loadingEl.style.display = 'none';
+        tableEl.style.display = 'block';
+        emptyEl.style.display = 'none';
+        rolePrivilegesTable.setRows(Array.from(indices, i => privileges[i]));
+    }
+
+    function renderPrivilegeRow(priv) {
+        return `
+            <tr>
+                <td><span class="badge bg-primary">${priv.privilege}</span></td>
+                <td class="text-light">${priv.granted_on || '-'}</td>
+                <td class="text-light">${priv.name || '-'}</td>
+                <td class="text-light">${priv.granted_by || '-'}</td>
+                <td>
+                    ${priv.grant_option ? 
+                        '<span class="badge bg-success">Yes</span>' : 
+                        '<span class="badge bg-secondary">No</span>'
+                    }
+                </td>
+            </tr>
+        `;
+    }
+
+    async function loadPrivilegeDatabases() {
+        const dbSelect = document.getElementById('privilegeDbFilter');
+        try {
+            const databases = await fetchWithAuth('/databases');
+            dbSelect.innerHTML = '<option value="">All Databases</option>' + 
+                databases.map(db => `<option value="${db}">${db}</option>`).join('');
+        } catch (err) {
+            console.error('Error loading databases for privilege filter:', err);
+        }
+    }
+
+    async function loadPrivilegeSchemas(database) {
+        const schemaSelect = document.getElementById('privilegeSchemaFilter');
+        schemaSelect.disabled = true;
+        schemaSelect.innerHTML = '<option value="">Loading...</option>';
+        
+        if (!database) {
+            schemaSelect.innerHTML = '<option value="">All Schemas</option>';
+            schemaSelect.disabled = true;
+            return;
+        }
+
+        try {
+            const schemas = (schemaTree && schemaTree[database]) || await fetchWithAuth(`/schemas?db=${database}`);
+            schemaSelect.innerHTML = '<option value="">All Schemas</option>' + 
+                schemas.map(schema => `<option value="${schema}">${schema}</option>`).join('');
+            schemaSelect.disabled = false;
+        } catch (err) {
+            console.error('Error loading schemas for privilege filter:', err);
+            schemaSelect.innerHTML = '<option value="">Error loading schemas</option>';
+        }
+    }
+
+    async function loadRoleGrants(request) {
+        const loadingEl = document.getElementById('roleGrantsLoading');
+        const tableEl = document.getElementById('roleGrantsTable');
+        const emptyEl = document.getElementById('roleGrantsEmpty');
+
+        loadingEl.style.display = 'block';
+        tableEl.style.display = 'none';
+        emptyEl.style.display = 'none';
+
+        try {
+            const grants = await request;
+            
+            if (grants.length === 0) {
+                loadingEl.style.display = 'none';
+                emptyEl.style.display = 'block';
+                return;
+            }
+
+            loadingEl.style.display = 'none';
+            tableEl.style.display = 'block';
+            roleGrantsTable.setRows(grants);
+        } catch (err) {
+            console.error('Error loading role grants:', err);
+            loadingEl.style.display = 'none';
+            emptyEl.style.display = 'block';
+            emptyEl.innerHTML = '<p class="text-danger text-center">Failed to load grants</p>';
+        }
+    }
+
+    function renderGrantRow(grant) {
+        return `
+            <tr>
+                <td class="text-light"><strong>${grant.grantee_name}</strong></td>
+                <td>
+                    <span class="badge ${grant.granted_to === 'USER' ? 'bg-info' : 'bg-secondary'}">
+                        ${grant.granted_to}
+                    </span>
+                </td>
+                <td class="text-light">${grant.granted_by || '-'}</td>
+                <td class="text-light">${grant.created_on ? new Date(grant.created_on).toLocaleDateString() : '-'}</td>
+            </tr>
+        `;
+    }
+
+    // Event listeners for privilege filters
+    document.getElementById('privilegeDbFilter').addEventListener('change', function() {
+        const selectedDb = this.value;
+        loadPrivilegeSchemas(selectedDb);
+        applyPrivilegeFilters();
+    });
+
+    document.getElementById('privilegeSchemaFilter').addEventListener('change', function() {
+        applyPrivilegeFilters();
+    });
+
+    document.getElementById('privilegeTypeFilter').addEventListener('change', function() {
+        applyPrivilegeFilters();
+    });
+
+    document.getElementById('clearPrivilegeFilters').addEventListener('click', function() {
+        document.getElementById('privilegeDbFilter').value = '';
+        document.getElementById('privilegeSchemaFilter').value = '';
+        document.getElementById('privilegeSchemaFilter').disabled = true;
+        document.getElementById('privilegeTypeFilter').value = '';
+        applyPrivilegeFilters();
+    });
+
+    // Handle collapsible chevron icons
+    document.addEventListener('DOMContentLoaded', function() {
+        const roleGrantsSection = document.getElementById('roleGrantsSection');
+        const rolePrivilegesSection = document.getElementById('rolePrivilegesSection');
+        
+        if (roleGrantsSection) {
+            roleGrantsSection.addEventListener('show.bs.collapse', function() {
+                document.getElementById('roleGrantsChevron').className = 'bi bi-chevron-down';
+            });
+            roleGrantsSection.addEventListener('hide.bs.collapse', function() {
+                document.getElementById('roleGrantsChevron').className = 'bi bi-chevron-right';
+            });
+        }
+        
+        if (rolePrivilegesSection) {
+            rolePrivilegesSection.addEventListener('show.bs.collapse', function() {
+                document.getElementById('rolePrivilegesChevron').className = 'bi bi-chevron-down';
+            });
+            rolePrivilegesSection.addEventListener('hide.bs.collapse', function() {
+                document.getElementById('rolePrivilegesChevron').className = 'bi bi-chevron-right';
+            });
+        }
+    });
+
+    // Event listeners for roles tab
+    roleSearch.addEventListener('input', applyRolesFilters);
+    roleTypeFilter.addEventListener('change', applyRolesFilters);
+    refreshRolesBtn.addEventListener('click', () => {
+        apiCache.invalidate('/roles/detailed');
+        loadRolesData();
+    });
+
+    // Roles data will be pre-loaded on login, manual refresh available via refresh button
+
+    // Initialize default sorting for Roles table (already initialized above)
+
+    // Make showRoleDetails globally accessible
+    window.showRoleDetails = showRoleDetails;
+
+    // ==================== KEY MANAGEMENT FUNCTIONALITY ====================
+    
+    let keysData = [];
+    let filteredKeysData = [];
+    let currentKeysPage = 1;
+    const keysPerPage = 20;
+    let keysSortField = 'name';
+    let keysSortDirection = 'asc';
+
+    // DOM elements for keys tab
+    const keySearch = document.getElementById('keySearch');
+    const keyStatusFilter = document.getElementById('keyStatusFilter');
+    const refreshKeysBtn = document.getElementById('refreshKeys');
+    const keysTableBody = document.getElementById('keysTableBody');
+    const keysPagination = document.getElementById('keysPagination');
+    const keysPrevPage = document.getElementById('keysPrevPage');
+    const keysNextPage = document.getElementById('keysNextPage');
+    const keysCurrentPageInfo = document.getElementById('keysCurrentPageInfo');
+
+    async function loadKeysData() {
+        if (!isAuthenticated) return;
+        
+        try {
+            keysTableBody.innerHTML = '<tr><td colspan="3" class="text-center"><div class="spinner-border text-primary" role="status"><span class="visually-hidden">Loading...</span></div></td></tr>';
+            
+            const response = await fetchWithAuth('/keys/users');
+            keysData = response;
+            
+            // Always apply filters first to populate filteredKeysData
+            applyKeysFilters();
+            
+            // Then apply default sorting if specified
+            if (keysSortField && filteredKeysData.length > 0) {
+                sortKeysTable(keysSortField);
+            }
+        } catch (err) {
+            console.error('Error loading keys data:', err);
+            keysTableBody.innerHTML = '<tr><td colspan="3" class="text-center text-danger">Failed to load keys data</td></tr>';
+        }
+    }
+
+    function applyKeysFilters() {
+        const searchTerm = keySearch.value.toLowerCase();
+        const statusFilter = keyStatusFilter.value;
+
+        filteredKeysData = keysData.filter(user => {
+            const matchesSearch = user.name.toLowerCase().includes(searchTerm) ||
+                                (user.display_name || '').toLowerCase().includes(searchTerm) ||
+                                (user.email || '').toLowerCase().includes(searchTerm);
+
+            let matchesStatus = true;
+            if (statusFilter) {
+                switch (statusFilter) {
+                    case 'has_keys':
+                        matchesStatus = user.has_rsa_public_key;
+                        break;
+                    case 'no_keys':
+                        matchesStatus = !user.has_rsa_public_key;
+                        break;
+                }
+            }
+
+            return matchesSearch && matchesStatus;
+        });
+
+        currentKeysPage = 1;
+        displayKeysPage();
+        
+        // Update sort indicators if we have a default sort
+        if (keysSortField) {
+            const sortIcon = document.getElementById(`sort-keys-${keysSortField}`);
+            if (sortIcon) {
+                document.querySelectorAll('[id^="sort-keys-"]').forEach(icon => {
+                    icon.className = 'bi bi-arrow-down-up';
+                });
+                sortIcon.className = keysSortDirection === 'asc' ? 'bi bi-arrow-up' : 'bi bi-arrow-down';
+            }
+        }
+    }
+
+    function displayKeysPage() {
+        const startIndex = (currentKeysPage - 1) * keysPerPage;
+        const endIndex = startIndex + keysPerPage;
+        const pageData = filteredKeysData.slice(startIndex, endIndex);
+
+        if (pageData.length === 0) {
+            keysTableBody.innerHTML = '<tr><td colspan="3" class="text-center text-muted">No users found</td></tr>';
+            keysPagination.style.display = 'none';
+            return;
+        }
+
+        keysTableBody.innerHTML = pageData.map(user => {
+            const statusBadges = [];
+            if (user.disabled) statusBadges.push('<span class="badge bg-danger">Disabled</span>');
+            if (user.snowflake_lock) statusBadges.push('<span class="badge bg-warning">Locked</span>');
+            if (user.must_change_password) statusBadges.push('<span class="badge bg-info">Must Change Password</span>');
+
+            const rsaKeyStatus = user.has_rsa_public_key ? 
+                '<span class="badge bg-success"><i class="bi bi-key"></i> Configured</span>' : 
+                '<span class="badge bg-secondary">Not Set</span>';
+
+            const dropdownId = `keyAction_${user.name.replace(/[^a-zA-Z0-9]/g, '_')}`;
+
+            return `
+                <tr>
+                    <td>
+                        <small><strong>${user.name}</strong></small>
+                        ${statusBadges.length > 0 ? '<br>' + statusBadges.join('') : ''}
+                    </td>
+                    <td>${rsaKeyStatus}</td>
+                    <td>
+                        <div class="d-flex align-items-center gap-1">
+                            <button class="btn btn-brand btn-sm" onclick="showUserKeyDetails('${user.name}')" style="white-space: nowrap;">
+                                <i class="bi bi-info-circle me-1"></i>Details
+                            </button>
+                            <select class="form-select form-select-sm" id="${dropdownId}">
+                                <option value="">Actions</option>
+                                <option value="set">Set/Rotate Key</option>
+                                <option value="remove">Remove Key</option>
+                            </select>
+                            <button class="btn btn-brand btn-sm" onclick="executeKeyAction('${user.name}', '${dropdownId}')">
+                                Go
+                            </button>
+                        </div>
+                    </td>
+                </tr>
+            `;
+        }).join('');
+
+        // Update pagination
+        const totalPages = Math.ceil(filteredKeysData.length / keysPerPage);
+        keysCurrentPageInfo.textContent = `Page ${currentKeysPage} of ${totalPages}`;
+        keysPrevPage.parentElement.classList.toggle('disabled', currentKeysPage === 1);
+        keysNextPage.parentElement.classList.toggle('disabled', currentKeysPage === totalPages);
+        keysPagination.style.display = totalPages > 1 ? 'block' : 'none';
+    }
+
+    async function showUserKeyDetails(username) {
+        const modal = new bootstrap.Modal(document.getElementById('userKeyDetailsModal'));
+        
+        try {
+            const userDetails = await fetchWithAuth(`/keys/users/${encodeURIComponent(username)}/details`);
+            
+            // Populate basic user info
+            document.getElementById('keyDetailUsername').textContent = userDetails.name || username;
+            document.getElementById('keyDetailDisplayName').textContent = userDetails.display_name || 'N/A';
+            document.getElementById('keyDetailEmail').textContent = userDetails.email || 'N/A';
+            document.getElementById('keyDetailLoginName').textContent = userDetails.login_name || 'N/A';
+            document.getElementById('keyDetailDefaultRole').textContent = userDetails.default_role || 'N/A';
+            
+            // Status
+            const statusBadges = [];
+            if (userDetails.disabled) statusBadges.push('<span class="badge bg-danger">Disabled</span>');
+            if (userDetails.snowflake_lock) statusBadges.push('<span class="badge bg-warning">Locked</span>');
+            if (userDetails.must_change_password) statusBadges.push('<span class="badge bg-info">Must Change Password</span>');
+            if (statusBadges.length === 0) statusBadges.push('<span class="badge bg-success">Active</span>');
+            document.getElementById('keyDetailStatus').innerHTML = statusBadges.join(' ');
+            
+            // RSA Keys status (view-only data)
+            const hasKeys = userDetails.has_rsa_public_key;
+            document.getElementById('key1StatusText').innerHTML = hasKeys ? 
+                '<span class="badge bg-success"><i class="bi bi-check-circle"></i> Configured</span>' : 
+                '<span class="badge bg-secondary">Not Set</span>';
+            
+            // Hide key-specific details since we only have view data
+            document.getElementById('key1Fingerprint').style.display = 'none';
+            document.getElementById('removeKey1Btn').style.display = 'none';
+            
+            // Authentication methods
+            const authMethods = [];
+            if (hasKeys) authMethods.push('<span class="badge bg-primary">RSA Keys</span>');
+            if (userDetails.has_password) authMethods.push('<span class="badge bg-info">Password</span>');
+            if (userDetails.has_mfa) authMethods.push('<span class="badge bg-success">MFA</span>');
+            document.getElementById('keyDetailHasKeys').innerHTML = authMethods.join(' ');
+            
+            // Add a notice for view-only data
+            if (userDetails.view_only) {
+                const statusElement = document.getElementById('keyDetailStatus');
+                statusElement.innerHTML += '<br><small class="text-info"><i class="bi bi-info-circle"></i> Data from view only - detailed key management available in Snowflake console</small>';
+            }
+            
+            document.getElementById('keyDetailHasPassword').innerHTML = userDetails.has_password ? 
+                '<span class="badge bg-success">Yes</span>' : '<span class="badge bg-secondary">No</span>';
+            document.getElementById('keyDetailHasMFA').innerHTML = userDetails.has_mfa ? 
+                '<span class="badge bg-success">Yes</span>' : '<span class="badge bg-secondary">No</span>';
+            
+            modal.show();
+        } catch (err) {
+            console.error('Error loading user key details:', err);
+            showToast('Failed to load user details', 'error');
+        }
+    }
+
+    function setKeyForUser(username, keyNumber = 1) {
+        // Close any open details modal first to prevent z-index issues
+        const detailsModal = bootstrap.Modal.getInstance(document.getElementById('userKeyDetailsModal'));
+        if (detailsModal) {
+            detailsModal.hide();
+        }
+        
+        // Small delay to ensure the previous modal is fully closed
+        setTimeout(() => {
+            const modal = new bootstrap.Modal(document.getElementById('setKeyModal'));
+            document.getElementById('setKeyUsername').textContent = username;
+            document.getElementById('keyNumber').value = keyNumber;
+            document.getElementById('publicKeyContent').value = '';
+            modal.show();
+        }, 200);
+    }
+
+    function removeKeyForUser(username, keyNumber) {
+        const modal = new bootstrap.Modal(document.getElementById('removeKeyModal'));
+        document.getElementById('removeKeyUsername').textContent = username;
+        document.getElementById('removeKeySlot').textContent = `Key ${keyNumber}`;
+        
+        // Store the key number for the confirmation handler
+        document.getElementById('confirmRemoveKey').setAttribute('data-username', username);
+        document.getElementById('confirmRemoveKey').setAttribute('data-key-number', keyNumber);
+        
+        modal.show();
+    }
+
+    // Event listeners for key management modals
+    document.getElementById('confirmSetKey').addEventListener('click', async function() {
+        const username = document.getElementById('setKeyUsername').textContent;
+        const keyNumber = parseInt(document.getElementById('keyNumber').value);
+        const publicKey = document.getElementById('publicKeyContent').value.trim();
+        
+        if (!publicKey) {
+            showToast('Please enter a public key', 'error');
+            return;
+        }
+        
+        try {
+            const response = await fetchWithAuth(`/keys/users/${encodeURIComponent(username)}/set`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    public_key: publicKey,
+                    key_number: keyNumber
+                })
+            });
+            
+            if (response.success) {
+                showToast(response.message, 'success');
+                bootstrap.Modal.getInstance(document.getElementById('setKeyModal')).hide();
+                loadKeysData(); // Refresh the table
+                
+                // If user key details modal is open, refresh it
+                const keyDetailsModal = document.getElementById('userKeyDetailsModal');
+                if (keyDetailsModal.classList.contains('show')) {
+                    showUserKeyDetails(username);
+                }
+            } else {
+                showToast(response.message || 'Failed to set public key', 'error');
+            }
+        } catch (err) {
+            console.error('Error setting public key:', err);
+            showToast('Failed to set public key', 'error');
+        }
+    });
+
+    document.getElementById('confirmRemoveKey').addEventListener('click', async function() {
+        const username = this.getAttribute('data-username');
+        const keyNumber = parseInt(this.getAttribute('data-key-number'));
+        
+        try {
+            const response = await fetchWithAuth(`/keys/users/${encodeURIComponent(username)}/unset`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    key_number: keyNumber
+                })
+            });
+            
+            if (response.success) {
+                showToast(response.message, 'success');
+                bootstrap.Modal.getInstance(document.getElementById('removeKeyModal')).hide();
+                loadKeysData(); // Refresh the table
+                
+                // If user key details modal is open, refresh it
+                const keyDetailsModal = document.getElementById('userKeyDetailsModal');
+                if (keyDetailsModal.classList.contains('show')) {
+                    showUserKeyDetails(username);
+                }
+            } else {
+                showToast(response.message || 'Failed to remove public key', 'error');
+            }
+        } catch (err) {
+            console.error('Error removing public key:', err);
+            showToast('Failed to remove public key', 'error');
+        }
+    });
+
+    // Event listeners for keys tab
+    if (keySearch) keySearch.addEventListener('input', applyKeysFilters);
+    if (keyStatusFilter) keyStatusFilter.addEventListener('change', applyKeysFilters);
+    if (refreshKeysBtn) refreshKeysBtn.addEventListener('click', loadKeysData);
+
+    if (keysPrevPage) {
+        keysPrevPage.addEventListener('click', (e) => {
+            e.preventDefault();
+            if (currentKeysPage > 1) {
+                currentKeysPage--;
+                displayKeysPage();
+            }
+        });
+    }
+
+    if (keysNextPage) {
+        keysNextPage.addEventListener('click', (e) => {
+            e.preventDefault();
+            const totalPages = Math.ceil(filteredKeysData.length / keysPerPage);
+            if (currentKeysPage < totalPages) {
+                currentKeysPage++;
+                displayKeysPage();
+            }
+        });
+    }
+
+    // Keys tab removed - functionality integrated into Users tab
+
+    // Keys sorting integrated into unified Users table sorting
+
+    // Key actions now handled by unified executeUserAction function
+
+    // Legacy function - now handled by global showSetKeyModal
+
+    // Toggle passphrase visibility for rotate key modal
+    document.getElementById('toggleRotateKeyPassphrase').addEventListener('click', function() {
+        const passphraseInput = document.getElementById('rotateKeyPassphrase');
+        const icon = this.querySelector('i');
+        
+        if (passphraseInput.type === 'password') {
+            passphraseInput.type = 'text';
+            icon.className = 'bi bi-eye-slash';
+        } else {
+            passphraseInput.type = 'password';
+            icon.className = 'bi bi-eye';
+        }
+    });
+
+    // Handle change user type checkbox
+    document.getElementById('changeUserType').addEventListener('change', function() {
+        const userTypeGroup = document.getElementById('userTypeGroup');
+        userTypeGroup.style.display = this.checked ? 'block' : 'none';
+        if (!this.checked) {
+            document.getElementById('userType').value = 'NULL';
+        }
+    });
+
+    // Password unset warning
+    document.getElementById('unsetPassword').addEventListener('change', function() {
+        if (this.checked) {
+            if (!confirm('⚠️ WARNING: Unsetting the password will disable password-based login for this user.\n\nThey will only be able to authenticate using:\n• RSA key pairs\n• Single Sign-On (SSO)\n• Other configured authentication methods\n\nAre you sure you want to continue?')) {
+                this.checked = false;
+            }
+        }
+    });
+
+    // Handle rotate key confirmation
+    document.getElementById('confirmRotateKey').addEventListener('click', async function() {
+        const username = document.getElementById('rotateKeyUsername').textContent;
+        const passphrase = document.getElementById('rotateKeyPassphrase').value;
+        const setInSnowflake = document.getElementById('setInSnowflake').checked;
+        const unsetPassword = document.getElementById('unsetPassword').checked;
+        const changeUserType = document.getElementById('changeUserType').checked;
+        const userType = changeUserType ? document.getElementById('userType').value : null;
+        
+        if (!passphrase.trim()) {
+            showToast('Please enter a passphrase', 'error');
+            return;
+        }
+        
+        try {
+            // Disable button and show loading
+            this.disabled = true;
+            this.innerHTML = '<i class="spinner-border spinner-border-sm me-2"></i>Generating...';
+            
+            const response = await fetchWithAuth('/keys/generate-and-rotate', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    username: username,
+                    passphrase: passphrase,
+                    set_in_snowflake: setInSnowflake,
+                    unset_password: unsetPassword,
+                    new_type: userType
+                })
+            });
+            
+            // Hide rotate modal
+            bootstrap.Modal.getInstance(document.getElementById('rotateKeyModal')).hide();
+            
+            // Show results modal
+            showKeyGenResults(response);
+            
+            // Refresh user management table
+            loadUsers();
+            
+        } catch (err) {
+            console.error('Error rotating key:', err);
+            showToast('Failed to generate/rotate key: ' + err.message, 'error');
+        } finally {
+            // Reset button
+            this.disabled = false;
+            this.innerHTML = '<i class="bi bi-arrow-clockwise"></i> Generate & Set Key';
+        }
+    });
+
+    // Show key generation results modal
+    function showKeyGenResults(response) {
+        const resultsModal = new bootstrap.Modal(document.getElementById('keyGenResultsModal'));
+        const resultsDiv = document.getElementById('keyGenResults');
+        const filesDiv = document.getElementById('keyGenFiles');
+        const commandSection = document.getElementById('snowflakeCommandSection');
+        const commandTextarea = document.getElementById('snowflakeCommandModal');
+        
+        // Populate results
+        let resultsHtml = '';
+        if (response.success) {
+            resultsHtml += '<div class="d-flex align-items-center mb-2"><i class="bi bi-check-circle" style="color: #28a745;" ></i><span class="ms-2">Encrypted private key generated</span></div>';
+            resultsHtml += '<div class="d-flex align-items-center mb-2"><i class="bi bi-check-circle" style="color: #28a745;"></i><span class="ms-2">Public key generated</span></div>';
+            
+            if (response.snowflake_success) {
+                resultsHtml += '<div class="d-flex align-items-center mb-2"><i class="bi bi-check-circle" style="color: #28a745;"></i><span class="ms-2">Public key set in Snowflake</span></div>';
+                
+                // Show additional actions performed
+                if (response.actions_performed) {
+                    if (response.actions_performed.password_unset) {
+                        resultsHtml += '<div class="d-flex align-items-center mb-2"><i class="bi bi-check-circle" style="color: #28a745;"></i><span class="ms-2">Password unset (disabled password login)</span></div>';
+                    }
+                    if (response.actions_performed.type_changed) {
+                        resultsHtml += '<div class="d-flex align-items-center mb-2"><i class="bi bi-check-circle" style="color: #28a745;"></i><span class="ms-2">User type updated</span></div>';
+                    }
+                }
+            } else if (response.snowflake_attempted) {
+                resultsHtml += '<div class="d-flex align-items-center mb-2"><i class="bi bi-exclamation-triangle" style="color: #ff8c00;"></i><span class="ms-2">Snowflake update failed</span></div>';
+            }
+            
+            // Show passphrase
+            resultsHtml += `<div class="d-flex align-items-center mt-3"><i class="bi bi-exclamation-triangle" style="color: #ff8c00;"></i><span class="ms-2"><strong>Passphrase: ${response.passphrase}</strong> (store safely)</span></div>`;
+        } else {
+            resultsHtml += '<div class="d-flex align-items-center mb-2"><i class="bi bi-x-circle text-danger"></i><span class="ms-2">Key generation failed</span></div>';
+        }
+        resultsDiv.innerHTML = resultsHtml;
+        
+        // Populate files
+        let filesHtml = '';
+        if (response.files && response.files.length > 0) {
+            response.files.forEach(file => {
+                const icon = file.filename.includes('private') ? 'bi-file-lock' : 'bi-file-text';
+                filesHtml += `
+                    <li class="list-group-item d-flex justify-content-between align-items-center">
+                        <span><i class="bi ${icon} me-2"></i>${file.label}: ${file.filename}</span>
+                        <a href="/download/${response.username}/${file.filename}" class="download-btn">
+                            <i class="bi bi-download"></i> Download
+                        </a>
+                    </li>
+                `;
+            });
+        } else {
+            filesHtml = '<li class="list-group-item text-muted">No files generated</li>';
+        }
+        filesDiv.innerHTML = filesHtml;
+        
+        // Show Snowflake command if needed
+        console.log('Snowflake command debug:', {
+            attempted: response.snowflake_attempted,
+            success: response.snowflake_success,
+            command: response.snowflake_command,
+            command_length: response.snowflake_command ? response.snowflake_command.length : 0,
+            command_type: typeof response.snowflake_command,
+            error: response.snowflake_error
+        });
+        
+        if (response.snowflake_attempted && !response.snowflake_success && response.snowflake_command) {
+            console.log('Setting command textarea value:', response.snowflake_command);
+            commandTextarea.value = response.snowflake_command;
+            commandSection.style.display = 'block';
+            console.log('✓ Showing Snowflake command section');
+            console.log('Textarea value after setting:', commandTextarea.value);
+        } else {
+            commandSection.style.display = 'none';
+            console.log('✗ Hiding Snowflake command section', {
+                attempted: response.snowflake_attempted,
+                success: response.snowflake_success,
+                hasCommand: !!response.snowflake_command
+            });
+        }
+        
+        resultsModal.show();
+    }
+
+    // Copy to clipboard function
+    function copyToClipboard(elementId) {
+        const element = document.getElementById(elementId);
+        element.select();
+        element.setSelectionRange(0, 99999);
+        document.execCommand('copy');
+        showToast('Copied to clipboard', 'success');
+    }
+
+    // Sorting functions for Users table (declared at top of users section)
+
+    window.sortUsersTable = function(field) {
+        if (usersSortField === field) {
+            usersSortDirection = usersSortDirection === 'asc' ? 'desc' : 'asc';
+        } else {
+            usersSortField = field;
+            usersSortDirection = 'asc';
+        }
+
+        // Update sort icons
+        document.querySelectorAll('[id^="sort-users-"]').forEach(icon => {
+            icon.className = 'bi bi-arrow-down-up';
+        });
+        const currentIcon = document.getElementById(`sort-users-${field}`);
+        if (currentIcon) {
+            currentIcon.className = usersSortDirection === 'asc' ? 'bi bi-arrow-up' : 'bi bi-arrow-down';
+        }
+
+        // Re-run the query; the worker sorts the filtered rows
+        applyUserFilters();
+    };
+
+    // Logs Tab Functionality
+    let logsEventSource;  // EventSource tailing /logs/stream while auto-refresh is on
+    let logsData = [];
+
+    function escapeLogHtml(text) {
+        return String(text).replace(/[&<>"']/g, ch => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        }[ch]));
+    }
+    
+    function loadLogs() {
+        const lines = document.getElementById('logLines').value || '100';
+        const level = document.getElementById('logLevelFilter').value || '';
+        const search = document.getElementById('logSearch').value || '';
+        
+        const params = new URLSearchParams({
+            lines: lines,
+            level: level,
+            search: search
+        });
+        
+        fetchWithAuth(`/logs?${params}`)
+            .then(response => {
+                if (response.success) {
+                    logsData = response.logs;
+                    displayLogs(logsData);
+                    updateLogStats(response.total_lines, logsData.length);
+                    updateLastLogUpdate();
+                    if (document.getElementById('autoRefresh').checked && !logsEventSource) {
+                        setupLogsAutoRefresh();
+                    }
+                } else {
+                    document.getElementById('logContainer').innerHTML = `
+                        <div class="text-center text-danger">
+                            <i class="bi bi-exclamation-triangle me-2"></i>
+                            Error loading logs: ${response.error}
+                        </div>
+                    `;
+                }
+            })
+            .catch(error => {
+                document.getElementById('logContainer').innerHTML = `
+                    <div class="text-center text-danger">
+                        <i class="bi bi-exclamation-triangle me-2"></i>
+                        Error loading logs: ${error.message}
+                    </div>
+                `;
+            });
+    }
+    
+    function displayLogs(logs) {
+        const container = document.getElementById('logContainer');
+        
+        if (logs.length === 0) {
+            container.innerHTML = `
+                <div class="text-center text-muted">
+                    <i class="bi bi-info-circle me-2"></i>
+                    No log entries found with current filters
+                </div>
+            `;
+            return;
+        }
+        
+        let html = '';
+        logs.forEach((log, index) => {
+            const levelColor = {
+                'DEBUG': '#6c757d',
+                'INFO': '#17a2b8', 
+                'WARNING': '#ffc107',
+                'ERROR': '#dc3545',
+                'CRITICAL': '#721c24'
+            }[log.level] || '#fff';
+            
+            html += `
+                <div class="log-entry" data-index="${index}" style="margin-bottom: 2px; cursor: pointer; padding: 2px 0; border-left: 3px solid ${levelColor}; padding-left: 8px;" 
+                     onmouseover="this.style.backgroundColor='#333'"
+                     onmouseout="this.style.backgroundColor='transparent'"
+                     onclick="showLogDetails(${index})">
+                    <span style="color: #888; font-size: 0.8em;">${escapeLogHtml(log.timestamp)}</span>
+                    <span style="color: ${levelColor}; font-weight: bold; margin: 0 8px;">[${escapeLogHtml(log.level)}]</span>
+                    <span style="color: #aaa; font-size: 0.9em;">${escapeLogHtml(log.source)}:</span>
+                    <span style="color: #fff; margin-left: 4px;">${escapeLogHtml(log.message)}</span>
+                </div>
+            `;
+        });
+        
+        container.innerHTML = html;
+    }
+    
+    function showLogDetails(index) {
+        const log = logsData[index];
+        const detailsDiv = document.getElementById('logDetails');
+        const contentDiv = document.getElementById('logDetailsContent');
+        
+        contentDiv.textContent = log.full_entry;
+        detailsDiv.style.display = 'block';
+        
+        // Scroll to details
+        detailsDiv.scrollIntoView({ behavior: 'smooth' });
+    }
+    
+    function updateLogStats(total, filtered) {
+        document.getElementById('logStats').textContent = `Lines: ${total} | Filtered: ${filtered}`;
+    }
+    
+    function updateLastLogUpdate() {
+        const now = new Date().toLocaleTimeString();
+        document.getElementById('lastLogUpdate').textContent = `Last updated: ${now}`;
+    }
+    
+    function stopLogsAutoRefresh() {
+        if (logsEventSource) {
+            logsEventSource.close();
+            logsEventSource = null;
+        }
+    }
+
+    function setupLogsAutoRefresh() {
+        const autoRefreshCheckbox = document.getElementById('autoRefresh');
+        stopLogsAutoRefresh();
+        
+        if (autoRefreshCheckbox.checked) {
+            // Tail new records over SSE instead of re-polling the whole buffer
+            const params = new URLSearchParams({
+                level: document.getElementById('logLevelFilter').value || '',
+                search: document.getElementById('logSearch').value || '',
+                after: logsData.length ? logsData[0].seq : ''
+            });
+            logsEventSource = new EventSource(`/logs/stream?${params}`);
+            logsEventSource.onmessage = event => {
+                const maxLines = parseInt(document.getElementById('logLines').value || '100', 10);
+                logsData.unshift(JSON.parse(event.data));
+                logsData = logsData.slice(0, maxLines);
+                displayLogs(logsData);
+                updateLogStats(logsData.length, logsData.length);
+                updateLastLogUpdate();
+            };
+        }
+    }
+    
+    // Event listeners for logs tab
+    document.getElementById('refreshLogsBtn').addEventListener('click', loadLogs);
+    document.getElementById('autoRefresh').addEventListener('change', setupLogsAutoRefresh);
+    // Filter changes reload the snapshot and restart the tail with the new filters
+    const reloadLogs = () => { stopLogsAutoRefresh(); loadLogs(); };
+    document.getElementById('logLevelFilter').addEventListener('change', reloadLogs);
+    document.getElementById('logLines').addEventListener('change', reloadLogs);
+    document.getElementById('logSearch').addEventListener('input', debounce(reloadLogs, 500));
+    document.getElementById('scrollToTop').addEventListener('click', () => {
+        document.getElementById('logContainer').scrollTop = 0;
+    });
+    document.getElementById('scrollToBottom').addEventListener('click', () => {
+        const container = document.getElementById('logContainer');
+        container.scrollTop = container.scrollHeight;
+    });
+    document.getElementById('clearLogsBtn').addEventListener('click', () => {
+        document.getElementById('logContainer').innerHTML = `
+            <div class="text-center text-muted">
+                <i class="bi bi-info-circle me-2"></i>
+                Logs cleared. Click refresh to reload.
+            </div>
+        `;
+        logsData = [];
+        updateLogStats(0, 0);
+    });
+    
+    // Load logs when logs tab is shown
+    document.getElementById('logs-tab').addEventListener('shown.bs.tab', function() {
+        loadLogs();
+    });
+    
+    // Stop auto-refresh when leaving logs tab
+    document.getElementById('logs-tab').addEventListener('hidden.bs.tab', function() {
+        stopLogsAutoRefresh();
+    });
+    
+    // Debounce function for search input
+    function debounce(func, wait) {
+        let timeout;
+        return function executedFunction(...args) {
+            const later = () => {
+                clearTimeout(timeout);
+                func(...args);
+            };
+            clearTimeout(timeout);
+            timeout = setTimeout(later, wait);
+        };
+    }
+
+    // Sorting functions for Roles table (declared in roles section)
+
+    window.sortRolesTable = function(field) {
+        if (rolesSortField === field) {
+            rolesSortDirection = rolesSortDirection === 'asc' ? 'desc' : 'asc';
+        } else {
+            rolesSortField = field;
+            rolesSortDirection = 'asc';
+        }
+
+        // Update sort icons
+        document.querySelectorAll('[id^="sort-roles-"]').forEach(icon => {
+            icon.className = 'bi bi-arrow-down-up';
+        });
+        const currentIcon = document.getElementById(`sort-roles-${field}`);
+        if (currentIcon) {
+            currentIcon.className = rolesSortDirection === 'asc' ? 'bi bi-arrow-up' : 'bi bi-arrow-down';
+        }
+
+        // Re-run the query; the worker sorts the filtered rows
+        applyRolesFilters();
+    };
+});
@@ -0,0 +1,104 @@
+// Filters and sorts the users, roles and privileges tables off the main thread.
+//
+// Messages:
+//   {type: 'load', table, rows}                  keep a copy of the table's rows
+//   {type: 'query', id, table, filters, sort}    reply {id, indices} with the
+//       indices of matching rows in sort order (a transferred Uint32Array)
+
+'use strict';
+
+const SYSTEM_ROLES = new Set(['ACCOUNTADMIN', 'SECURITYADMIN', 'SYSADMIN', 'PUBLIC', 'USERADMIN', 'ORGADMIN']);
+
+const lower = value => (value || '').toLowerCase();
+
+// Lower-cased text each table's search box matches against, built once per load
+const SEARCH_TEXT = {
+    users: user => [user.name, user.login_name, user.display_name, user.email].map(lower).join('\n'),
+    roles: role => [role.name, role.comment, role.owner].map(lower).join('\n'),
+};
+
+const FILTERS = {
+    users(user, f) {
+        if (f.status === 'active' && (user.disabled || user.snowflake_lock)) return false;
+        if (f.status === 'disabled' && !user.disabled) return false;
+        if (f.status === 'locked' && !user.snowflake_lock) return false;
+        if (f.keys === 'has_keys' && !user.has_rsa_public_key) return false;
+        if (f.keys === 'no_keys' && user.has_rsa_public_key) return false;
+        if (f.auth === 'mfa' && !user.has_mfa) return false;
+        if (f.auth === 'password' && !user.has_password) return false;
+        if (f.auth === 'sso_only' && user.has_password) return false;
+        return true;
+    },
+    roles(role, f) {
+        if (f.type === 'system') return SYSTEM_ROLES.has(role.name);
+        if (f.type === 'custom') return !SYSTEM_ROLES.has(role.name);
+        if (f.type === 'current') return Boolean(role.is_current);
+        if (f.type === 'inherited') return Boolean(role.is_inherited);
+        return true;
+    },
+    privileges(priv, f) {
+        if (f.privilege && priv.privilege !== f.privilege) return false;
+        const objectName = lower(priv.name);
+        if (f.db && !objectName.includes(f.db.toLowerCase())) return false;
+        if (f.schema && f.db && !objectName.includes(`${f.db}.${f.schema}`.toLowerCase())) return false;
+        return true;
+    },
+};
+
+const SORT_KEYS = {
+    users: {
+        name: u => u.name || '',
+        display_name: u => u.display_name || '',
+        status: u => u.disabled ? 'disabled' : u.snowflake_lock ? 'locked' : u.must_change_password ? 'must_change' : 'active',
+        rsa_keys: u => u.has_rsa_public_key ? 1 : 0,
+    },
+    roles: {
+        name: r => r.name || '',
+        type: r => SYSTEM_ROLES.has(r.name) ? 'System' : 'Custom',
+        assigned_to_users: r => parseInt(r.assigned_to_users) || 0,
+        granted_roles: r => parseInt(r.granted_roles) || 0,
+        owner: r => r.owner || '',
+        created_on: r => new Date(r.created_on || 0).getTime(),
+    },
+};
+
+const datasets = {};
+
+function load(table, rows) {
+    const searchText = SEARCH_TEXT[table];
+    datasets[table] = { rows, search: searchText ? rows.map(searchText) : null };
+}
+
+function query({ table, filters = {}, sort }) {
+    const dataset = datasets[table] || { rows: [], search: null };
+    const { rows, search } = dataset;
+    const filter = FILTERS[table];
+    const term = search && filters.search ? filters.search.toLowerCase() : '';
+
+    const indices = [];
+    for (let i = 0; i < rows.length; i++) {
+        if (term && !search[i].includes(term)) continue;
+        if (filter && !filter(rows[i], filters)) continue;
+        indices.push(i);
+    }
+
+    const keyOf = sort && SORT_KEYS[table] && SORT_KEYS[table][sort.field];
+    if (keyOf) {
+        // Compute each key once rather than on every comparison
+        const keys = new Array(rows.length);
+        for (const i of indices) keys[i] = keyOf(rows[i]);
+        const dir = sort.direction === 'desc' ? -1 : 1;
+        // Array sort is stable, so equal keys keep their original order
+        indices.sort((a, b) => (keys[a] < keys[b] ? -dir : keys[a] > keys[b] ? dir : 0));
+    }
+    return Uint32Array.from(indices);
+}
+
+self.onmessage = ({ data }) => {
+    if (data.type === 'load') {
+        load(data.table, data.rows);
+    } else if (data.type === 'query') {
+        const indices = query(data);
+        self.postMessage({ id: data.id, indices }, [indices.buffer]);
+    }
+};
@@ -0,0 +1,121 @@
+// Windowed table rendering and off-main-thread filtering for the large tables.
+//
+// VirtualTable keeps only the rows near the visible part of a scrollable
+// container in the DOM; spacer rows above and below stand in for the rest.
+// TableWorkerClient sends the data to table-worker.js once and then asks it
+// for the indices of the rows that match a filter, in sort order.
+
+(function () {
+    'use strict';
+
+    const workerUrl = document.currentScript.dataset.worker;
+
+    class VirtualTable {
+        constructor(container, body, { colspan, renderRow, rowHeight = 45, overscan = 10 }) {
+            this.container = container;
+            this.body = body;
+            this.colspan = colspan;
+            this.renderRow = renderRow;
+            this.rowHeight = rowHeight;  // estimate until rows have been measured
+            this.overscan = overscan;
+            this.rows = [];
+            this.first = -1;
+            this.last = -1;
+            this.frame = 0;
+
+            container.classList.add('virtual-scroll');
+            container.addEventListener('scroll', () => this.schedule(), { passive: true });
+            // Re-render when a hidden container (collapsed section, inactive tab) becomes visible
+            if (window.ResizeObserver) {
+                new ResizeObserver(() => this.schedule(true)).observe(container);
+            }
+        }
+
+        setRows(rows) {
+            this.rows = rows;
+            this.container.scrollTop = 0;
+            this.render(true);
+        }
+
+        showMessage(html) {
+            this.rows = [];
+            this.first = this.last = -1;
+            this.body.innerHTML = html;
+        }
+
+        schedule(force = false) {
+            if (this.frame) return;
+            this.frame = requestAnimationFrame(() => {
+                this.frame = 0;
+                this.render(force);
+            });
+        }
+
+        render(force = false) {
+            const total = this.rows.length;
+            if (!total) return;
+            const viewport = this.container.clientHeight || window.innerHeight;
+            // Start on an even row so the striped-row colours do not flip while scrolling
+            let first = Math.max(0, Math.floor(this.container.scrollTop / this.rowHeight) - this.overscan);
+            first -= first % 2;
+            const last = Math.min(total, first + Math.ceil(viewport / this.rowHeight) + 2 * this.overscan);
+            if (!force && first === this.first && last === this.last) return;
+            this.first = first;
+            this.last = last;
+
+            const spacer = height => `<tr class="virtual-spacer" aria-hidden="true"><td colspan="${this.colspan}" style="height: ${height}px"></td></tr>`;
+            // Two top spacers keep the first rendered row in an odd nth-of-type position, like row 0
+            const html = [spacer(first * this.rowHeight), spacer(0)];
+            for (let i = first; i < last; i++) {
+                html.push(this.renderRow(this.rows[i], i));
+            }
+            html.push(spacer((total - last) * this.rowHeight));
+            this.body.innerHTML = html.join('');
+
+            const rendered = this.body.querySelectorAll('tr:not(.virtual-spacer)');
+            if (rendered.length) {
+                let height = 0;
+                rendered.forEach(tr => { height += tr.offsetHeight; });
+                if (height) this.rowHeight = height / rendered.length;
+            }
+        }
+    }
+
+    class TableWorkerClient {
+        constructor(url) {
+            this.worker = new Worker(url);
+            this.nextId = 1;
+            this.pending = new Map();
+            this.latest = {};
+            this.worker.onmessage = ({ data }) => {
+                const entry = this.pending.get(data.id);
+                if (!entry) return;
+                this.pending.delete(data.id);
+                // A newer query for the same table makes this answer irrelevant
+                entry.resolve(this.latest[entry.table] === data.id ? data.indices : null);
+            };
+            this.worker.onerror = event => {
+                const error = new Error(event.message || 'Table worker failed');
+                this.pending.forEach(entry => entry.reject(error));
+                this.pending.clear();
+            };
+        }
+
+        load(table, rows) {
+            this.worker.postMessage({ type: 'load', table, rows });
+        }
+
+        // Resolves to a Uint32Array of matching row indices, or null if superseded
+        query(table, filters = {}, sort = null) {
+            const id = this.nextId++;
+            this.latest[table] = id;
+            return new Promise((resolve, reject) => {
+                this.pending.set(id, { table, resolve, reject });
+                this.worker.postMessage({ type: 'query', id, table, filters, sort });
+            });
+        }
+    }
+
+    window.VirtualTable = VirtualTable;
+    window.tableWorker = new TableWorkerClient(workerUrl);
+})();
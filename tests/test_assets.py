@@ -0,0 +1,91 @@
+import gzip
+import os
+import re
+from importlib import reload
+
+import pytest
+
+import app as flask_app
+from backend.assets import IMMUTABLE_CACHE_CONTROL, AssetManifest
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    reload(flask_app)
+    flask_app.app.config['TESTING'] = True
+
+    import backend.oauth as oauth
+    monkeypatch.setattr(oauth, 'authenticated', lambda: False)
+    return flask_app.app.test_client()
+
+
+def test_index_links_hashed_assets(client):
+    html = client.get('/').get_data(as_text=True)
+    urls = re.findall(r'/assets/(?:css/app|js/app)\.[0-9a-f]{12}\.(?:css|js)', html)
+    assert len(urls) == 2
+    assert 'const initialAuth = false;' in html
+    assert '<style>' not in html
+
+
+def test_asset_is_immutable_and_precompressed(client):
+    url = flask_app.asset_manifest.url('js/app.js')
+    plain = client.get(url)
+    assert plain.status_code == 200
+    assert plain.headers['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    zipped = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(zipped.data) == plain.data
+    assert len(zipped.data) < len(plain.data)
+
+    etag = plain.headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    # A cached gzip body must not validate an identity request, or the reverse
+    assert zipped.headers['ETag'] != etag
+    assert client.get(url, headers={'If-None-Match': zipped.headers['ETag']}).status_code == 200
+    revalidated = client.get(url, headers={'If-None-Match': zipped.headers['ETag'], 'Accept-Encoding': 'gzip'})
+    assert revalidated.status_code == 304
+
+
+def test_unknown_or_stale_hash_is_404(client):
+    assert client.get('/assets/js/app.000000000000.js').status_code == 404
+
+
+def test_auto_reload_picks_up_changes(tmp_path):
+    (tmp_path / 'site.css').write_text('body { color: red; }')
+    manifest = AssetManifest(str(tmp_path), auto_reload=True)
+    before = manifest.url('site.css')
+
+    css = tmp_path / 'site.css'
+    css.write_text('body { color: blue; }')
+    os.utime(css, (0, 0))
+    after = manifest.url('site.css')
+    assert after != before
+    assert manifest.by_url(before[len('/assets/'):]) is None
+
+
+def test_index_render_is_cached_per_variant(client, monkeypatch):
+    renders = []
+    real_render = flask_app.render_template
+    monkeypatch.setattr(flask_app, 'render_template', lambda *a, **kw: renders.append(kw) or real_render(*a, **kw))
+
+    first = client.get('/')
+    second = client.get('/')
+    assert first.data == second.data
+    assert len(renders) == 1
+    assert first.headers['Cache-Control'] == 'no-cache'
+    assert client.get('/', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    import backend.oauth as oauth
+    monkeypatch.setattr(oauth, 'authenticated', lambda: True)
+    authed = client.get('/')
+    assert b'const initialAuth = true;' in authed.data
+    assert authed.headers['ETag'] != first.headers['ETag']
+    assert len(renders) == 2
+
+    # A reloaded template replaces the cached pages
+    flask_app.app.jinja_env.cache.clear()
+    client.get('/')
+    assert len(renders) == 3
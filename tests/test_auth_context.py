@@ -0,0 +1,73 @@
+import time
+
+import jwt
+import pytest
+from importlib import reload
+
+import app as flask_app
+
+
+@pytest.fixture()
+def oauth(monkeypatch):
+    reload(flask_app)
+    flask_app.app.config['TESTING'] = True
+
+    import backend.oauth as oauth
+    oauth._identity_cache.clear()
+    decodes = []
+    real_decode = oauth._decode_identity
+
+    def counting_decode(token):
+        decodes.append(token)
+        return real_decode(token)
+
+    monkeypatch.setattr(oauth, '_decode_identity', counting_decode)
+    oauth.decodes = decodes
+    return oauth
+
+
+def _token(**claims):
+    return jwt.encode({'sub': 'ACCT.JDOE', 'scope': 'session:role:SYSADMIN', **claims}, 'k' * 32, algorithm='HS256')
+
+
+def test_request_validates_and_decodes_once(oauth, monkeypatch):
+    refreshes = []
+    monkeypatch.setattr(oauth, 'refresh_token', lambda: refreshes.append(1) or False)
+
+    with flask_app.app.test_request_context('/auth/userinfo'):
+        flask_app.session[oauth.TOKEN_KEY] = _token()
+        flask_app.session[oauth.EXP_KEY] = 0  # expired: every uncached check would try a refresh
+        assert not oauth.authenticated()
+        assert oauth.get_access_token() is None
+        assert len(refreshes) == 1
+
+        assert oauth.current_identity() == {'user': 'JDOE', 'role': 'SYSADMIN'}
+        assert oauth.current_identity()['user'] == 'JDOE'
+    assert len(oauth.decodes) == 1
+
+    # A later request with the same token reuses the memoised identity
+    with flask_app.app.test_request_context('/auth/status'):
+        flask_app.session[oauth.TOKEN_KEY] = oauth.decodes[0]
+        assert oauth.current_identity()['role'] == 'SYSADMIN'
+    assert len(oauth.decodes) == 1
+
+
+def test_identity_memo_expires_with_token(oauth):
+    token = _token(exp=int(time.time()) - 1)
+    with flask_app.app.test_request_context('/'):
+        flask_app.session[oauth.TOKEN_KEY] = token
+        oauth.current_identity()
+    with flask_app.app.test_request_context('/'):
+        flask_app.session[oauth.TOKEN_KEY] = token
+        oauth.current_identity()
+    assert len(oauth.decodes) == 2
+
+
+def test_logout_clears_request_context(oauth):
+    with flask_app.app.test_request_context('/'):
+        flask_app.session[oauth.TOKEN_KEY] = 'tok'
+        flask_app.session[oauth.EXP_KEY] = time.time() + 60
+        assert oauth.authenticated()
+        oauth.logout()
+        assert not oauth.authenticated()
+        assert oauth.current_identity() is None
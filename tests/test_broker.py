@@ -0,0 +1,78 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+from backend import deadline
+from backend.broker import BrokerClient, BrokerError, BrokerServer
+
+
+class _FakeClient:
+    def __init__(self):
+        self._conn = None
+        self.connected_with = None
+
+    def connect(self, **params):
+        self._conn = object()
+        self.connected_with = params
+
+    def list_roles_detailed(self):
+        return [{'name': 'DEV', 'created_on': datetime.datetime(2024, 1, 2, 3, 4, 5)}]
+
+    def plan_grant(self, perm_type, db, schema, role):
+        raise ValueError(f"Unknown permission type: {perm_type}")
+
+    def list_databases(self):
+        raise LookupError("boom")
+
+
+@pytest.fixture()
+def broker(tmp_path):
+    fake = _FakeClient()
+    server = BrokerServer(str(tmp_path / "broker.sock"), fake)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield fake, BrokerClient(server.server_address)
+    server.shutdown()
+    server.server_close()
+
+
+def test_calls_round_trip_through_the_broker(broker):
+    fake, client = broker
+    assert client._conn is None
+    client.connect(pat='tok', account='acct', user='u', warehouse='WH', role='SYSADMIN')
+    assert fake.connected_with['pat'] == 'tok'
+    assert client._conn
+
+    # Datetimes survive the wire format
+    assert client.list_roles_detailed() == fake.list_roles_detailed()
+
+
+def test_errors_and_unknown_methods(broker):
+    _, client = broker
+    with pytest.raises(ValueError, match="Unknown permission type"):
+        client.plan_grant('bogus', 'DB', None, 'DEV')
+    with pytest.raises(BrokerError) as exc:
+        client.list_databases()
+    assert exc.value.type_name == 'LookupError'
+    with pytest.raises(AttributeError):
+        client.close()
+
+
+
+def test_deadline_is_carried_to_the_broker(broker):
+    fake, client = broker
+    fake.list_warehouses = lambda: [deadline.current() and deadline.current().remaining()]
+    assert client.list_warehouses() == [None]
+    with deadline.activate(deadline.Deadline(20)):
+        assert 19 < client.list_warehouses()[0] <= 20
+
+    def slow():
+        deadline.current().expires_at = time.monotonic()
+        deadline.current().check()
+
+    fake.list_warehouses = slow
+    with deadline.activate(deadline.Deadline(20)):
+        with pytest.raises(deadline.DeadlineExceeded):
+            client.list_warehouses()
@@ -0,0 +1,187 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+import backend.snowflake_client as sfc
+
+from backend.cache_store import SQLiteCacheStore
+from backend.snowflake_client import SnowflakeClient
+
+
+def test_round_trip_and_expiry(tmp_path):
+    store = SQLiteCacheStore(str(tmp_path / "cache.db"), ttl=60)
+    created = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    store.put("roles_detailed", [{"name": "DEV", "created_on": created}])
+    store.put("databases", ["A"], stored_at=time.time() - 120)
+
+    entries = store.load_valid()
+    assert list(entries) == ["roles_detailed"]
+    assert entries["roles_detailed"][1] == [{"name": "DEV", "created_on": created}]
+
+
+def test_size_limit_evicts_oldest(tmp_path):
+    store = SQLiteCacheStore(str(tmp_path / "cache.db"), max_entries=2)
+    store.put("a", 1, stored_at=time.time() - 3)
+    store.put("b", 2, stored_at=time.time() - 2)
+    store.put("c", 3)
+    assert sorted(store.load_valid()) == ["b", "c"]
+
+
+def test_client_restores_entries(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteCacheStore(path).put("users", [{"name": "JDOE"}])
+
+    client = SnowflakeClient()
+    assert client.attach_store(SQLiteCacheStore(path)) == 1
+    # Served from the restored entry without a connection
+    assert client.list_users_with_keys_optimized() == [{"name": "JDOE"}]
+    assert client.get_user_details("JDOE") == {"name": "JDOE"}
+
+    client.clear_users_cache()
+    assert SQLiteCacheStore(path).load_valid() == {}
+
+
+def test_shared_store_across_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(sfc, "SHARED_CHECK_SECONDS", 0)
+    path = str(tmp_path / "cache.db")
+    worker_a, worker_b = SnowflakeClient(), SnowflakeClient()
+    worker_a.attach_store(SQLiteCacheStore(path), shared=True)
+    worker_b.attach_store(SQLiteCacheStore(path), shared=True)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return ["DEV"]
+
+    assert worker_a._cached("roles_detailed", load) == ["DEV"]
+    # Read through the shared store instead of querying again
+    assert worker_b._cached("roles_detailed", load) == ["DEV"]
+    assert len(calls) == 1
+
+    # An invalidation in one worker is seen by the other
+    worker_a.invalidate_cache("roles_detailed")
+    assert worker_b._cached("roles_detailed", load) == ["DEV"]
+    assert len(calls) == 2
+
+
+def test_cache_hits_check_the_shared_store_at_most_once_per_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(sfc, "SHARED_CHECK_SECONDS", 60)
+    path = str(tmp_path / "cache.db")
+    worker_a, worker_b = SnowflakeClient(), SnowflakeClient()
+    worker_a.attach_store(SQLiteCacheStore(path), shared=True)
+    worker_b.attach_store(SQLiteCacheStore(path), shared=True)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return ["DEV"]
+
+    assert worker_b._cached("roles_detailed", load) == ["DEV"]
+    checks = []
+    original = worker_b._store.written_at
+    monkeypatch.setattr(worker_b._store, "written_at", lambda key: checks.append(key) or original(key))
+    worker_a.invalidate_cache("roles_detailed")
+    for _ in range(5):
+        assert worker_b._cached("roles_detailed", load) == ["DEV"]
+    assert checks == [] and len(calls) == 1
+
+    # Once the interval has passed the invalidation is picked up
+    worker_b._shared_checked["roles_detailed"] -= 60
+    assert worker_b._cached("roles_detailed", load) == ["DEV"]
+    assert checks == ["roles_detailed"] and len(calls) == 2
+
+
+def test_shared_store_lease_makes_others_wait(tmp_path):
+    path = str(tmp_path / "cache.db")
+    holder = SQLiteCacheStore(path)
+    worker = SnowflakeClient()
+    worker.attach_store(SQLiteCacheStore(path), shared=True)
+    assert holder.try_lease("warehouses", 5)
+    assert not holder.try_lease("warehouses", 5)
+
+    # The lease holder publishes while the worker is waiting
+    threading.Timer(0.1, holder.put, args=("warehouses", ["WH"])).start()
+    assert worker._cached("warehouses", lambda: pytest.fail("should wait for the lease holder")) == ["WH"]
+    holder.release_lease("warehouses")
+    assert holder.try_lease("warehouses", 5)
+
+
+def test_concurrent_misses_share_one_load():
+    client = SnowflakeClient()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(timeout=5)
+        return ["DEV"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client._cached("roles_detailed", load)))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    deadline = time.time() + 5
+    while client.singleflight_stats()["collapsed"] < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == [["DEV"]] * 4
+    assert len(calls) == 1
+    assert client.singleflight_stats() == {"executions": 1, "collapsed": 3, "in_flight": 0}
+
+
+def test_singleflight_shares_errors_and_skips_flights_older_than_invalidation():
+    client = SnowflakeClient()
+    started, release = threading.Event(), threading.Event()
+    outcomes = []
+
+    def failing():
+        started.set()
+        release.wait(timeout=5)
+        raise RuntimeError("warehouse suspended")
+
+    def call(fn):
+        try:
+            outcomes.append(client._singleflight("sql:SHOW ROLES", fn, "test"))
+        except RuntimeError as e:
+            outcomes.append(str(e))
+
+    leader = threading.Thread(target=call, args=(failing,))
+    leader.start()
+    assert started.wait(timeout=5)
+    follower = threading.Thread(target=call, args=(lambda: "unused",))
+    follower.start()
+    deadline = time.time() + 5
+    while client.singleflight_stats()["collapsed"] < 1 and time.time() < deadline:
+        time.sleep(0.01)
+
+    # After an invalidation a new caller runs its own query instead of joining
+    client.invalidate_cache("roles")
+    call(lambda: "fresh")
+    release.set()
+    leader.join()
+    follower.join()
+    assert sorted(outcomes) == ["fresh", "warehouse suspended", "warehouse suspended"]
+
+
+def test_invalidate_role_drops_only_that_role(tmp_path):
+    client = SnowflakeClient()
+    store = SQLiteCacheStore(str(tmp_path / "cache.db"))
+    client.attach_store(store)
+    for role in ("ADMIN", "ADMIN2", "ADMIN_RO"):
+        client._set_cached(f"role_privileges:{role}", [role])
+        client._set_cached(f"role_details:{role}", {"role": role})
+    generation = client._flight_generation
+
+    client.invalidate_role("admin")
+    assert sorted(client._cache) == [
+        "role_details:ADMIN2", "role_details:ADMIN_RO", "role_privileges:ADMIN2", "role_privileges:ADMIN_RO",
+    ]
+    assert sorted(store.load_valid()) == sorted(client._cache)
+    # Running loads of other roles can still be joined
+    assert client._flight_generation == generation
@@ -0,0 +1,118 @@
+import json
+import time
+
+import pytest
+import app as flask_app
+import backend.snowflake_client as sfc
+
+from importlib import reload
+
+from backend.change_feed import MemoryChangeFeed, SQLiteChangeFeed
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    reload(flask_app)
+    flask_app.app.config['TESTING'] = True
+
+    monkeypatch.setattr(sfc.client, 'call_stored_procedure', lambda proc, args: {'success': True})
+    monkeypatch.setattr(sfc.client, 'clear_users_cache', lambda: None)
+
+    import backend.oauth as oauth
+    monkeypatch.setattr(oauth, 'authenticated', lambda: True)
+    monkeypatch.setattr(oauth, 'get_access_token', lambda: 'dummy-token')
+    return flask_app.app.test_client()
+
+
+def _feed(kind, tmp_path, capacity):
+    if kind == 'memory':
+        return MemoryChangeFeed(capacity=capacity)
+    return SQLiteChangeFeed(str(tmp_path / 'changes.db'), capacity=capacity)
+
+
+@pytest.mark.parametrize('kind', ['memory', 'sqlite'])
+def test_since_returns_newer_events_in_order(kind, tmp_path):
+    feed = _feed(kind, tmp_path, capacity=10)
+    assert feed.last_seq == 0
+    assert feed.since(0) == []
+    feed.publish('user', name='ALICE', changes={'snowflake_lock': False})
+    feed.publish('role_grants', role='ANALYST')
+
+    events = feed.since(0)
+    assert [(e['seq'], e['kind']) for e in events] == [(1, 'user'), (2, 'role_grants')]
+    assert events[0]['changes'] == {'snowflake_lock': False}
+    assert [e['seq'] for e in feed.since(1)] == [2]
+    assert feed.wait_for(1, timeout=0) is True
+    assert feed.wait_for(2, timeout=0) is False
+
+
+@pytest.mark.parametrize('kind', ['memory', 'sqlite'])
+def test_readers_behind_the_retained_window_are_told_to_resync(kind, tmp_path):
+    feed = _feed(kind, tmp_path, capacity=2)
+    for name in ('A', 'B', 'C'):
+        feed.publish('user', name=name)
+
+    assert [e['name'] for e in feed.since(1)] == ['B', 'C']
+    # Event 1 was dropped, and seq 7 was never issued by this feed (e.g. before a restart)
+    for after in (0, 7):
+        events = feed.since(after)
+        assert [(e['seq'], e['kind']) for e in events] == [(3, 'resync')]
+
+
+def test_sqlite_feed_is_shared_between_handles(tmp_path):
+    path = str(tmp_path / 'changes.db')
+    writer, reader = SQLiteChangeFeed(path), SQLiteChangeFeed(path)
+    writer.publish('role_grants', role='ANALYST', action='granted')
+    assert reader.last_seq == 1
+    assert reader.since(0)[0]['role'] == 'ANALYST'
+
+
+def test_unlock_is_streamed_to_open_tabs(client):
+    assert client.post('/users/ALICE/unlock').status_code == 200
+
+    r = client.get('/events/stream', headers={'Last-Event-ID': '0'})
+    assert r.mimetype == 'text/event-stream'
+    chunk = next(r.response)
+    r.close()
+    chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+    assert chunk.startswith('id: 1\n')
+    event = json.loads(chunk.split('data: ', 1)[1])
+    assert event['kind'] == 'user'
+    assert event['name'] == 'ALICE'
+    assert event['changes'] == {'snowflake_lock': False}
+
+
+def test_streams_are_capped_per_worker(client, monkeypatch):
+    monkeypatch.setattr(flask_app, 'SSE_MAX_STREAMS', 1)
+    monkeypatch.setattr(flask_app, 'SSE_KEEPALIVE_SECONDS', 0.01)
+    first = client.get('/events/stream')
+    busy = client.get('/events/stream')
+    assert busy.get_data(as_text=True) == f'retry: {flask_app.SSE_BUSY_RETRY_MS}\n\n'
+    first.close()
+    again = client.get('/events/stream')
+    assert again.is_streamed
+    again.close()
+
+
+def test_stream_ends_when_session_is_gone_or_time_is_up(client, monkeypatch):
+    monkeypatch.setattr(flask_app, 'SSE_KEEPALIVE_SECONDS', 0.01)
+    # The test session holds no OAuth token, so the first keep-alive check ends the stream
+    with client.get('/events/stream') as r:
+        assert r.get_data(as_text=True) == ''
+
+    monkeypatch.setattr(flask_app, '_stream_session_valid', lambda: True)
+    monkeypatch.setattr(flask_app, 'SSE_MAX_SECONDS', 0.05)
+    with client.get('/events/stream') as r:
+        assert r.get_data(as_text=True).startswith(': keep-alive\n\n')
+    assert flask_app._sse_open == 0
+
+
+def test_streams_do_not_count_as_activity(client, monkeypatch):
+    monkeypatch.setattr(flask_app, 'SSE_KEEPALIVE_SECONDS', 0.01)
+    idle_since = time.time() - 60
+    with client.session_transaction() as sess:
+        sess['last_activity'] = idle_since
+    r = client.get('/events/stream', headers={'Last-Event-ID': '0'})
+    r.close()
+    with client.session_transaction() as sess:
+        assert sess['last_activity'] == idle_since
@@ -0,0 +1,151 @@
+import inspect
+import os
+import socket
+import sys
+import threading
+import time
+from unittest import mock
+
+import pytest
+import app as flask_app
+import backend.snowflake_client as sfc
+
+from importlib import reload
+
+from backend import deadline
+from backend.deadline import Deadline, DeadlineExceeded
+from backend.snowflake_client import _InstrumentedCursor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+import fake_snowflake  # noqa: E402
+
+
+class _SlowConnection:
+    is_pyformat = True
+
+    def __init__(self):
+        self.aborted = threading.Event()
+        self.cancel_requests = []
+
+    def _cancel_query(self, sql, request_id):
+        self.cancel_requests.append((sql, request_id))
+        self.aborted.set()
+
+
+class _SlowCursor:
+    """Blocks in execute() until the statement is aborted, like a long view scan."""
+
+    def __init__(self):
+        self.connection = _SlowConnection()
+        self.executed = []
+
+    def execute(self, sql, params=None, timeout=None):
+        self._request_id = 'req-1'
+        self.executed.append((sql, params, timeout))
+        if sql.startswith('SELECT'):
+            if not self.connection.aborted.wait(timeout=5):
+                raise AssertionError('statement was not aborted')
+            raise RuntimeError('000604: SQL execution canceled')
+        return self
+
+
+def test_statements_get_the_remaining_budget_as_timeout():
+    cur = _SlowCursor()
+    with deadline.activate(Deadline(7.5)):
+        _InstrumentedCursor(cur, 'call_stored_procedure').callproc('DB.S.SP_UNLOCK', ['ALICE'])
+    assert cur.executed == [('CALL DB.S.SP_UNLOCK(%s)', ['ALICE'], 8)]
+
+    # Without a deadline nothing is added; with a spent one nothing is sent
+    _InstrumentedCursor(cur, 'list_databases').execute('SHOW DATABASES')
+    assert cur.executed[-1] == ('SHOW DATABASES', None, None)
+    with deadline.activate(Deadline(0)):
+        with pytest.raises(DeadlineExceeded):
+            _InstrumentedCursor(cur, 'list_databases').execute('SHOW DATABASES')
+    assert len(cur.executed) == 2
+
+
+def test_callproc_uses_the_connection_paramstyle():
+    cur = _SlowCursor()
+    cur.connection.is_pyformat = False
+    _InstrumentedCursor(cur, 'call_stored_procedure').callproc('DB.S.SP_UNLOCK', ['ALICE', 2])
+    assert cur.executed == [('CALL DB.S.SP_UNLOCK(?, ?)', ['ALICE', 2], None)]
+
+
+def test_stored_procedures_run_on_the_benchmark_connection():
+    # benchmarks/load_test.py serves the app from this fake; it must keep up with the client
+    client = sfc.SnowflakeClient()
+    client._conn = fake_snowflake.FakeConnection()
+    with deadline.activate(Deadline(30)):
+        result = client.call_stored_procedure('DB.S.SP_UNLOCK', ['ALICE'])
+    assert result['rows'] == [('DB.S.SP_UNLOCK completed',)]
+
+
+def test_abort_matches_the_installed_connector():
+    connector = pytest.importorskip('snowflake.connector')
+    from snowflake.connector.cursor import SnowflakeCursor
+
+    # _abort uses these private connector details; a release that changes them must fail here
+    assert sfc._abort_supported(), connector.__version__
+    params = list(inspect.signature(connector.SnowflakeConnection._cancel_query).parameters)
+    assert params == ['self', 'sql', 'request_id']
+    cursor = SnowflakeCursor(mock.MagicMock())
+    assert cursor._request_id is None
+    assert cursor.connection is not None
+    assert isinstance(connector.SnowflakeConnection.is_pyformat, property)
+
+
+def test_client_hang_up_aborts_the_running_statement():
+    cur = _SlowCursor()
+    client_end, server_end = socket.socketpair()
+    active = Deadline(30)
+    deadline.watch_disconnect(active, server_end)
+    errors = []
+
+    def request():
+        with deadline.activate(active):
+            try:
+                _InstrumentedCursor(cur, 'list_users_from_view').execute('SELECT * FROM V_USERS')
+            except DeadlineExceeded as e:
+                errors.append(str(e))
+
+    thread = threading.Thread(target=request)
+    thread.start()
+    time.sleep(0.3)
+    assert not cur.connection.aborted.is_set()  # an open, quiet client is left alone
+    client_end.close()
+    thread.join(timeout=5)
+    deadline.unwatch_disconnect(active)
+    server_end.close()
+
+    assert cur.connection.cancel_requests == [('SELECT * FROM V_USERS', 'req-1')]
+    assert errors == ['Request cancelled: client disconnected']
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    reload(flask_app)
+    flask_app.app.config['TESTING'] = True
+
+    import backend.oauth as oauth
+    monkeypatch.setattr(oauth, 'authenticated', lambda: True)
+    monkeypatch.setattr(oauth, 'get_access_token', lambda: 'dummy-token')
+    return flask_app.app.test_client()
+
+
+def test_routes_run_under_their_budget_and_time_out_with_504(client, monkeypatch):
+    budgets = []
+
+    def list_databases():
+        budgets.append(deadline.current().seconds)
+        deadline.current().expires_at = time.monotonic()
+        deadline.current().check()
+
+    monkeypatch.setattr(sfc.client, 'list_databases', list_databases)
+    monkeypatch.setattr(sfc.client, 'list_users', lambda: budgets.append(deadline.current().seconds) or [])
+
+    r = client.get('/databases')
+    assert r.status_code == 504
+    assert 'deadline' in r.get_json()['error']
+    assert client.get('/users').status_code == 200
+    assert budgets == [deadline.REQUEST_DEADLINE_SECONDS, deadline.SLOW_REQUEST_DEADLINE_SECONDS]
+    assert deadline.current() is None
@@ -0,0 +1,115 @@
+import pytest
+import app as flask_app
+import backend.snowflake_client as sfc
+
+from importlib import reload
+
+from backend.broker import BrokerServer
+from backend.cache_store import SQLiteCacheStore
+from backend.key_hygiene import KeyHygiene
+from backend.snowflake_client import SnowflakeClient
+
+
+def _user(name, **fields):
+    row = {'name': name, 'type': 'PERSON', 'has_rsa_public_key': False, 'has_password': False,
+           'has_mfa': False, 'disabled': False, 'snowflake_lock': False}
+    row.update(fields)
+    return row
+
+
+USERS = [
+    _user('ALICE', has_rsa_public_key=True, has_mfa=True),
+    _user('BOB', has_password=True, snowflake_lock=True),
+    _user('ETL', type='LEGACY_SERVICE', has_password=True),
+    _user('LOADER', type='SERVICE', has_rsa_public_key=True, disabled=True),
+]
+
+
+def test_counts_and_patch():
+    hygiene = KeyHygiene(USERS)
+    counts = hygiene.snapshot()
+    assert counts['total'] == 4
+    assert (counts['with_rsa_key'], counts['without_rsa_key']) == (2, 2)
+    assert (counts['with_mfa'], counts['with_password']) == (1, 2)
+    assert (counts['password_only'], counts['password_only_service']) == (2, 1)
+    assert (counts['disabled'], counts['locked']) == (1, 1)
+    assert counts['key_adoption_by_type'] == {
+        'LEGACY_SERVICE': {'users': 1, 'with_rsa_key': 0},
+        'PERSON': {'users': 2, 'with_rsa_key': 1},
+        'SERVICE': {'users': 1, 'with_rsa_key': 1},
+    }
+
+    assert hygiene.patch('ETL', {'has_rsa_public_key': True, 'has_password': False, 'not_a_field': 1})
+    assert not hygiene.patch('NOBODY', {'snowflake_lock': False})
+    counts = hygiene.snapshot()
+    assert (counts['with_rsa_key'], counts['password_only_service']) == (3, 0)
+    assert counts['key_adoption_by_type']['LEGACY_SERVICE'] == {'users': 1, 'with_rsa_key': 1}
+
+
+def test_patch_reaches_other_workers_through_shared_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(sfc, 'SHARED_CHECK_SECONDS', 0)
+    path = str(tmp_path / 'cache.db')
+    worker_a, worker_b = SnowflakeClient(), SnowflakeClient()
+    worker_a.attach_store(SQLiteCacheStore(path), shared=True)
+    worker_b.attach_store(SQLiteCacheStore(path), shared=True)
+    worker_a._set_cached('users', [dict(u) for u in USERS])
+    assert worker_b.key_hygiene()['locked'] == 1
+
+    assert worker_a.patch_cached_user('bob', {'snowflake_lock': False})
+    assert worker_a.key_hygiene()['locked'] == 0
+    assert worker_b.key_hygiene()['locked'] == 0
+    assert worker_b.get_user_details('BOB')['snowflake_lock'] is False
+
+
+def test_patch_replaces_rows_and_keeps_the_entry_age(tmp_path):
+    client = SnowflakeClient()
+    client._set_cached('users', [dict(u) for u in USERS])
+    stored_at, before = client._cache['users']
+    server = BrokerServer(str(tmp_path / 'broker.sock'), client)
+    stale_body = server.encoded('list_users_with_keys_optimized', [], {}, client.list_users_with_keys_optimized())
+
+    assert client.patch_cached_user('BOB', {'snowflake_lock': False})
+    after = client.list_users_with_keys_optimized()
+    assert client._cache['users'][0] == stored_at
+    assert after is not before
+    assert next(u for u in before if u['name'] == 'BOB')['snowflake_lock'] is True
+    # The broker re-encodes instead of serving the pre-patch body
+    body = server.encoded('list_users_with_keys_optimized', [], {}, after)
+    assert body != stale_body
+    assert next(u for u in after if u['name'] == 'BOB')['snowflake_lock'] is False
+    server.server_close()
+
+
+def test_patch_of_unknown_user_drops_listing():
+    client = SnowflakeClient()
+    assert not client.patch_cached_user('ALICE', {'snowflake_lock': False})  # nothing cached
+    client._set_cached('users', [dict(u) for u in USERS])
+    assert not client.patch_cached_user('NEWCOMER', {'snowflake_lock': False})
+    assert 'users' not in client._cache
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    reload(flask_app)
+    flask_app.app.config['TESTING'] = True
+
+    monkeypatch.setattr(sfc, 'client', SnowflakeClient())
+    monkeypatch.setattr(sfc.client, 'list_users_from_view', lambda: [dict(u) for u in USERS])
+    monkeypatch.setattr(sfc.client, 'call_stored_procedure', lambda proc, args: {'success': True})
+    monkeypatch.setattr(sfc.client, 'set_warehouse', lambda wh: None)
+
+    import backend.oauth as oauth
+    monkeypatch.setattr(oauth, 'authenticated', lambda: True)
+    monkeypatch.setattr(oauth, 'get_access_token', lambda: 'dummy-token')
+    return flask_app.app.test_client()
+
+
+def test_unlock_updates_hygiene_without_reloading(client, monkeypatch):
+    assert client.get('/keys/hygiene').get_json()['data']['locked'] == 1
+
+    def no_reload():
+        raise AssertionError('listing reloaded')
+
+    monkeypatch.setattr(sfc.client, 'list_users_from_view', no_reload)
+    assert client.post('/users/BOB/unlock').status_code == 200
+    assert client.get('/keys/hygiene').get_json()['data']['locked'] == 0
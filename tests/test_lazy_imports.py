@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_app_import_defers_heavy_dependencies():
+    # A fresh interpreter: this test process may already have imported them
+    code = (
+        "import sys, app\n"
+        "print(','.join(m for m in ('snowflake.connector', 'requests') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ''
@@ -0,0 +1,34 @@
+import logging
+
+from backend.log_buffer import RingBufferHandler
+
+
+def _logger(handler):
+    log = logging.getLogger('test-log-buffer')
+    log.handlers = [handler]
+    log.propagate = False
+    log.setLevel(logging.DEBUG)
+    return log
+
+
+def test_buffer_is_bounded_and_newest_first():
+    handler = RingBufferHandler(capacity=3)
+    log = _logger(handler)
+    for i in range(5):
+        log.info('message %d', i)
+    entries = handler.query(lines=10)
+    assert [e['message'] for e in entries] == ['message 4', 'message 3', 'message 2']
+    assert handler.stats()['retained'] == 3
+
+
+def test_level_search_and_after_filters():
+    handler = RingBufferHandler(capacity=10)
+    log = _logger(handler)
+    log.info('connected to Snowflake')
+    log.error('Connection timeout')
+    log.warning('slow query')
+    log.error('view query failed')
+
+    assert [e['message'] for e in handler.query(level='ERROR')] == ['view query failed', 'Connection timeout']
+    assert [e['message'] for e in handler.query(search='CONNECT')] == ['Connection timeout', 'connected to Snowflake']
+    assert [e['message'] for e in handler.query(after_seq=1)] == ['view query failed', 'slow query']
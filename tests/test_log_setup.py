@@ -0,0 +1,14 @@
+import logging
+
+from backend.log_setup import DebugSampler
+
+
+def _record(level):
+    return logging.LogRecord('t', level, __file__, 1, 'msg', None, None)
+
+
+def test_debug_sampler_keeps_one_in_n_debug_records():
+    sampler = DebugSampler(rate=3)
+    kept = [sampler.filter(_record(logging.DEBUG)) for _ in range(9)]
+    assert kept.count(True) == 3
+    assert all(sampler.filter(_record(logging.WARNING)) for _ in range(5))
@@ -1,4 +1,5 @@
 import json
+import threading
 from importlib import reload
 
 import pytest
@@ -48,6 +49,13 @@ def test_list_schemas_success(client):
     assert payload["data"] == ["MYDB_SC1", "MYDB_SC2"]
 
 
+def test_schema_tree(client):
+    sfc.client.invalidate_cache()
+    resp = client.get("/schemas/tree")
+    assert resp.status_code == 200
+    assert resp.get_json()["data"] == {"A": ["A_SC1", "A_SC2"], "B": ["B_SC1", "B_SC2"]}
+
+
 def test_list_roles(client):
     resp = client.get("/roles")
     assert resp.status_code == 200
@@ -64,4 +72,145 @@ def test_grant_permissions_read(client):
     }
     resp = client.post("/grant_permissions", data=json.dumps(payload), content_type="application/json")
     assert resp.status_code == 200
-    assert resp.get_json()["success"] is True 
\ No newline at end of file
+    assert resp.get_json()["success"] is True 
+
+def _held_privileges(role):
+    return [
+        {"privilege": "USAGE", "granted_on": "DATABASE", "name": "DB1"},
+        {"privilege": "USAGE", "granted_on": "SCHEMA", "name": "DB1.PUBLIC"},
+    ]
+
+
+def test_grant_permissions_dry_run(client, monkeypatch):
+    monkeypatch.setattr(sfc.client, "get_role_privileges", lambda role: [])
+    monkeypatch.setattr(sfc.client, "call_stored_procedure", lambda proc, args: pytest.fail("procedure called on dry run"))
+    sfc.client.invalidate_cache()
+    payload = {
+        "db": "DB1",
+        "schema": "PUBLIC",
+        "role": "DEV",
+        "perm_type": "read_grant_schema",
+        "warehouse": "TEST_WH",
+        "dry_run": True,
+    }
+    resp = client.post("/grant_permissions", data=json.dumps(payload), content_type="application/json")
+    assert resp.status_code == 200
+    plan = resp.get_json()["plan"]
+    assert plan["noop"] is False
+    assert {"privilege": "USAGE", "granted_on": "SCHEMA", "name": "DB1.PUBLIC"} in plan["changes"]
+
+
+def test_grant_permissions_calls_procedure_unless_asked_to_skip(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(sfc.client, "get_role_privileges", _held_privileges)
+    monkeypatch.setattr(sfc.client, "call_stored_procedure", lambda proc, args: calls.append(proc) or {"success": True})
+    sfc.client.invalidate_cache()
+    payload = {
+        "db": "DB1",
+        "schema": "PUBLIC",
+        "role": "DEV",
+        "perm_type": "read_grant_schema",
+        "warehouse": "TEST_WH",
+    }
+    # USAGE alone does not prove the table-level grants are in place
+    resp = client.post("/grant_permissions", data=json.dumps(payload), content_type="application/json")
+    assert resp.status_code == 200
+    assert "skipped" not in resp.get_json()
+    assert len(calls) == 1
+
+    payload["skip_if_satisfied"] = True
+    resp = client.post("/grant_permissions", data=json.dumps(payload), content_type="application/json")
+    data = resp.get_json()
+    assert data["success"] is True
+    assert data["skipped"] is True
+    assert len(calls) == 1
+
+
+def test_json_listing_revalidates_with_etag(client):
+    first = client.get('/roles')
+    etag = first.headers['ETag']
+    again = client.get('/roles', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+
+
+def test_role_details_runs_both_shows_concurrently_and_caches(client, monkeypatch):
+    # Each SHOW waits for the other, so running them one after the other fails
+    both_running = threading.Barrier(2, timeout=5)
+    calls = []
+
+    def show(result):
+        def run(role):
+            calls.append(role)
+            both_running.wait()
+            return result
+        return run
+
+    monkeypatch.setattr(sfc.client, "get_role_privileges", show(_held_privileges("DEV")))
+    monkeypatch.setattr(sfc.client, "get_role_grants", show([{"role": "DEV", "grantee_name": "ALICE"}]))
+    sfc.client.invalidate_cache()
+
+    data = client.get("/roles/DEV/details").get_json()["data"]
+    assert data["role"] == "DEV"
+    assert len(data["privileges"]) == 2
+    assert data["grants"][0]["grantee_name"] == "ALICE"
+
+    client.get("/roles/DEV/details")
+    assert len(calls) == 2
+
+    # A grant to the role drops the combined entry along with its privileges
+    payload = {"db": "DB1", "schema": "OTHER", "role": "DEV", "perm_type": "read_grant_schema", "warehouse": "TEST_WH"}
+    assert client.post("/grant_permissions", data=json.dumps(payload), content_type="application/json").status_code == 200
+    both_running.reset()
+    calls.clear()
+    client.get("/roles/DEV/details")
+    assert len(calls) == 2
+
+
+class _PooledConnection:
+    def __init__(self):
+        self.statements = []
+        self.closed = False
+
+    def cursor(self):
+        conn = self
+
+        class _Cursor:
+            def execute(self, sql, params=None, timeout=None):
+                conn.statements.append(sql)
+
+            def close(self):
+                pass
+
+        return _Cursor()
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_drops_connections_from_before_a_reconnect_and_follows_the_warehouse(monkeypatch):
+    client = sfc.SnowflakeClient()
+    opened = []
+    monkeypatch.setattr(client, "_open_connection", lambda: opened.append(_PooledConnection()) or opened[-1])
+    client._conn = client._open_connection()
+    client._conn_params = {"warehouse": "WH_A"}
+
+    with client._pooled_connection() as first:
+        # Closed (as on reconnect) while borrowed: it must not rejoin the new pool
+        client.close()
+        client._conn = client._open_connection()
+        client._conn_params = {"warehouse": "WH_A"}
+    assert first.closed
+    assert client.pool_stats() == {"idle": 0, "in_use": 0}
+
+    client.set_warehouse("WH_B")
+    with client._pooled_connection() as conn:
+        assert conn is not first and conn.statements == ["USE WAREHOUSE WH_B"]
+    with client._pooled_connection() as again:
+        assert again is conn and conn.statements == ["USE WAREHOUSE WH_B"]
+    client.set_warehouse("WH_C")
+    with client._pooled_connection() as again:
+        assert conn.statements[-1] == "USE WAREHOUSE WH_C"
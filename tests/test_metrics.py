@@ -0,0 +1,47 @@
+from importlib import reload
+
+import pytest
+
+import app as flask_app
+from backend import metrics
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    reload(flask_app)
+    flask_app.app.config['TESTING'] = True
+    return flask_app.app.test_client()
+
+
+def test_metrics_endpoint_records_routes(client, monkeypatch):
+    monkeypatch.setattr(flask_app, 'METRICS_TOKEN', 'scrape-secret')
+    client.get('/ping')
+    resp = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+    assert resp.status_code == 200
+    assert resp.mimetype == 'text/plain'
+    body = resp.get_data(as_text=True)
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_duration_seconds_count{route="/ping",method="GET",status="200"}' in body
+    assert 'snowflake_pool_connections{state="idle"} 0' in body
+
+
+def test_metrics_need_the_token_or_a_session(client, monkeypatch):
+    import backend.oauth as oauth
+
+    assert client.get('/metrics').status_code == 401
+    monkeypatch.setattr(flask_app, 'METRICS_TOKEN', 'scrape-secret')
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    monkeypatch.setattr(oauth, 'authenticated', lambda: True)
+    assert client.get('/metrics').status_code == 200
+
+
+def test_histogram_buckets_are_cumulative():
+    h = metrics.Histogram('t_seconds', 'test', ('op',), buckets=(0.1, 1.0))
+    h.observe(0.05, op='a')
+    h.observe(0.5, op='a')
+    h.observe(5, op='a')
+    lines = h.render()
+    assert 't_seconds_bucket{op="a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{op="a",le="1"} 2' in lines
+    assert 't_seconds_bucket{op="a",le="+Inf"} 3' in lines
+    assert 't_seconds_count{op="a"} 3' in lines
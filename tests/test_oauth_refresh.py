@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+from flask import Flask, session
+
+import backend.oauth as oauth
+
+
+class _Response:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+@pytest.fixture()
+def app(monkeypatch):
+    monkeypatch.setattr(oauth, 'OAUTH_CLIENT_ID', 'cid')
+    monkeypatch.setattr(oauth, 'OAUTH_CLIENT_SECRET', 'secret')
+    monkeypatch.setattr(oauth, '_refresh_flights', {})
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    return app
+
+
+def _expired_session(refresh):
+    session[oauth.TOKEN_KEY] = 'old'
+    session[oauth.REFRESH_KEY] = refresh
+    session[oauth.EXP_KEY] = time.time() - 1
+
+
+def test_concurrent_refreshes_share_one_request(app, monkeypatch):
+    calls = []
+
+    def post(*args, **kwargs):
+        calls.append(kwargs['data']['refresh_token'])
+        time.sleep(0.1)
+        return _Response(200, {'access_token': 'new', 'refresh_token': 'r2', 'expires_in': 3600})
+
+    monkeypatch.setattr(oauth._http, 'post', post)
+    tokens = []
+
+    def request_thread():
+        with app.test_request_context('/'):
+            _expired_session('r1')
+            tokens.append(oauth.get_access_token())
+
+    threads = [threading.Thread(target=request_thread) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert tokens == ['new'] * 8
+    assert calls == ['r1']
+
+    # A request still carrying the rotated refresh token reuses the outcome
+    with app.test_request_context('/'):
+        _expired_session('r1')
+        assert oauth.get_access_token() == 'new'
+        assert session[oauth.REFRESH_KEY] == 'r2'
+    assert calls == ['r1']
+
+
+def test_rejected_refresh_logs_out(app, monkeypatch):
+    monkeypatch.setattr(oauth._http, 'post', lambda *a, **kw: _Response(400))
+    with app.test_request_context('/'):
+        _expired_session('bad')
+        assert oauth.get_access_token() is None
+        assert oauth.TOKEN_KEY not in session
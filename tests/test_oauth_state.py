@@ -0,0 +1,110 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import app as flask_app
+
+from importlib import reload
+
+
+class _TokenResponse:
+    status_code = 200
+    text = ''
+
+    def json(self):
+        return {'access_token': 'tok', 'refresh_token': 'ref', 'expires_in': 3600}
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    reload(flask_app)
+    flask_app.app.config['TESTING'] = True
+
+    import backend.oauth as oauth
+    monkeypatch.setattr(oauth, 'OAUTH_CLIENT_ID', 'cid')
+    monkeypatch.setattr(oauth, 'OAUTH_CLIENT_SECRET', 'secret')
+    monkeypatch.setattr(oauth, 'OAUTH_AUTH_URL', 'https://idp.example/authorize')
+    monkeypatch.setattr(oauth, 'OAUTH_TOKEN_URL', 'https://idp.example/token')
+    monkeypatch.setattr(oauth._http, 'post', lambda *a, **kw: _TokenResponse())
+    return flask_app.app.test_client()
+
+
+def test_callback_on_another_worker_accepts_session_state(client):
+    import backend.oauth as oauth
+
+    r = client.get('/login')
+    state = parse_qs(urlparse(r.headers['Location']).query)['state'][0]
+    # A different worker process never saw the server-side state
+    oauth._state_store.clear()
+
+    r = client.get(f'/oauth/callback?code=abc&state={state}')
+    assert r.status_code == 302
+    with client.session_transaction() as sess:
+        assert sess[oauth.TOKEN_KEY] == 'tok'
+        assert oauth.STATE_KEY not in sess
+
+
+def test_login_issues_a_new_session_id(client):
+    cookie = flask_app.app.config['SESSION_COOKIE_NAME']
+    r = client.get('/login')
+    state = parse_qs(urlparse(r.headers['Location']).query)['state'][0]
+    # An attacker who planted (or read) the pre-login ID gains nothing from it
+    planted = client.get_cookie(cookie).value
+
+    assert client.get(f'/oauth/callback?code=abc&state={state}').status_code == 302
+    sid = client.get_cookie(cookie).value
+    assert sid != planted
+    backend = flask_app.app.session_interface.backend
+    assert backend.get(planted) is None
+    assert 'tok' in backend.get(sid)
+
+
+def test_callback_rejects_unknown_state(client):
+    client.get('/login')
+    r = client.get('/oauth/callback?code=abc&state=forged')
+    assert r.status_code == 400
+
+
+def test_state_is_single_use(client):
+    r = client.get('/login')
+    state = parse_qs(urlparse(r.headers['Location']).query)['state'][0]
+    assert client.get(f'/oauth/callback?code=abc&state={state}').status_code == 302
+    assert client.get(f'/oauth/callback?code=abc&state={state}').status_code == 400
+
+
+@pytest.mark.parametrize('kind', ['memory', 'sqlite'])
+def test_state_store_expiry_and_cap(kind, tmp_path, monkeypatch):
+    from backend import oauth_state
+
+    if kind == 'memory':
+        store = oauth_state.MemoryStateStore(ttl=300, max_entries=3)
+        clock = oauth_state.time.monotonic
+        monkeypatch.setattr(oauth_state.time, 'monotonic', lambda: clock() + offset[0])
+    else:
+        store = oauth_state.SQLiteStateStore(str(tmp_path / 'states.db'), ttl=300, max_entries=3)
+        clock = oauth_state.time.time
+        monkeypatch.setattr(oauth_state.time, 'time', lambda: clock() + offset[0])
+    offset = [0.0]
+
+    for i in range(5):
+        store.add(f's{i}')
+    # Capped at the three newest states
+    assert len(store) == 3
+    assert not store.consume('s0')
+    assert store.consume('s4')
+    assert not store.consume('s4')
+
+    offset[0] = 301
+    assert not store.consume('s3')
+    store.add('fresh')
+    assert len(store) == 1
+    assert store.consume('fresh')
+
+
+def test_sqlite_state_store_is_shared(tmp_path):
+    from backend.oauth_state import SQLiteStateStore
+
+    path = str(tmp_path / 'states.db')
+    login_worker, callback_worker = SQLiteStateStore(path), SQLiteStateStore(path)
+    login_worker.add('abc')
+    assert callback_worker.consume('abc')
+    assert not login_worker.consume('abc')
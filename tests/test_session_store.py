@@ -0,0 +1,72 @@
+import time
+from importlib import reload
+
+import pytest
+
+import app as flask_app
+from backend.session_store import MemorySessionBackend, SQLiteSessionBackend, ServerSideSessionInterface
+
+
+@pytest.fixture()
+def client():
+    reload(flask_app)
+    flask_app.app.config['TESTING'] = True
+    return flask_app.app.test_client()
+
+
+def test_cookie_carries_only_session_id(client):
+    import backend.oauth as oauth
+
+    with client.session_transaction() as sess:
+        sess[oauth.TOKEN_KEY] = 'x' * 2000
+        sess[oauth.EXP_KEY] = time.time() + 3600
+    sid = client.get_cookie(flask_app.app.config['SESSION_COOKIE_NAME']).value
+    assert len(sid) < 64
+    assert 'x' * 2000 in flask_app.app.session_interface.backend.get(sid)
+
+    assert client.get('/auth/status').get_json()['authenticated'] is True
+    assert 'warmup' in client.get('/auth/status').get_json()
+    client.post('/auth/logout')
+    # Signed-out callers do not see the process-wide warm-up state
+    assert client.get('/auth/status').get_json() == {'authenticated': False}
+
+
+def test_unknown_session_id_is_not_adopted(client):
+    client.set_cookie(flask_app.app.config['SESSION_COOKIE_NAME'], 'attacker-chosen')
+    with client.session_transaction() as sess:
+        sess['oauth_state'] = ['state', time.time()]
+    sid = client.get_cookie(flask_app.app.config['SESSION_COOKIE_NAME']).value
+    assert sid != 'attacker-chosen'
+
+
+@pytest.mark.parametrize('kind', ['memory', 'sqlite'])
+def test_backend_expiry_and_cap(kind, tmp_path):
+    if kind == 'memory':
+        backend = MemorySessionBackend(max_entries=2)
+    else:
+        backend = SQLiteSessionBackend(str(tmp_path / 'sessions.db'), max_entries=2)
+    now = time.time()
+    backend.set('expired', '{}', now - 1)
+    assert backend.get('expired') is None
+    for sid in ('a', 'b', 'c'):
+        backend.set(sid, sid, now + 60)
+    assert backend.get('a') is None
+    assert backend.get('c') == 'c'
+    assert len(backend) == 2
+    backend.delete('c')
+    assert backend.get('c') is None
+
+
+def test_sqlite_sessions_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    flask_app.app.session_interface = ServerSideSessionInterface(SQLiteSessionBackend(path))
+    login_worker = flask_app.app.test_client()
+    with login_worker.session_transaction() as sess:
+        sess['oauth_token'] = 'tok'
+    sid = login_worker.get_cookie(flask_app.app.config['SESSION_COOKIE_NAME']).value
+
+    flask_app.app.session_interface = ServerSideSessionInterface(SQLiteSessionBackend(path))
+    other_worker = flask_app.app.test_client()
+    other_worker.set_cookie(flask_app.app.config['SESSION_COOKIE_NAME'], sid)
+    with other_worker.session_transaction() as sess:
+        assert sess['oauth_token'] == 'tok'
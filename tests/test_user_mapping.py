@@ -0,0 +1,22 @@
+import pytest
+
+from backend.snowflake_client import SnowflakeClient
+
+
+def test_derive_has_mfa():
+    client = SnowflakeClient()
+    assert client._derive_has_mfa(1, None) is True
+    assert client._derive_has_mfa("yes", None) is True
+    assert client._derive_has_mfa(0, "TRUE") is True
+    assert client._derive_has_mfa(True, None) is True
+    assert client._derive_has_mfa("false", 0) is False
+    assert client._derive_has_mfa(None, None) is False
+    assert client._derive_has_mfa(-1, "") is False
+
+
+def test_extract_key_content():
+    pem = "-----BEGIN PUBLIC KEY-----\nMIIBIj\nANBgk+/=\n-----END PUBLIC KEY-----\n"
+    assert SnowflakeClient._extract_key_content(pem) == "MIIBIjANBgk+/="
+    assert SnowflakeClient._extract_key_content("MIIB\nIjAN") == "MIIBIjAN"
+    with pytest.raises(ValueError):
+        SnowflakeClient._extract_key_content("not a key; DROP USER X")
@@ -0,0 +1,28 @@
+from backend.warmup import Warmup
+
+
+def _wait(w):
+    w._thread.join(timeout=5)
+    return w.status()
+
+
+def test_warmup_runs_all_steps():
+    loaded = []
+    w = Warmup()
+    assert w.start(lambda: loaded.append("connect"), [("users", lambda: loaded.append("users")), ("roles", lambda: loaded.append("roles"))])
+    status = _wait(w)
+    assert status["status"] == "done"
+    assert status["steps"] == {"connect": "done", "users": "done", "roles": "done"}
+    assert loaded == ["connect", "users", "roles"]
+
+
+def test_warmup_step_failure_is_partial():
+    def boom():
+        raise RuntimeError("no access")
+
+    w = Warmup()
+    w.start(lambda: None, [("users", boom), ("roles", lambda: None)])
+    status = _wait(w)
+    assert status["status"] == "partial"
+    assert status["steps"]["users"] == "error"
+    assert status["steps"]["roles"] == "done"
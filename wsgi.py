@@ -0,0 +1,9 @@
+"""WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+``app.py``'s ``__main__`` block (Werkzeug dev server, browser launch) is for
+local development only.
+"""
+
+from app import app  # noqa: F401